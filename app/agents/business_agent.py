@@ -1,28 +1,40 @@
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 from agno.tools.reasoning import ReasoningTools
 from app.knowledge.knowledge_base import get_knowledge
+from app.models.admission import AdmittedChat
+from app.models.cascade import CascadeChat
 from app.config.settings import settings
 from app.database.postgres_db import get_postgres_db
 from app.config.settings import settings
-from agno.learn import LearningMachine, LearningMode, UserMemoryConfig
+from agno.learn import LearningMode, UserMemoryConfig
+from app.memory.deferred import DeferredLearningMachine, defer_memory_extraction
+from app.memory.history_compaction import CompactingAgent
 
-business_agent = Agent(
+business_agent = CompactingAgent(
     name="Business Agent",
     id="houpe-agentic",
     db=get_postgres_db(),
-    learning=LearningMachine(
+    # User memories are extracted after the answer, in batches (app/memory/deferred.py)
+    learning=DeferredLearningMachine(
+        # Extraction calls the memory tools, which the cascade's local tier cannot
+        model=AdmittedChat(
+            id=settings.RUNPOD_MODEL_NAME,
+            base_url=settings.RUNPOD_BASE_URL,
+            api_key=settings.RUNPOD_API_KEY
+        ),
         user_memory=UserMemoryConfig(
             mode=LearningMode.ALWAYS,
         ),
     ),
-    enable_agentic_memory=True,
-    model=OpenAIChat(
+    post_hooks=[defer_memory_extraction],
+    enable_agentic_memory=not settings.MEMORY_DEFERRED,
+    # FAQ answers come from the knowledge in context: local EXAONE first, RunPod when unsure
+    model=CascadeChat(
         id=settings.RUNPOD_MODEL_NAME,
         base_url=settings.RUNPOD_BASE_URL,
         api_key=settings.RUNPOD_API_KEY
     ),
     add_history_to_context=True,
+    history_max_prompt_tokens=settings.BUSINESS_AGENT_MAX_PROMPT_TOKENS,
     add_knowledge_to_context=True,
     instructions="""
     Kamu adalah customer support yang bekerja untuk bisnis Hipnoterapi Houpe. Gunakan gaya bahasa gen Z dan sapaan Kakak/kak kepada customer.
@@ -1,12 +1,14 @@
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
+from app.models.admission import AdmittedChat
 from agno.tools.reasoning import ReasoningTools
 from app.config.settings import settings
 from agno.tools.mcp import MCPTools
+from app.hooks.pre_hooks import validate_out_of_context
+from app.hooks.speculative import SpeculativeAgent
 
-leave_agent = Agent(
+leave_agent = SpeculativeAgent(
     name="Leave Agent",
-    model=OpenAIChat(
+    id="leave-agent",
+    model=AdmittedChat(
         id=settings.RUNPOD_MODEL_NAME,
         base_url=settings.RUNPOD_BASE_URL,
         api_key=settings.RUNPOD_API_KEY
@@ -24,6 +26,9 @@ leave_agent = Agent(
     If the question is unrelated to HR or leave topics,
     politely decline and redirect the user.
     """,
+    # The guardrail runs alongside the first model call; only the reasoning tools may run before it passes
+    speculative_hooks=[validate_out_of_context],
+    speculative_safe_tools=["think", "analyze"],
     add_history_to_context=True,
     markdown=True,
     debug_mode=True,
@@ -0,0 +1,97 @@
+"""
+Agent Registry
+==============
+
+Agents by id, built on first use: `registry.get(agent_id)` imports the agent's
+module (which constructs the agent) the first time it is asked for. The
+heavy dependencies are lazy too (LazyKnowledge, lru_cached indexes), so
+constructing an agent is cheap. `registry.warmup()` runs as a background task
+from the AgentOS lifespan and builds, after the server is listening, what the
+first requests would otherwise pay for (WARMUP): the knowledge vector db
+(qdrant_client import and collection check), the schema and saved-query
+indexes, the guardrail and routing classifiers, the guardrail's LLM chain
+(langchain import).
+
+AgentOS wants its agents when the app is created, so agent_os.py takes
+`registry.all()` at import; other callers (app/api/routes.py, evaluations)
+ask for the one agent they need.
+
+Every construction and warmup step is timed by the startup profiler
+(app/orchestrator/startup_profile.py).
+"""
+
+import asyncio
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from agno.agent import Agent
+from agno.utils.log import logger
+
+from app.config.settings import settings
+from app.orchestrator.startup_profile import profiler
+
+AGENTS: Dict[str, str] = {
+    "sql-agent": "app.agents.sql_agent:sql_agent",
+    "houpe-agentic": "app.agents.business_agent:business_agent",
+    "leave-agent": "app.agents.leave_agent:leave_agent",
+}
+
+WARMUP: List[Tuple[str, str]] = [
+    ("knowledge vector db", "app.knowledge.knowledge_base:warm_vector_dbs"),
+    ("saved query index", "app.services.saved_query_index:get_saved_query_index"),
+    ("guardrail classifier", "app.services.guardrail_classifier:get_guardrail_classifier"),
+    ("guardrail llm chain", "app.hooks.pre_hooks:get_llm_chain"),
+    ("intent router", "app.services.intent_router:get_intent_router"),
+] + ([("schema index", "app.services.schema_index:get_schema_index")] if settings.SQL_SCHEMA_LINKING else [])
+
+
+def _resolve(target: str) -> Any:
+    module, attribute = target.split(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+class AgentRegistry:
+    def __init__(self, agents: Dict[str, str] = AGENTS, warmup: List[Tuple[str, str]] = WARMUP):
+        self.targets = dict(agents)
+        self.warmup_steps = list(warmup)
+        self.warm = False
+        self._agents: Dict[str, Agent] = {}
+        self._lock = threading.Lock()  # warmup builds agents in a worker thread
+
+    def get(self, agent_id: str) -> Agent:
+        agent = self._agents.get(agent_id)
+        if agent is not None:
+            return agent
+        if agent_id not in self.targets:
+            raise KeyError(f"Unknown agent '{agent_id}'")
+        with self._lock:
+            if agent_id not in self._agents:
+                with profiler.component(f"agent: {agent_id}"):
+                    self._agents[agent_id] = _resolve(self.targets[agent_id])
+            return self._agents[agent_id]
+
+    def all(self) -> List[Agent]:
+        return [self.get(agent_id) for agent_id in self.targets]
+
+    async def warmup(self) -> None:
+        """Build every agent, then run the WARMUP steps, in worker threads; failures are logged, not raised."""
+        await asyncio.sleep(settings.STARTUP_WARMUP_DELAY_SECONDS)
+        for agent_id in self.targets:
+            await self._run(f"agent: {agent_id}", self.get, agent_id)
+        for name, target in self.warmup_steps:
+            with profiler.component(f"warmup: {name}"):
+                await self._run(name, lambda target=target: _resolve(target)())
+        self.warm = True
+        profiler.mark("warm")
+        profiler.log_summary()
+
+    @staticmethod
+    async def _run(name: str, step: Callable[..., Any], *args: Any) -> None:
+        try:
+            await asyncio.to_thread(step, *args)
+        except Exception as e:
+            logger.warning(f"Warmup step '{name}' failed, it runs on first use instead: {e}")
+
+
+registry = AgentRegistry()
@@ -1,28 +1,66 @@
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
+from app.models.admission import AdmittedChat
 from agno.tools.reasoning import ReasoningTools
 from app.services.semantic_model import SEMANTIC_MODEL_STR
 from app.knowledge.knowledge_base import get_knowledge_sql_agent
 from app.config.settings import settings
 from app.tools.save_query import save_validated_query, set_knowledge
+from app.services.saved_query_index import saved_query_fast_path
+from app.services.schema_index import schema_linking_hook
 from app.database.postgres_db import get_postgres_db_dummy_data
-from agno.tools.sql import SQLTools
+from app.memory.history_compaction import CompactingAgent
+from app.tools.sql_tools import GovernedSQLTools
+from app.tools.precomputed import get_precomputed_result, list_precomputed_results
+from app.services.query_catalog import get_catalog
 from app.config.settings import settings
 
-set_knowledge(get_knowledge_sql_agent)
+set_knowledge(get_knowledge_sql_agent())
+
+HCM_TABLES = [
+    "departments",
+    "job_positions",
+    "employees",
+    "salary_history",
+    "attendance",
+    "performance_reviews",
+    "training_history",
+]
+
+if settings.SQL_SCHEMA_LINKING:
+    # Filled per run from the run's dependencies (schema_linking_hook)
+    schema_section = """
+SCHEMA
+------
+- Only the tables and columns relevant to the question are listed in <relevant_schema>
+- Use describe_table for any table or column not listed there
+
+<relevant_schema>
+{relevant_schema}
+</relevant_schema>
+"""
+else:
+    schema_section = f"""
+<semantic_model>
+{SEMANTIC_MODEL_STR}
+</semantic_model>
+"""
 
 system_message = f"""\
 You are a Text-to-SQL agent with access to a PostgreSQL HCM database.
 
 WORKFLOW
 --------
-1. Search knowledge base before writing SQL
-2. Execute query and validate results
-3. Ask if user wants to save query to knowledge base
+1. If a precomputed result answers the question, read it with get_precomputed_result
+2. Otherwise search knowledge base before writing SQL
+3. Execute query and validate results
+4. Ask if user wants to save query to knowledge base
+
+PRECOMPUTED RESULTS
+-------------------
+- {", ".join(get_catalog())}
 
 TABLES
 ------
-- departments, job_positions, employees, salary_history, attendance, performance_reviews, training_history
+- {", ".join(HCM_TABLES)}
 
 DATA QUALITY NOTES
 ------------------
@@ -40,34 +78,37 @@ SQL RULES
 - Never SELECT *
 - Include ORDER BY for rankings
 
-<semantic_model>
-{SEMANTIC_MODEL_STR}
-</semantic_model>
-"""
+{schema_section}"""
 
-sql_agent = Agent(
+sql_agent = CompactingAgent(
     name="SQL Agent",
-    model=OpenAIChat(
+    id="sql-agent",
+    model=AdmittedChat(
         id=settings.RUNPOD_MODEL_NAME,
         base_url=settings.RUNPOD_BASE_URL,
         api_key=settings.RUNPOD_API_KEY
     ),
     db=get_postgres_db_dummy_data(),
     system_message=system_message,
+    pre_hooks=[saved_query_fast_path, schema_linking_hook] if settings.SQL_SCHEMA_LINKING else [saved_query_fast_path],
     tools=[
-        SQLTools(db_url=settings.POSTGRES_URL_DUMMY_DATA),
+        GovernedSQLTools(db_url=settings.POSTGRES_URL_DUMMY_DATA, cache_tables=HCM_TABLES),
         ReasoningTools(add_instructions=True),
         save_validated_query,
+        list_precomputed_results,
+        get_precomputed_result,
     ],
     add_datetime_to_context=True,
     enable_agentic_memory=True,
     search_knowledge=True,
     add_history_to_context=True,
     num_history_runs=5,
+    # Older turns become summary lines, old SQL results their query and row count
+    history_max_prompt_tokens=settings.SQL_AGENT_MAX_PROMPT_TOKENS,
     read_chat_history=True,
     read_tool_call_history=True,
     markdown=True,
-    compress_tool_results=True,
+    compress_tool_results=False,
 )
 
 
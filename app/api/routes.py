@@ -1,10 +1,12 @@
 import os
 import sys
+from pathlib import Path
 from fastapi import APIRouter, HTTPException
+from agno.utils.log import logger
 from pydantic import BaseModel
 from typing import Dict, Optional
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from pipelines.ingestion_pipeline import ingest_website
+from app.config.settings import settings
 
 router = APIRouter()
 
@@ -12,10 +14,91 @@ class IngestRequest(BaseModel):
     url: str
     metadata: Optional[Dict[str, str]] = {}
 
+class SqlQuestionRequest(BaseModel):
+    question: str
+    session_id: Optional[str] = None
+
+class PdfIngestRequest(BaseModel):
+    path: str
+    metadata: Optional[Dict[str, str]] = {}
+
 @router.post("/insert_knowledge_by_website_url")
 def ingest_knowledge(payload: IngestRequest):
+    from pipelines.ingestion_pipeline import ingest_website
+
     try:
-        ingest_website(payload.url, payload.metadata)
-        return {"status": "success", "url": payload.url}
+        stats = ingest_website(payload.url, payload.metadata)
+        return {
+            "status": "success",
+            "url": payload.url,
+            "dedup": {
+                "chunks_seen": stats.seen,
+                "chunks_dropped": stats.dropped,
+                "dedup_ratio": round(stats.dedup_ratio, 4),
+            },
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def resolve_ingest_path(path: str) -> Path:
+    """Resolve `path` inside INGEST_DIR; anything else would put arbitrary server files into the knowledge base."""
+    root = Path(settings.INGEST_DIR).resolve()
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root):
+        raise HTTPException(status_code=400, detail="Path must be inside the ingest directory")
+    if resolved.suffix.lower() != ".pdf":
+        raise HTTPException(status_code=400, detail="Only .pdf files can be ingested")
+    if not resolved.is_file():
+        raise HTTPException(status_code=404, detail="File not found in the ingest directory")
+    return resolved
+
+@router.post("/insert_knowledge_by_pdf_path")
+def ingest_pdf_knowledge(payload: PdfIngestRequest):
+    path = resolve_ingest_path(payload.path)
+    try:
+        from pipelines.ingestion_pipeline import ingest_pdf
+
+        chunks = ingest_pdf(str(path), payload.metadata)
+        return {"status": "success", "path": payload.path, "chunks": chunks}
+    except Exception as e:
+        logger.error(f"Ingesting {path} failed: {e}")
+        raise HTTPException(status_code=500, detail="PDF ingestion failed")
+
+@router.post("/sql/ask")
+def ask_sql_agent(payload: SqlQuestionRequest):
+    from app.agents.registry import registry
+    from app.models.admission import is_overloaded
+    from app.services.saved_query_index import answer_from_saved_query
+
+    sql_agent = registry.get("sql-agent")
+
+    try:
+        # Known question: run the validated SQL, no model call
+        saved, metadata = answer_from_saved_query(sql_agent, payload.question)
+        if saved is not None:
+            return {"status": "success", "fast_path": True, **saved}
+        response = sql_agent.run(payload.question, session_id=payload.session_id, metadata=metadata)
+        if is_overloaded(response):
+            raise HTTPException(status_code=503, detail=response.content, headers={"Retry-After": "5"})
+        return {"status": "success", "fast_path": False, "content": response.content}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/sql/fast_path/stats")
+def sql_fast_path_stats():
+    from app.services.saved_query_index import get_saved_query_index
+
+    return get_saved_query_index().stats.to_dict()
+
+@router.get("/sql/cache/stats")
+def sql_cache_stats():
+    from app.agents.registry import registry
+    from app.services.saved_query_index import _get_sql_tools
+
+    sql_agent = registry.get("sql-agent")
+    cache = getattr(_get_sql_tools(sql_agent), "cache", None)
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.snapshot()}
@@ -0,0 +1,32 @@
+from pydantic_settings import BaseSettings
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The MCP server (app/mcp/mcp_server.py) runs as its own process and needs none
+# of the agent settings, so it does not require QDRANT_URL / QDRANT_API_KEY.
+class McpSettings(BaseSettings):
+    HR_API_URL: str = "https://hrp07-dev-be-v3.harpa-go.com:8080/apps/accrualPlans/getNetEntitleMobile/"
+    HR_API_TIMEOUT_SECONDS: float = 10
+    HR_API_MAX_CONNECTIONS: int = 20
+    HR_API_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HR_API_MAX_CONCURRENCY: int = 10
+    HR_API_MAX_RETRIES: int = 3
+    HR_API_BACKOFF_BASE_SECONDS: float = 0.2
+    HR_API_BACKOFF_MAX_SECONDS: float = 2.0
+    HR_API_RETRY_AFTER_MAX_SECONDS: float = 30  # longest Retry-After the HR API can make us wait
+
+    MCP_CACHE_TTL_SECONDS: float = 300
+    MCP_CACHE_STALE_SECONDS: float = 3600
+    MCP_CACHE_MAX_ENTRIES: int = 1024
+    MCP_MAX_BATCH_SIZE: int = 50
+    MCP_EXECUTOR_WORKERS: int = 8
+    MCP_SESSION_IDLE_SECONDS: float = 3600
+    MCP_MAX_SESSIONS: int = 1000
+    MCP_REQUIRE_SESSION: bool = False  # True: reject requests without Mcp-Session-Id
+    MCP_SSE_KEEPALIVE_SECONDS: float = 5
+    MCP_LOG_LEVEL: str = "INFO"  # DEBUG adds handler detail and sampled request bodies
+    MCP_LOG_BODY_SAMPLE_RATE: float = 0.01
+    MCP_LOG_BODY_MAX_CHARS: int = 2000
+
+mcp_settings = McpSettings()
@@ -1,14 +1,30 @@
+from functools import lru_cache
+
 from agno.db.postgres import PostgresDb
 from app.config.settings import settings
+from app.database.session_cache import CachedPostgresDb
+
+
+@lru_cache(maxsize=None)
+def _cached_postgres_db(db_url: str) -> CachedPostgresDb:
+    # One instance per database, so every agent on it shares the session cache
+    return CachedPostgresDb(
+        id="my_agent_db",
+        db_url=db_url,
+    )
 
 def get_postgres_db():
+    if settings.SESSION_CACHE_ENABLED:
+        return _cached_postgres_db(settings.POSTGRES_URL)
     return PostgresDb(
         id="my_agent_db",
         db_url=settings.POSTGRES_URL,
     )
 
 def get_postgres_db_dummy_data():
+    if settings.SESSION_CACHE_ENABLED:
+        return _cached_postgres_db(settings.POSTGRES_URL_DUMMY_DATA)
     return PostgresDb(
         id="my_agent_db",
         db_url=settings.POSTGRES_URL_DUMMY_DATA,
-    )
\ No newline at end of file
+    )
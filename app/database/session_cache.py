@@ -0,0 +1,449 @@
+"""
+Session Cache
+=============
+
+In-process cache for agent sessions and learnings (user memories) over the
+agno Postgres db, with write-behind for sessions on sticky deployments.
+
+Every run reads its session (history, session_data) and the user's
+memories, and writes the session back, each a blocking round trip on the
+event loop. `CachedPostgresDb` is a PostgresDb that:
+
+- keeps hot sessions in an LRU (SESSION_CACHE_MAX_SESSIONS); reads are
+  served from it for SESSION_CACHE_TTL_SECONDS
+- with write-behind, buffers upsert_session: the session is cached and
+  marked dirty, and `run_session_flusher` (AgentOS lifespan) writes the dirty
+  sessions every SESSION_FLUSH_INTERVAL_SECONDS in one bulk upsert. Several
+  writes to one session between flushes coalesce into the latest state;
+  flushes run one at a time, so a session's writes reach Postgres in order.
+  Dirty sessions are never evicted, and the flusher drains them on shutdown
+- without it, writes upsert_session through and keeps the written session
+- caches get_learning results; upsert_learning writes through (memory writes
+  are already batched by app/memory/deferred.py) and invalidates the user's
+  entries
+
+Deployment (SESSION_CACHE_INVALIDATION picks the write mode):
+- "none", sticky sessions only (the load balancer routes on session_id):
+  each session lives on one worker and its cache is authoritative, so session
+  writes are write-behind
+- "notify", several workers without stickiness: session writes go through.
+  Write-behind is unsafe here: another worker could read a session whose last
+  turn is still unflushed, and its later flush would overwrite that turn.
+  Every write sends the changed keys with pg_notify on SESSION_CACHE_CHANNEL;
+  `listen_for_invalidations` (one LISTEN connection per worker) evicts them
+  from the other workers' caches. Another worker sees a write after the
+  notification delay; a missed notification is bounded by the TTL
+
+With write-behind, sessions written in the last flush interval are lost if
+the process dies without a shutdown; use "notify" or set
+SESSION_CACHE_ENABLED=false where that matters.
+"""
+
+import asyncio
+import copy
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import asyncpg
+from agno.db.base import SessionType
+from agno.db.postgres import PostgresDb
+from agno.session import AgentSession, TeamSession, WorkflowSession
+from agno.utils.log import logger
+from sqlalchemy import text
+
+from app.config.settings import settings
+
+Session = Union[AgentSession, TeamSession, WorkflowSession]
+_SESSION_CLASSES = {
+    SessionType.AGENT.value: AgentSession,
+    SessionType.TEAM.value: TeamSession,
+    SessionType.WORKFLOW.value: WorkflowSession,
+}
+_LEARNING_PREFIX = "learning:"
+
+# Every cached db of this process, for the flusher and the listener
+cached_dbs: List["SessionCacheMixin"] = []
+
+
+def _type_value(session_type: Any) -> str:
+    return session_type.value if isinstance(session_type, SessionType) else str(session_type)
+
+
+def _session_type_of(session: Session) -> str:
+    if isinstance(session, TeamSession):
+        return SessionType.TEAM.value
+    if isinstance(session, WorkflowSession):
+        return SessionType.WORKFLOW.value
+    return SessionType.AGENT.value
+
+
+@dataclass
+class CachedSession:
+    session_type: str
+    data: Dict[str, Any]  # Session.to_dict() snapshot, never mutated once cached
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class SessionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    learning_hits: int = 0
+    learning_misses: int = 0
+    writes: int = 0  # upsert_session calls
+    coalesced: int = 0  # writes to a session that was already dirty
+    flushed: int = 0  # sessions written to the db
+    flushes: int = 0  # bulk upserts
+    flush_errors: int = 0
+    invalidations: int = 0  # keys evicted: other workers' notifications, direct table writes
+    last_flush_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        reads = self.hits + self.misses
+        data["hit_rate"] = round(self.hits / reads, 3) if reads else None
+        data["writes_per_flushed_row"] = round(self.writes / self.flushed, 2) if self.flushed else None
+        return data
+
+
+class SessionCacheMixin:
+    """Session LRU with write-behind and a learnings read cache, over an agno sync db."""
+
+    def __init__(
+        self,
+        *args: Any,
+        max_sessions: int = settings.SESSION_CACHE_MAX_SESSIONS,
+        ttl_seconds: float = settings.SESSION_CACHE_TTL_SECONDS,
+        write_behind: bool = settings.SESSION_CACHE_INVALIDATION == "none",
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.write_behind = write_behind
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.cache_stats = SessionCacheStats()
+        self._sessions: "OrderedDict[str, CachedSession]" = OrderedDict()
+        self._dirty: "OrderedDict[str, CachedSession]" = OrderedDict()
+        self._learnings: "OrderedDict[Tuple, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()  # sync runs call the db from worker threads
+        self._flush_lock = threading.Lock()  # one flush at a time keeps per-session write order
+        cached_dbs.append(self)
+
+    # -- cache bookkeeping
+
+    def _fresh(self, entry: CachedSession, session_id: str) -> bool:
+        return session_id in self._dirty or time.monotonic() - entry.loaded_at < self.ttl_seconds
+
+    def _cache(self, session_id: str, entry: CachedSession) -> None:
+        self._sessions[session_id] = entry
+        self._sessions.move_to_end(session_id)
+        if len(self._sessions) > self.max_sessions:
+            for key in list(self._sessions):
+                if len(self._sessions) <= self.max_sessions:
+                    break
+                if key not in self._dirty:
+                    del self._sessions[key]
+
+    def _load(self, entry: CachedSession, deserialize: Optional[bool]) -> Union[Session, Dict[str, Any], None]:
+        data = copy.deepcopy(entry.data)
+        if not deserialize:
+            return {**data, "session_type": entry.session_type}
+        return _SESSION_CLASSES[entry.session_type].from_dict(data)
+
+    def invalidate(self, keys: List[str]) -> None:
+        """Evict sessions and users' learnings; dirty sessions stay (this worker's write is the newer one)."""
+        with self._lock:
+            for key in keys:
+                if key.startswith(_LEARNING_PREFIX):
+                    self._drop_learnings(key[len(_LEARNING_PREFIX):] or None)
+                elif key not in self._dirty:
+                    self._sessions.pop(key, None)
+            self.cache_stats.invalidations += len(keys)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            for key in [k for k in self._sessions if k not in self._dirty]:
+                del self._sessions[key]
+            self._learnings.clear()
+
+    def _publish(self, keys: List[str]) -> None:
+        """Tell other workers about changed keys; see CachedPostgresDb."""
+
+    # -- sessions
+
+    def get_session(
+        self,
+        session_id: str,
+        session_type: SessionType,
+        user_id: Optional[str] = None,
+        deserialize: Optional[bool] = True,
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        type_value = _type_value(session_type)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            hit = entry is not None and entry.session_type == type_value and self._fresh(entry, session_id)
+            if hit:
+                self._sessions.move_to_end(session_id)
+                self.cache_stats.hits += 1
+            else:
+                self.cache_stats.misses += 1
+        if hit:
+            if user_id is not None and entry.data.get("user_id") != user_id:
+                return None
+            return self._load(entry, deserialize)
+
+        row = super().get_session(session_id, session_type, user_id=user_id, deserialize=False)
+        if row is None:
+            return None
+        entry = CachedSession(session_type=type_value, data={k: v for k, v in row.items() if k != "session_type"})
+        with self._lock:
+            if session_id not in self._dirty:
+                self._cache(session_id, entry)
+        return self._load(entry, deserialize)
+
+    def upsert_session(self, session: Session, deserialize: Optional[bool] = True) -> Optional[Union[Session, Dict[str, Any]]]:
+        if not self.write_behind:
+            return self._write_through(session, deserialize)
+        data = session.to_dict()
+        now = int(time.time())
+        data["created_at"] = data.get("created_at") or now
+        data["updated_at"] = now
+        entry = CachedSession(session_type=_session_type_of(session), data=data)
+        with self._lock:
+            self.cache_stats.writes += 1
+            if session.session_id in self._dirty:
+                self.cache_stats.coalesced += 1
+            self._dirty[session.session_id] = entry
+            self._cache(session.session_id, entry)
+        return session if deserialize else {**copy.deepcopy(data), "session_type": entry.session_type}
+
+    def _write_through(self, session: Session, deserialize: Optional[bool]) -> Optional[Union[Session, Dict[str, Any]]]:
+        row = super().upsert_session(session, deserialize=False)
+        with self._lock:
+            self.cache_stats.writes += 1
+            if row is not None:
+                entry = CachedSession(session_type=_session_type_of(session), data={k: v for k, v in row.items() if k != "session_type"})
+                self._cache(session.session_id, entry)
+        self._publish([session.session_id])
+        if row is None or not deserialize:
+            return row
+        return _SESSION_CLASSES[_session_type_of(session)].from_dict(copy.deepcopy(row))
+
+    def flush(self, max_sessions: Optional[int] = None) -> int:
+        """Write dirty sessions (up to `max_sessions`, oldest first); returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                batch: List[Tuple[str, CachedSession]] = []
+                while self._dirty and (max_sessions is None or len(batch) < max_sessions):
+                    batch.append(self._dirty.popitem(last=False))
+            if not batch:
+                return 0
+            start = time.perf_counter()
+            try:
+                sessions = [_SESSION_CLASSES[entry.session_type].from_dict(copy.deepcopy(entry.data)) for _, entry in batch]
+                super().upsert_sessions(sessions, deserialize=False, preserve_updated_at=True)
+            except Exception as e:
+                with self._lock:
+                    # Back in front, unless the session was written again meanwhile
+                    for session_id, entry in reversed(batch):
+                        if session_id not in self._dirty:
+                            self._dirty[session_id] = entry
+                            self._dirty.move_to_end(session_id, last=False)
+                    self.cache_stats.flush_errors += 1
+                logger.error(f"Session cache: flushing {len(batch)} sessions failed: {e}")
+                return 0
+            self.cache_stats.flushes += 1
+            self.cache_stats.flushed += len(batch)
+            self.cache_stats.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            self._publish([session_id for session_id, _ in batch])
+            return len(batch)
+
+    def flush_all(self) -> int:
+        written = 0
+        while self.pending:
+            flushed = self.flush(settings.SESSION_FLUSH_MAX_BATCH)
+            if not flushed:
+                break
+            written += flushed
+        return written
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    @property
+    def cached(self) -> int:
+        return len(self._sessions)
+
+    def _flush_sessions(self, session_ids: List[str]) -> None:
+        """Write the given dirty sessions now (ahead of a direct db operation on them)."""
+        if any(session_id in self._dirty for session_id in session_ids):
+            self.flush_all()
+
+    def get_sessions(self, *args: Any, **kwargs: Any) -> Any:
+        # Listings and AgentOS session pages read the table: dirty sessions go first
+        self.flush_all()
+        return super().get_sessions(*args, **kwargs)
+
+    def upsert_sessions(self, sessions: List[Session], *args: Any, **kwargs: Any) -> Any:
+        ids = [session.session_id for session in sessions]
+        self._flush_sessions(ids)
+        result = super().upsert_sessions(sessions, *args, **kwargs)
+        self.invalidate(ids)
+        self._publish(ids)
+        return result
+
+    def rename_session(self, session_id: str, session_type: SessionType, session_name: str, deserialize: Optional[bool] = True) -> Any:
+        self._flush_sessions([session_id])
+        result = super().rename_session(session_id, session_type, session_name, deserialize=deserialize)
+        self.invalidate([session_id])
+        self._publish([session_id])
+        return result
+
+    # Deletes hold the flush lock: a flush that already took the session must
+    # finish its upsert before the delete, or it would re-create the row
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._flush_lock:
+            with self._lock:
+                self._dirty.pop(session_id, None)
+                self._sessions.pop(session_id, None)
+            deleted = super().delete_session(session_id)
+        self._publish([session_id])
+        return deleted
+
+    def delete_sessions(self, session_ids: List[str]) -> None:
+        with self._flush_lock:
+            with self._lock:
+                for session_id in session_ids:
+                    self._dirty.pop(session_id, None)
+                    self._sessions.pop(session_id, None)
+            super().delete_sessions(session_ids)
+        self._publish(session_ids)
+
+    # -- learnings (user memory, user profile, session context)
+
+    def _drop_learnings(self, user_id: Optional[str]) -> None:
+        if user_id is None:
+            self._learnings.clear()
+            return
+        for key in [k for k in self._learnings if dict(k[1]).get("user_id") == user_id]:
+            del self._learnings[key]
+
+    def get_learning(self, learning_type: str, **filters: Any) -> Optional[Dict[str, Any]]:
+        key = (learning_type, tuple(sorted(filters.items())))
+        with self._lock:
+            cached = self._learnings.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+                self._learnings.move_to_end(key)
+                self.cache_stats.learning_hits += 1
+                return copy.deepcopy(cached[1])
+            self.cache_stats.learning_misses += 1
+        result = super().get_learning(learning_type, **filters)
+        with self._lock:
+            self._learnings[key] = (time.monotonic(), copy.deepcopy(result))
+            if len(self._learnings) > self.max_sessions:
+                self._learnings.popitem(last=False)
+        return result
+
+    def upsert_learning(self, id: str, learning_type: str, content: Dict[str, Any], **fields: Any) -> None:
+        super().upsert_learning(id, learning_type, content, **fields)
+        user_id = fields.get("user_id")
+        with self._lock:
+            self._drop_learnings(user_id)
+        self._publish([_LEARNING_PREFIX + (user_id or "")])
+
+    def delete_learning(self, id: str) -> bool:
+        deleted = super().delete_learning(id)
+        with self._lock:
+            self._learnings.clear()
+        self._publish([_LEARNING_PREFIX])
+        return deleted
+
+
+class CachedPostgresDb(SessionCacheMixin, PostgresDb):
+    """PostgresDb with the session cache; invalidations go out with pg_notify."""
+
+    def _publish(self, keys: List[str]) -> None:
+        if settings.SESSION_CACHE_INVALIDATION != "notify" or not keys:
+            return
+        # NOTIFY payloads are limited to 8000 bytes
+        chunks, chunk = [], ""
+        for key in keys:
+            if chunk and len(chunk) + len(key) > 7000:
+                chunks.append(chunk)
+                chunk = ""
+            chunk += f" {key}"
+        chunks.append(chunk)
+        try:
+            with self.Session() as sess, sess.begin():
+                for chunk in chunks:
+                    sess.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": settings.SESSION_CACHE_CHANNEL, "payload": self.worker_id + chunk},
+                    )
+        except Exception as e:
+            logger.warning(f"Session cache: notify failed, other workers rely on the TTL: {e}")
+
+
+def _asyncpg_dsn(db_url: str) -> str:
+    scheme, rest = db_url.split("://", 1)
+    return f"{scheme.split('+', 1)[0]}://{rest}"
+
+
+async def run_session_flusher(interval: float = settings.SESSION_FLUSH_INTERVAL_SECONDS) -> None:
+    """Flush dirty sessions of every cached db every `interval` seconds (started from the AgentOS lifespan)."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            for db in cached_dbs:
+                while db.pending:
+                    if not await asyncio.to_thread(db.flush, settings.SESSION_FLUSH_MAX_BATCH):
+                        break
+    finally:
+        # Shutdown: write what is still dirty, bounded by SESSION_FLUSH_SHUTDOWN_TIMEOUT_SECONDS
+        async def drain() -> None:
+            for db in cached_dbs:
+                await asyncio.to_thread(db.flush_all)
+
+        try:
+            await asyncio.wait_for(drain(), settings.SESSION_FLUSH_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Session cache: {sum(db.pending for db in cached_dbs)} sessions not written at shutdown")
+
+
+async def listen_for_invalidations(db: CachedPostgresDb) -> None:
+    """LISTEN on SESSION_CACHE_CHANNEL and evict what other workers changed; reconnects with backoff."""
+
+    def on_notify(connection: Any, pid: int, channel: str, payload: str) -> None:
+        worker_id, _, keys = payload.partition(" ")
+        if worker_id != db.worker_id:
+            db.invalidate(keys.split())
+
+    delay = 1.0
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(_asyncpg_dsn(db.db_url), server_settings={"application_name": "session_cache"})
+            await conn.add_listener(settings.SESSION_CACHE_CHANNEL, on_notify)
+            # Notifications sent while disconnected are lost
+            db.clear_cache()
+            delay = 1.0
+            while not conn.is_closed():
+                await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Session cache: invalidation listener down ({e}), retrying in {delay:.0f}s")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
@@ -0,0 +1,72 @@
+"""
+Async SQL Pool
+==============
+
+Shared asyncpg pool for the SQL Agent's async tool path.
+
+Under AgentOS every run is `arun`, so SQL tools that block on a synchronous
+driver pin a worker thread per concurrent session. The async path uses one
+asyncpg pool per event loop:
+- connects as a dedicated read-only role (SQL_AGENT_READONLY_URL, see
+  sql_readonly_role.sql), falling back to POSTGRES_URL_DUMMY_DATA
+- every connection starts with default_transaction_read_only=on and the
+  SQL Agent statement_timeout, so no per-query SET round trips are needed
+- asyncpg's per-connection prepared-statement cache is sized by
+  SQL_PREPARED_STATEMENT_CACHE_SIZE; repeat queries skip parse/plan
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import asyncpg
+from agno.utils.log import logger
+
+from app.config.settings import settings
+
+_pools: Dict[int, asyncpg.Pool] = {}
+_locks: Dict[int, asyncio.Lock] = {}
+
+
+def readonly_dsn() -> str:
+    """asyncpg DSN for the SQL Agent (SQLAlchemy driver suffixes stripped)."""
+    url = settings.SQL_AGENT_READONLY_URL or settings.POSTGRES_URL_DUMMY_DATA
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+', 1)[0]}://{rest}"
+
+
+async def get_sql_pool() -> asyncpg.Pool:
+    """Return the pool for the running event loop, creating it on first use."""
+    loop_id = id(asyncio.get_running_loop())
+    pool = _pools.get(loop_id)
+    if pool is not None:
+        return pool
+
+    lock = _locks.setdefault(loop_id, asyncio.Lock())
+    async with lock:
+        if loop_id not in _pools:
+            _pools[loop_id] = await asyncpg.create_pool(
+                dsn=readonly_dsn(),
+                min_size=settings.SQL_POOL_MIN_SIZE,
+                max_size=settings.SQL_POOL_MAX_SIZE,
+                statement_cache_size=settings.SQL_PREPARED_STATEMENT_CACHE_SIZE,
+                max_inactive_connection_lifetime=300,
+                server_settings={
+                    "application_name": "sql_agent",
+                    "default_transaction_read_only": "on",
+                    "statement_timeout": str(settings.SQL_STATEMENT_TIMEOUT_MS),
+                },
+            )
+            logger.info(
+                f"SQL pool ready: {settings.SQL_POOL_MIN_SIZE}-{settings.SQL_POOL_MAX_SIZE} connections, "
+                f"statement cache {settings.SQL_PREPARED_STATEMENT_CACHE_SIZE}"
+            )
+    return _pools[loop_id]
+
+
+async def close_sql_pool() -> None:
+    """Close the pool of the running event loop (AgentOS shutdown)."""
+    loop_id = id(asyncio.get_running_loop())
+    pool: Optional[asyncpg.Pool] = _pools.pop(loop_id, None)
+    _locks.pop(loop_id, None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,21 @@
+-- Read-only role for the SQL Agent (used by app/database/sql_pool.py).
+-- Run once as a superuser / database owner against dummy_data, then set
+-- SQL_AGENT_READONLY_URL=postgresql://sql_agent_ro:<password>@localhost:5432/dummy_data
+
+CREATE ROLE sql_agent_ro LOGIN PASSWORD 'change-me'
+    CONNECTION LIMIT 40;
+
+ALTER ROLE sql_agent_ro SET default_transaction_read_only = on;
+ALTER ROLE sql_agent_ro SET statement_timeout = '15s';
+ALTER ROLE sql_agent_ro SET idle_in_transaction_session_timeout = '30s';
+
+GRANT CONNECT ON DATABASE dummy_data TO sql_agent_ro;
+GRANT USAGE ON SCHEMA public TO sql_agent_ro;
+GRANT SELECT ON ALL TABLES IN SCHEMA public TO sql_agent_ro;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT ON TABLES TO sql_agent_ro;
+
+-- Precomputed catalog results (app/services/query_catalog.py)
+CREATE SCHEMA IF NOT EXISTS precomputed;
+GRANT USAGE ON SCHEMA precomputed TO sql_agent_ro;
+GRANT SELECT ON ALL TABLES IN SCHEMA precomputed TO sql_agent_ro;
+ALTER DEFAULT PRIVILEGES IN SCHEMA precomputed GRANT SELECT ON TABLES TO sql_agent_ro;
@@ -0,0 +1,196 @@
+"""Benchmark: a traffic spike with and without model admission control (app/models/admission.py).
+
+A fake OpenAI-compatible endpoint stands in for RunPod: it serves --capacity
+requests at --model-latency seconds; beyond that every request slows down in
+proportion (shared GPU), and past --reject-at requests in flight it answers
+503. The client times out after --client-timeout seconds and the openai SDK
+retries (2 retries, its default), as the agents do today.
+
+The spike: --background background calls (memory extraction)
+start first, then --interactive interactive chat calls, spread over two agents,
+all at once.
+
+- plain:     OpenAIChat, every call goes straight to the endpoint
+- admission: AdmittedChat, --capacity calls in flight, --background-slots for
+             background work, --agent-slots per agent, queue timeout
+             --queue-timeout seconds
+
+Reports latency per priority, failed calls and the endpoint's view (peak in
+flight, requests received, 503s), then the admission stats.
+
+    python app/evaluations/admission_benchmark.py --interactive 40 --background 20
+    python app/evaluations/admission_benchmark.py --capacity 4 --queue-timeout 5
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.agent import Agent
+from agno.models.openai import OpenAIChat
+from agno.run.base import RunStatus
+
+from app.evaluations.mcp_load_test import _start
+from app.models.admission import AdmissionStats, AdmittedChat, admission, background, is_overloaded
+
+
+def fake_openai_app(latency: float, capacity: int, reject_at: int):
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    state = {"in_flight": 0, "peak": 0, "received": 0, "rejected": 0}
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    def stats():
+        return state
+
+    @app.post("/stats/reset")
+    def reset():
+        state.update(in_flight=0, peak=0, received=0, rejected=0)
+        return state
+
+    @app.post("/v1/chat/completions")
+    async def completions(body: dict):
+        state["received"] += 1
+        if state["in_flight"] >= reject_at:
+            state["rejected"] += 1
+            return JSONResponse({"error": {"message": "overloaded", "type": "server_error"}}, status_code=503)
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(latency * max(1.0, state["in_flight"] / capacity))
+        finally:
+            state["in_flight"] -= 1
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "Baik kak."}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 300, "completion_tokens": 10, "total_tokens": 310},
+        }
+
+    return app
+
+
+async def call(agent: Agent, priority: str) -> Tuple[str, float, str]:
+    async def run():
+        return await agent.arun("Berapa sisa cuti saya?")
+
+    start = time.perf_counter()
+    if priority == "background":
+        with background():
+            response = await run()
+    else:
+        response = await run()
+    if is_overloaded(response):
+        outcome = "overloaded"
+    elif response.status == RunStatus.error:
+        outcome = "error"
+    else:
+        outcome = "ok"
+    return priority, time.perf_counter() - start, outcome
+
+
+async def spike(mode: str, args, base_url: str) -> None:
+    model_class = AdmittedChat if mode == "admission" else OpenAIChat
+    agents = [
+        Agent(
+            id=f"bench-{i}",
+            model=model_class(id="fake", base_url=base_url, api_key="fake", timeout=args.client_timeout),
+            telemetry=False,
+        )
+        for i in range(2)
+    ]
+    admission.stats = AdmissionStats()
+    httpx.post(base_url.replace("/v1", "/stats/reset"))
+
+    calls = [call(agents[i % 2], "background") for i in range(args.background)]
+    calls += [call(agents[i % 2], "interactive") for i in range(args.interactive)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+
+    server = httpx.get(base_url.replace("/v1", "/stats")).json()
+    for priority in ("interactive", "background"):
+        ok = sorted(t for p, t, outcome in results if p == priority and outcome == "ok")
+        failed: Dict[str, int] = {}
+        for p, _, outcome in results:
+            if p == priority and outcome != "ok":
+                failed[outcome] = failed.get(outcome, 0) + 1
+        p50 = f"{statistics.median(ok):.2f}s" if ok else "-"
+        p95 = f"{ok[min(len(ok) - 1, int(len(ok) * 0.95))]:.2f}s" if ok else "-"
+        print(f"{mode:<10} {priority:<12} {len(ok):>4} ok {p50:>8} {p95:>8}   failed {failed or 0}")
+    print(f"{'':<10} endpoint: peak {server['peak']} in flight, {server['received']} requests, "
+          f"{server['rejected']} answered 503; spike done in {elapsed:.1f}s")
+    if mode == "admission":
+        stats = admission.snapshot()
+        print(f"{'':<10} admission: peak queue {stats['peak_queue_depth']}, queued {stats['queued']}, "
+              f"timed out {stats['timed_out']}, wait {stats['wait']}")
+
+
+async def compare(args, base_url: str) -> None:
+    admission.max_concurrency = args.capacity
+    admission.background_max_concurrency = args.background_slots
+    admission.agent_max_concurrency = args.agent_slots
+    admission.queue_timeout = args.queue_timeout
+    admission.requests.rate = 0  # the spike is about concurrency
+    for mode in ("plain", "admission"):
+        await spike(mode, args, base_url)
+        print("-" * 78)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactive", type=int, default=40)
+    parser.add_argument("--background", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--reject-at", type=int, default=24)
+    parser.add_argument("--model-latency", type=float, default=0.5)
+    parser.add_argument("--client-timeout", type=float, default=3.0)
+    parser.add_argument("--background-slots", type=int, default=2)
+    parser.add_argument("--agent-slots", type=int, default=6)
+    parser.add_argument("--queue-timeout", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=3409)
+    parser.add_argument("--fake-openai", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_openai:
+        import uvicorn
+
+        uvicorn.run(fake_openai_app(args.model_latency, args.capacity, args.reject_at), port=args.port, log_level="warning")
+        return
+
+    server = _start(
+        [sys.executable, __file__, "--fake-openai", "--port", str(args.port), "--model-latency", str(args.model_latency),
+         "--capacity", str(args.capacity), "--reject-at", str(args.reject_at)],
+        dict(os.environ), args.port,
+    )
+    try:
+        print("=" * 78)
+        print(f"ADMISSION SPIKE ({args.interactive} interactive + {args.background} background calls; endpoint "
+              f"capacity {args.capacity}, 503 at {args.reject_at} in flight, client timeout {args.client_timeout}s)")
+        print("=" * 78)
+        print(f"{'mode':<10} {'priority':<12} {'done':>7} {'p50':>8} {'p95':>8}")
+        # One event loop for both modes: agno shares its default async HTTP client
+        asyncio.run(compare(args, f"http://127.0.0.1:{args.port}/v1"))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
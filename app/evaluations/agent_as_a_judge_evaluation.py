@@ -4,6 +4,8 @@ import sys
 from agno.eval.performance import PerformanceEval
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from sql_agent import sql_agent
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.models.admission import background
 
 TEST_CASES = [
     "Berapa jumlah karyawan aktif di setiap departemen?",
@@ -60,4 +62,7 @@ multi_test_perf = PerformanceEval(
 )
 
 if __name__ == "__main__":
-    multi_test_perf.run(print_results=True, print_summary=True)
+    # Caps this process's evaluation calls at MODEL_BACKGROUND_MAX_CONCURRENCY;
+    # admission is per process, so they do not queue behind the server (app/models/admission.py)
+    with background():
+        multi_test_perf.run(print_results=True, print_summary=True)
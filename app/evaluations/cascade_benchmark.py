@@ -0,0 +1,159 @@
+"""Benchmark: model cascade (app/models/cascade.py) vs. remote model only.
+
+Serves two fake OpenAI-compatible models from one process: /local (fast,
+returns token logprobs like app/models/exaone_local.py) and /remote (slow).
+The local model is confident and grounded on plain FAQ questions, unsure on
+questions marked [unsure] and answers off the references on [ungrounded], so
+those escalate. Runs a Houpe-style agent over the questions once with
+CASCADE_ENABLED off and once on, and reports latency, escalation rate and the
+estimated cost saved.
+
+    python app/evaluations/cascade_benchmark.py --turns 40 --local-latency 0.3 --remote-latency 1.2
+    python app/evaluations/cascade_benchmark.py --hard-every 3
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.agent import Agent
+
+from app.config.settings import settings
+from app.evaluations.mcp_load_test import _start
+from app.models.cascade import CascadeChat, LocalChat, cascade_stats
+
+REFERENCES = (
+    "<references>\nHoupe membuka sesi hipnoterapi setiap Senin sampai Sabtu pukul 09.00-18.00. "
+    "Harga satu sesi hipnoterapi adalah 750 ribu rupiah, durasi sesi sekitar 90 menit. "
+    "Sesi bisa dilakukan offline di Jakarta Selatan atau online lewat Zoom.\n</references>"
+)
+QUESTIONS = [
+    "Berapa harga satu sesi hipnoterapi?",
+    "Houpe buka hari apa saja?",
+    "Bisa sesi online lewat Zoom?",
+    "Berapa lama durasi satu sesi?",
+]
+GROUNDED = "Harga satu sesi hipnoterapi 750 ribu rupiah, durasi sekitar 90 menit, online lewat Zoom atau offline di Jakarta Selatan."
+UNGROUNDED = "Tentu kak, kami juga menyediakan akupunktur, pijat refleksi dan konsultasi nutrisi gratis setiap minggu."
+
+
+def fake_models_app(local_latency: float, remote_latency: float):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    def completion(content: str, logprob: float = None):
+        words = content.split()
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "logprobs": {"content": [{"token": w, "logprob": logprob, "bytes": None, "top_logprobs": []} for w in words]}
+                if logprob is not None else None,
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 400, "completion_tokens": 60, "total_tokens": 460},
+        }
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    @app.post("/local/v1/chat/completions")
+    async def local(body: dict):
+        await asyncio.sleep(local_latency)
+        question = body["messages"][-1]["content"]
+        if "[unsure]" in question:
+            return completion(GROUNDED, math.log(0.3))
+        return completion(UNGROUNDED if "[ungrounded]" in question else GROUNDED, math.log(0.85))
+
+    @app.post("/remote/v1/chat/completions")
+    async def remote(body: dict):
+        await asyncio.sleep(remote_latency)
+        return completion(GROUNDED)
+
+    return app
+
+
+async def compare(questions: List[str], port: int) -> None:
+    base = f"http://127.0.0.1:{port}"
+    for mode, enabled in (("remote-only", False), ("cascade", True)):
+        settings.CASCADE_ENABLED = enabled
+        agent = Agent(
+            name=f"bench-{mode}",
+            model=CascadeChat(
+                id="remote", base_url=f"{base}/remote/v1", api_key="fake",
+                local_model=LocalChat(id="local", base_url=f"{base}/local/v1", api_key="fake"),
+            ),
+            telemetry=False,
+        )
+        timings = []
+        for question in questions:
+            start = time.perf_counter()
+            await agent.arun(f"{question}\n\n{REFERENCES}", stream=False)
+            timings.append(time.perf_counter() - start)
+        stats = cascade_stats.get(agent.id)
+        summary = stats.to_dict() if stats else {}
+        remote_calls = summary.get("remote_calls", len(questions))
+        escalation = f"{summary['escalation_rate']:.0%}" if summary.get("calls") else "-"
+        print(
+            f"{mode:<12} {statistics.median(timings) * 1000:>8.0f}ms {statistics.fmean(timings) * 1000:>9.0f}ms "
+            f"{escalation:>11} {remote_calls:>8} "
+            f"{summary.get('est_saved_seconds', 0.0):>10.1f}s {summary.get('est_saved_cost', 0.0):>10.4f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--hard-every", type=int, default=4, help="Every Nth question is [unsure] or [ungrounded]")
+    parser.add_argument("--local-latency", type=float, default=0.3)
+    parser.add_argument("--remote-latency", type=float, default=1.2)
+    parser.add_argument("--port", type=int, default=3403)
+    parser.add_argument("--fake-models", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_models:
+        import uvicorn
+
+        uvicorn.run(fake_models_app(args.local_latency, args.remote_latency), port=args.port, log_level="warning")
+        return
+
+    server = _start(
+        [sys.executable, __file__, "--fake-models", "--port", str(args.port),
+         "--local-latency", str(args.local_latency), "--remote-latency", str(args.remote_latency)],
+        dict(os.environ), args.port,
+    )
+    questions = []
+    for i in range(args.turns):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        if (i + 1) % args.hard_every == 0:
+            question += " [unsure]" if (i // args.hard_every) % 2 == 0 else " [ungrounded]"
+        questions.append(question)
+    try:
+        print("=" * 78)
+        print(f"MODEL CASCADE ({args.turns} turns, local {args.local_latency}s, remote {args.remote_latency}s, "
+              f"1 in {args.hard_every} hard)")
+        print("=" * 78)
+        print(f"{'mode':<12} {'p50':>10} {'mean':>11} {'escalation':>11} {'remote':>8} {'saved':>11} {'saved $':>10}")
+        # One event loop for both modes: agno shares its default async HTTP client
+        asyncio.run(compare(questions, args.port))
+        print("=" * 78)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark: cold start of the AgentOS server, eager vs. lazy agent dependencies.
+
+Starts `uvicorn app.main:app` in a subprocess, --runs times per mode, against a
+fake Qdrant whose every request takes --qdrant-latency seconds (a remote
+Qdrant Cloud round trip), and measures from spawn to:
+
+- listening: first answer from GET /health
+- warm:      GET /startup/profile reports warm (app/agents/registry.py)
+
+Modes (LAZY_STARTUP):
+- eager: knowledge vector dbs built and checked while app.main is imported
+- lazy:  vector dbs, indexes and classifiers built by the warmup task after
+         the server is listening
+
+Then prints the startup profile of the last lazy run: milestones, components
+and the slowest imports.
+
+    python app/evaluations/cold_start_benchmark.py --runs 3
+    python app/evaluations/cold_start_benchmark.py --qdrant-latency 0.5
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.evaluations.mcp_load_test import _start
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fake_qdrant_app(latency: float):
+    from fastapi import FastAPI, Request
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def root():
+        return {"title": "qdrant - vector search engine", "version": "1.16.0"}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    async def any_request(path: str, request: Request):
+        await asyncio.sleep(latency)
+        if path.endswith("/exists"):
+            return {"result": {"exists": True}, "status": "ok", "time": 0}
+        return {"result": True, "status": "ok", "time": 0}
+
+    return app
+
+
+def _wait(url: str, deadline: float, check=lambda response: True) -> Optional[httpx.Response]:
+    while time.time() < deadline:
+        try:
+            response = httpx.get(url, timeout=1)
+            if response.status_code == 200 and check(response):
+                return response
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def cold_start(mode: str, args) -> Dict[str, Optional[float]]:
+    env = {
+        **os.environ,
+        "QDRANT_URL": f"http://127.0.0.1:{args.qdrant_port}",
+        "QDRANT_API_KEY": os.environ.get("QDRANT_API_KEY", "fake"),
+        "LAZY_STARTUP": str(mode == "lazy"),
+        "PRECOMPUTED_REFRESH_INTERVAL_SECONDS": "0",
+    }
+    start = time.time()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + args.timeout
+        listening = _wait(f"http://127.0.0.1:{args.port}/health", deadline)
+        listening_at = time.time() - start if listening is not None else None
+        warm = _wait(f"http://127.0.0.1:{args.port}/startup/profile", deadline, lambda r: r.json().get("warm"))
+        return {
+            "listening": listening_at,
+            "warm": time.time() - start if warm is not None else None,
+            "profile": warm.json() if warm is not None else None,
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _seconds(values: List[Optional[float]]) -> str:
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values):>7.2f}s" if values else f"{'failed':>8}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--qdrant-latency", type=float, default=0.2)
+    parser.add_argument("--timeout", type=float, default=90)
+    parser.add_argument("--port", type=int, default=3407)
+    parser.add_argument("--qdrant-port", type=int, default=3408)
+    parser.add_argument("--fake-qdrant", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_qdrant:
+        import uvicorn
+
+        uvicorn.run(fake_qdrant_app(args.qdrant_latency), port=args.qdrant_port, log_level="warning")
+        return
+
+    qdrant = _start(
+        [sys.executable, __file__, "--fake-qdrant", "--qdrant-port", str(args.qdrant_port),
+         "--qdrant-latency", str(args.qdrant_latency)],
+        dict(os.environ), args.qdrant_port,
+    )
+    try:
+        print("=" * 78)
+        print(f"COLD START ({args.runs} runs per mode, Qdrant latency {args.qdrant_latency}s)")
+        print("=" * 78)
+        print(f"{'mode':<7} {'listening p50':>14} {'warm p50':>10}")
+        profile = None
+        for mode in ("eager", "lazy"):
+            results = [cold_start(mode, args) for _ in range(args.runs)]
+            print(f"{mode:<7} {_seconds([r['listening'] for r in results]):>14} {_seconds([r['warm'] for r in results]):>10}")
+            profile = results[-1]["profile"] or profile
+        if profile:
+            print("-" * 78)
+            print(f"Milestones (lazy, ms since startup_profile import): {profile['milestones_ms']}")
+            print("Components (ms):")
+            for name, ms in profile["components_ms"].items():
+                print(f"  {name:<40} {ms:>8.1f}")
+            print(f"Imports: {profile['import_total_ms']} ms; slowest packages (self time, ms):")
+            for name, ms in list(profile["packages_ms"].items())[:8]:
+                print(f"  {name:<40} {ms:>8.1f}")
+        print("=" * 78)
+    finally:
+        qdrant.terminate()
+
+
+if __name__ == "__main__":
+    main()
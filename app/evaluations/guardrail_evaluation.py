@@ -0,0 +1,113 @@
+"""Guardrail evaluation: tiered (local classifier -> LLM) vs. LLM-only out-of-context check.
+
+For every question in QUESTIONS (none of them are classifier examples):
+- LLM-only baseline as the hook used to run it: build the chain, invoke gpt-4o-mini
+- local centroid classifier: latency, relevance margin
+Then, per confidence margin, the share of questions the local tier decides,
+agreement of the tiered verdict with the LLM-only verdict, and the expected
+guardrail latency per turn (local time + LLM time for escalated questions).
+
+    python app/evaluations/guardrail_evaluation.py
+    python app/evaluations/guardrail_evaluation.py --margins 0 0.02 0.05 0.08
+
+Needs OPENAI_API_KEY (embeddings and gpt-4o-mini).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.hooks.pre_hooks import ContextValidationResult, classify_question, get_llm_chain, llm_classify
+from app.services.guardrail_classifier import get_guardrail_classifier
+
+# (question, expected relevant)
+QUESTIONS: List[Tuple[str, bool]] = [
+    ("How many vacation days are still available for me on 2025-03-01?", True),
+    ("What's my leave balance today?", True),
+    ("Am I allowed to take half-day leave?", True),
+    ("How many days off did I use in Q1?", True),
+    ("Is my annual leave going to expire at the end of the year?", True),
+    ("Cuti saya masih ada berapa hari untuk bulan depan?", True),
+    ("What is the procedure for reporting sick?", True),
+    ("Who approves my leave requests?", True),
+    ("How is overtime compensated?", True),
+    ("Where can I find my payslip?", True),
+    ("What is the probation period for new hires?", True),
+    ("How do I request a salary certificate from HR?", True),
+    ("Apakah ada tunjangan transportasi untuk karyawan?", True),
+    ("Can I work from home on Fridays?", True),
+    ("Translate 'good morning' into Japanese", False),
+    ("What's the best laptop for gaming?", False),
+    ("How tall is Mount Everest?", False),
+    ("Tell me a joke", False),
+    ("What stocks should I buy this week?", False),
+    ("Summarize the plot of Harry Potter", False),
+    ("How do I fix a flat bicycle tire?", False),
+    ("Berapa harga tiket pesawat ke Bali?", False),
+    ("What time does the football World Cup final start?", False),
+    ("Can you help me plan a holiday trip to Japan?", False),
+]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def llm_only_baseline(question: str) -> ContextValidationResult:
+    """The pre-change hook: a new chain per call."""
+    get_llm_chain.cache_clear()
+    return llm_classify(question)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.0, 0.02, 0.05, 0.08, 0.12])
+    args = parser.parse_args()
+
+    classifier = get_guardrail_classifier()
+    _, warmup = _timed(classifier._ensure_centroids)
+    print(f"Category centroids embedded in {warmup:.2f}s (once per process)")
+
+    rows = []
+    for question, expected in QUESTIONS:
+        llm, llm_seconds = _timed(llm_only_baseline, question)
+        local, local_seconds = _timed(classifier.classify, question)
+        rows.append((question, expected, llm, llm_seconds, local, local_seconds))
+
+    print("=" * 100)
+    print(f"{'llm':>5} {'local':>6} {'margin':>7} {'llm ms':>7} {'local ms':>9}  question")
+    print("=" * 100)
+    for question, expected, llm, llm_seconds, local, local_seconds in rows:
+        print(
+            f"{'yes' if llm.is_relevant else 'no':>5} {'yes' if local.is_relevant else 'no':>6} {local.margin:>+7.3f} "
+            f"{llm_seconds * 1000:>7.0f} {local_seconds * 1000:>9.0f}  {question[:60]}"
+        )
+
+    llm_ms = statistics.fmean(r[3] for r in rows) * 1000
+    local_ms = statistics.fmean(r[5] for r in rows) * 1000
+    llm_accuracy = sum(r[2].is_relevant == r[1] for r in rows) / len(rows)
+    print("=" * 100)
+    print(f"LLM-only: {llm_ms:.0f} ms per turn, accuracy vs. labels {llm_accuracy:.0%}")
+    print(f"{'margin':>7} {'local decides':>14} {'agreement':>10} {'accuracy':>9} {'ms per turn':>12}")
+    for margin in args.margins:
+        decided = [r for r in rows if r[4].confident(margin)]
+        verdicts = [r[4].is_relevant if r[4].confident(margin) else r[2].is_relevant for r in rows]
+        agreement = sum(v == r[2].is_relevant for v, r in zip(verdicts, rows)) / len(rows)
+        accuracy = sum(v == r[1] for v, r in zip(verdicts, rows)) / len(rows)
+        per_turn = local_ms + llm_ms * (1 - len(decided) / len(rows))
+        print(f"{margin:>7.2f} {len(decided) / len(rows):>14.0%} {agreement:>10.0%} {accuracy:>9.0%} {per_turn:>12.0f}")
+
+    # Repeated questions are answered from the verdict cache
+    classify_question(QUESTIONS[0][0])
+    verdict, seconds = _timed(classify_question, QUESTIONS[0][0])
+    print(f"Repeated question: tier={verdict.tier}, {seconds * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
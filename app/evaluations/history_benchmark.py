@@ -0,0 +1,185 @@
+"""Benchmark: prompt tokens and latency over a long session, with and without history compaction.
+
+A SQL-agent-shaped session against a fake OpenAI-compatible server: every
+question makes the model call run_sql_query, whose result is a large CSV
+table (app/tools/sql_result.py encoding), then answer. History settings as
+the SQL Agent (add_history_to_context, num_history_runs=5). The fake model's
+latency grows with the prompt (--base-latency + --prefill-ms-per-1k per 1k
+prompt tokens), like prefill on a real server.
+
+- plain:      agno Agent, full history of the last 5 runs
+- compacting: CompactingAgent (app/memory/history_compaction.py)
+
+Reports prompt tokens per turn (both model calls of the turn) and turn latency.
+
+    python app/evaluations/history_benchmark.py --turns 30
+    python app/evaluations/history_benchmark.py --rows 300 --budget 6000 --raw-turns 1
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.agent import Agent
+from agno.db.base import SessionType
+from agno.db.sqlite import SqliteDb
+from agno.models.openai import OpenAIChat
+
+from app.config.settings import settings
+from app.evaluations.mcp_load_test import _start
+from app.evaluations.performance_evaluation import TEST_CASES
+from app.memory.history_compaction import CompactingAgent
+from app.tools.sql_result import QueryResult, encode_row
+
+ROWS = 150
+
+
+def run_sql_query(query: str) -> str:
+    """Use this function to run a read-only SQL SELECT query and return the result.
+
+    Args:
+        query (str): The query to run.
+    """
+    result = QueryResult(columns=["employee_id", "full_name", "department_name", "salary_amount", "hire_date"])
+    for i in range(ROWS):
+        row = (1000 + i, f"Karyawan Nomor {i}", ["Finance", "Engineering", "Sales"][i % 3], 9_500_000 + i * 1250, f"2023-0{i % 9 + 1}-15")
+        result.rows.append(row)
+        result.lines.append(encode_row(row))
+    result.total_rows = ROWS
+    return result.to_text()
+
+
+def fake_openai_app(base_latency: float, prefill_ms_per_1k: float):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    @app.post("/v1/chat/completions")
+    async def completions(body: dict):
+        prompt_tokens = len(json.dumps(body["messages"]) + json.dumps(body.get("tools") or [])) // 4
+        await asyncio.sleep(base_latency + prompt_tokens / 1000 * prefill_ms_per_1k / 1000)
+        last = body["messages"][-1]
+        if last["role"] == "tool":
+            message = {"content": "Berikut hasilnya: ada 150 karyawan yang cocok, mayoritas di Engineering. "
+                                  "Gaji rata-rata sekitar 9,6 juta. SQL yang dipakai ada di atas."}
+            finish = "stop"
+        else:
+            sql = f"SELECT e.employee_id, e.full_name FROM employees e /* {last['content'][:40]} */ LIMIT 150"
+            message = {"content": None, "tool_calls": [{"id": f"call_{time.time_ns()}", "type": "function",
+                       "function": {"name": "run_sql_query", "arguments": json.dumps({"query": sql})}}]}
+            finish = "tool_calls"
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": 0, "message": {"role": "assistant", **message}, "finish_reason": finish}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 40, "total_tokens": prompt_tokens + 40},
+        }
+
+    return app
+
+
+async def run_session(agent: Agent, turns: int, session_id: str) -> Dict[str, List[float]]:
+    results: Dict[str, List[float]] = {"tokens": [], "latency": []}
+    for turn in range(turns):
+        start = time.perf_counter()
+        output = await agent.arun(TEST_CASES[turn % len(TEST_CASES)], session_id=session_id, user_id="bench")
+        results["latency"].append(time.perf_counter() - start)
+        results["tokens"].append(output.metrics.input_tokens if output.metrics else 0)
+    return results
+
+
+async def compare(args, base_url: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SqliteDb(db_file=os.path.join(tmp, "sessions.db"))
+        common = dict(
+            model=OpenAIChat(id="fake", base_url=base_url, api_key="fake"),
+            db=db,
+            tools=[run_sql_query],
+            add_history_to_context=True,
+            num_history_runs=5,
+            telemetry=False,
+        )
+        runs = {
+            "plain": await run_session(Agent(name="bench-plain", **common), args.turns, "plain"),
+            "compacting": await run_session(
+                CompactingAgent(
+                    name="bench-compacting", history_raw_turns=args.raw_turns,
+                    history_max_prompt_tokens=args.budget, **common,
+                ),
+                args.turns, "compacting",
+            ),
+        }
+        summary = db.get_session(session_id="compacting", session_type=SessionType.AGENT)
+
+    print(f"{'turn':>5} {'plain tokens':>13} {'compacted':>10} {'plain ms':>9} {'compacted ms':>13}")
+    for turn in range(0, args.turns, 5):
+        print(
+            f"{turn + 1:>5} {runs['plain']['tokens'][turn]:>13,.0f} {runs['compacting']['tokens'][turn]:>10,.0f} "
+            f"{runs['plain']['latency'][turn] * 1000:>9.0f} {runs['compacting']['latency'][turn] * 1000:>13.0f}"
+        )
+    print("-" * 78)
+    for mode, result in runs.items():
+        print(
+            f"{mode:<11} prompt tokens/turn mean {statistics.fmean(result['tokens']):>8,.0f}  "
+            f"max {max(result['tokens']):>8,.0f}  total {sum(result['tokens']):>9,.0f}  "
+            f"latency mean {statistics.fmean(result['latency']) * 1000:>5.0f} ms  "
+            f"p50 {statistics.median(result['latency']) * 1000:>5.0f} ms"
+        )
+    lines = ((summary.session_data or {}).get("history_summary") or {}).get("lines", []) if summary else []
+    print(f"Persisted summary: {len(lines)} lines" + (f", latest: {lines[-1][:90]}" if lines else ""))
+
+
+def main() -> None:
+    global ROWS
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=ROWS, help="Rows in every SQL tool result")
+    parser.add_argument("--raw-turns", type=int, default=settings.HISTORY_RAW_TURNS)
+    parser.add_argument("--budget", type=int, default=settings.SQL_AGENT_MAX_PROMPT_TOKENS)
+    parser.add_argument("--base-latency", type=float, default=0.15)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=40.0)
+    parser.add_argument("--port", type=int, default=3405)
+    parser.add_argument("--fake-openai", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    ROWS = args.rows
+
+    if args.fake_openai:
+        import uvicorn
+
+        uvicorn.run(fake_openai_app(args.base_latency, args.prefill_ms_per_1k), port=args.port, log_level="warning")
+        return
+
+    server = _start(
+        [sys.executable, __file__, "--fake-openai", "--port", str(args.port), "--base-latency", str(args.base_latency),
+         "--prefill-ms-per-1k", str(args.prefill_ms_per_1k)],
+        dict(os.environ), args.port,
+    )
+    try:
+        print("=" * 78)
+        print(f"HISTORY COMPACTION ({args.turns} turns, {args.rows}-row SQL results, raw turns {args.raw_turns}, "
+              f"budget {args.budget} tokens)")
+        print("=" * 78)
+        # One event loop for both modes: agno shares its default async HTTP client
+        asyncio.run(compare(args, f"http://127.0.0.1:{args.port}/v1"))
+        print("=" * 78)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Load test: MCP server GetLeaveAccrual throughput against a fake HR API.
+
+Starts a local fake HR API with injected latency (and optional 503s), starts
+the MCP server pointed at it (HR_API_URL), then fires concurrent `tools/call`
+requests (--distinct-dates repeats dates to exercise the result cache). While the tool calls are in flight, a probe sends `ping` every 50 ms:
+with a blocking HR call the pings queue behind it, with the async client they
+return immediately.
+
+    python app/evaluations/mcp_load_test.py --requests 200 --concurrency 50 --latency 0.3
+    python app/evaluations/mcp_load_test.py --batch 10 --concurrency 5
+    python app/evaluations/mcp_load_test.py --mcp-url http://localhost:3333/mcp   # an already running server
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+import httpx
+
+HR_PATH = "/apps/accrualPlans/getNetEntitleMobile/"
+
+
+def fake_hr_app(latency: float, error_rate: float):
+    from fastapi import FastAPI, Response
+
+    app = FastAPI()
+
+    @app.get(HR_PATH)
+    async def accrual(people_uuid: str, effective_date: str):
+        await asyncio.sleep(latency)
+        if random.random() < error_rate:
+            return Response(status_code=503)
+        return {"people_uuid": people_uuid, "effective_date": effective_date, "net_entitlement": 12, "taken": 3}
+
+    return app
+
+
+def run_fake_hr(port: int, latency: float, error_rate: float) -> None:
+    import uvicorn
+
+    uvicorn.run(fake_hr_app(latency, error_rate), port=port, log_level="warning")
+
+
+def _start(args: List[str], env: dict, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def _p(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))] * 1000
+
+
+async def load(mcp_url: str, total: int, concurrency: int, distinct_dates: int, batch: int = 1) -> None:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        ping_latencies: List[float] = []
+        errors = 0
+        done = asyncio.Event()
+
+        def request(i: int) -> dict:
+            return {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "tools/call",
+                "params": {"name": "GetLeaveAccrual", "arguments": {"date": str(date(2025, 1, 1) + timedelta(days=i % distinct_dates))}},
+            }
+
+        async def call(ids: range) -> None:
+            nonlocal errors
+            body = [request(i) for i in ids] if batch > 1 else request(ids[0])
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(mcp_url, json=body)
+                latencies.append(time.perf_counter() - start)
+            payload = response.json()
+            for item in payload if isinstance(payload, list) else [payload]:
+                if item.get("error") or '"status": "error"' in item["result"]["content"][0]["text"]:
+                    errors += 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.post(mcp_url, json={"jsonrpc": "2.0", "id": "ping", "method": "ping"})
+                ping_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(call(range(i, min(i + batch, total))) for i in range(0, total, batch)))
+        seconds = time.perf_counter() - start
+        done.set()
+        await probe_task
+        health = (await client.get(mcp_url.rsplit("/mcp", 1)[0] + "/")).json()
+
+    print(f"{'calls':>7} {'posts':>6} {'seconds':>8} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} {'ping p50':>9} {'ping max':>9}")
+    print(
+        f"{total:>7} {len(latencies):>6} {seconds:>8.2f} {total / seconds:>8.1f} {statistics.median(latencies) * 1000:>8.1f} "
+        f"{_p(latencies, 0.95):>8.1f} {errors:>7} {_p(ping_latencies, 0.5):>9.1f} {max(ping_latencies) * 1000:>9.1f}"
+    )
+    cache = health.get("cache", {}).get("GetLeaveAccrual")
+    if cache:
+        print(
+            f"cache: {cache['hits']} hits, {cache['coalesced']} coalesced, {cache['misses']} upstream calls, "
+            f"{cache['stale_served']} stale served, hit rate {cache['hit_rate']:.0%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake HR API latency (seconds)")
+    parser.add_argument("--distinct-dates", type=int, help="Dates to cycle through (default: one per call)")
+    parser.add_argument("--batch", type=int, default=1, help="tools/call requests per POST (JSON-RPC batch)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake HR responses that are 503")
+    parser.add_argument("--hr-port", type=int, default=3401)
+    parser.add_argument("--mcp-port", type=int, default=3400)
+    parser.add_argument("--mcp-url", help="Use a running MCP server instead of starting one")
+    parser.add_argument("--fake-hr", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_hr:
+        run_fake_hr(args.hr_port, args.latency, args.error_rate)
+        return
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = {**os.environ, "HR_API_URL": f"http://127.0.0.1:{args.hr_port}{HR_PATH}"}
+    processes = [
+        _start(
+            [sys.executable, __file__, "--fake-hr", "--hr-port", str(args.hr_port),
+             "--latency", str(args.latency), "--error-rate", str(args.error_rate)],
+            env, args.hr_port,
+        )
+    ]
+    try:
+        mcp_url = args.mcp_url
+        if mcp_url is None:
+            processes.append(
+                _start(
+                    [sys.executable, "-m", "uvicorn", "app.mcp.mcp_server:app", "--port", str(args.mcp_port),
+                     "--log-level", "warning", "--app-dir", root],
+                    env, args.mcp_port,
+                )
+            )
+            mcp_url = f"http://127.0.0.1:{args.mcp_port}/mcp"
+
+        print("=" * 78)
+        print(f"MCP LOAD TEST ({args.requests} calls, {args.concurrency} concurrent, HR latency {args.latency}s, "
+              f"{args.error_rate:.0%} 503s)")
+        print("=" * 78)
+        asyncio.run(load(mcp_url, args.requests, args.concurrency, args.distinct_dates or args.requests, args.batch))
+        print("=" * 78)
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: MCP server per-request overhead with logging off, on, and at DEBUG.
+
+Each mode runs in its own process and drives the server app in-process
+(httpx ASGI transport, no sockets) so the numbers are the server's own cost:
+`ping`, `tools/list`, a cached `tools/call` (fake HR API, one warm-up call)
+and a batch of 10 pings. Server output goes to a log file, as under a
+process manager.
+
+    python app/evaluations/mcp_logging_benchmark.py --requests 2000
+    python app/evaluations/mcp_logging_benchmark.py --root /path/to/other/checkout   # compare another tree
+
+Modes: off (MCP_LOG_LEVEL=WARNING), info (default: one line per request),
+debug (handler detail + every request body, MCP_LOG_BODY_SAMPLE_RATE=1).
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.evaluations.mcp_load_test import HR_PATH, _start
+
+MODES = {
+    "off": {"MCP_LOG_LEVEL": "WARNING"},
+    "info": {"MCP_LOG_LEVEL": "INFO"},
+    "debug": {"MCP_LOG_LEVEL": "DEBUG", "MCP_LOG_BODY_SAMPLE_RATE": "1"},
+}
+
+REQUESTS = {
+    "ping": {"jsonrpc": "2.0", "id": 1, "method": "ping"},
+    "tools/list": {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+    "tools/call": {
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "GetLeaveAccrual", "arguments": {"date": "2025-01-01"}},
+    },
+    "batch[10]": [{"jsonrpc": "2.0", "id": i, "method": "ping"} for i in range(10)],
+}
+
+
+async def run_worker(requests: int) -> dict:
+    import httpx
+
+    from app.mcp.mcp_server import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            for name, body in REQUESTS.items():
+                await client.post("/mcp", json=body)  # warm-up (fills the tool cache)
+                timings = []
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    await client.post("/mcp", json=body)
+                    timings.append(time.perf_counter() - start)
+                results[name] = {"p50_us": statistics.median(timings) * 1e6, "mean_us": statistics.fmean(timings) * 1e6}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per request type")
+    parser.add_argument("--hr-port", type=int, default=3401)
+    parser.add_argument("--root", help="Repository root to import app.mcp.mcp_server from")
+    parser.add_argument("--worker", metavar="OUT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        if args.root:
+            sys.path.insert(0, args.root)
+        with open(args.worker, "w") as f:
+            json.dump(asyncio.run(run_worker(args.requests)), f)
+        return
+
+    load_test = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_load_test.py")
+    env = {**os.environ, "HR_API_URL": f"http://127.0.0.1:{args.hr_port}{HR_PATH}"}
+    hr = _start([sys.executable, load_test, "--fake-hr", "--hr-port", str(args.hr_port), "--latency", "0"], env, args.hr_port)
+    try:
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode, overrides in MODES.items():
+                out = os.path.join(tmp, f"{mode}.json")
+                with open(os.path.join(tmp, f"{mode}.log"), "w") as log:
+                    command = [sys.executable, __file__, "--worker", out, "--requests", str(args.requests)]
+                    if args.root:
+                        command += ["--root", args.root]
+                    subprocess.run(command, env={**env, **overrides}, stdout=log, stderr=log, check=True)
+                    log_bytes = log.tell()
+                with open(out) as f:
+                    results[mode] = json.load(f)
+                results[mode]["log_kb"] = log_bytes / 1024
+    finally:
+        hr.terminate()
+
+    print("=" * 72)
+    print(f"MCP LOGGING OVERHEAD ({args.requests} requests per type, p50 µs per request)")
+    print("=" * 72)
+    print(f"{'request':<12}" + "".join(f"{mode:>12}" for mode in MODES) + f"{'info - off':>12}")
+    for name in REQUESTS:
+        row = [results[mode][name]["p50_us"] for mode in MODES]
+        print(f"{name:<12}" + "".join(f"{value:>12.1f}" for value in row) + f"{row[1] - row[0]:>+12.1f}")
+    print(f"{'log KB':<12}" + "".join(f"{results[mode]['log_kb']:>12.0f}" for mode in MODES))
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark: per-turn MCP handshake latency, session per run vs. reused session.
+
+An agno Agent that connects its MCPTools itself opens a new MCP session on
+every run (initialize, notifications/initialized, tools/list) and closes it
+afterwards. Connected once (AgentOS lifespan, see app/orchestrator/agent_os.py),
+the session is reused and a turn only pays for its tool calls.
+
+Each mode runs N turns of one GetLeaveAccrual call against the MCP server and
+a fake HR API (started as in mcp_load_test.py):
+
+    python app/evaluations/mcp_session_benchmark.py --turns 50
+    python app/evaluations/mcp_session_benchmark.py --mcp-url http://localhost:3333/mcp
+
+Needs uvicorn and mcp.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.tools.mcp import MCPTools
+
+from app.evaluations.mcp_load_test import HR_PATH, _start
+
+
+async def turn(tools: MCPTools, i: int) -> None:
+    # Distinct dates so the server-side result cache does not hide the HR latency
+    await tools.session.call_tool("GetLeaveAccrual", {"date": str(date(2025, 1, 1) + timedelta(days=i))})
+
+
+async def per_run(url: str, turns: int) -> Tuple[List[float], List[float]]:
+    handshakes, totals = [], []
+    for i in range(turns):
+        start = time.perf_counter()
+        tools = MCPTools(transport="streamable-http", url=url)
+        await tools.connect()
+        handshakes.append(time.perf_counter() - start)
+        await turn(tools, i)
+        await tools.close()
+        totals.append(time.perf_counter() - start)
+    return handshakes, totals
+
+
+async def reused(url: str, turns: int) -> Tuple[List[float], List[float]]:
+    tools = MCPTools(transport="streamable-http", url=url)
+    await tools.connect()
+    handshakes, totals = [], []
+    for i in range(turns):
+        start = time.perf_counter()
+        handshakes.append(0.0)
+        await turn(tools, turns + i)
+        totals.append(time.perf_counter() - start)
+    await tools.close()
+    return handshakes, totals
+
+
+def _row(mode: str, handshakes: List[float], totals: List[float]) -> None:
+    print(
+        f"{mode:>10} {statistics.median(handshakes) * 1000:>14.1f} {max(handshakes) * 1000:>14.1f} "
+        f"{statistics.median(totals) * 1000:>11.1f} {max(totals) * 1000:>11.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake HR API latency (seconds)")
+    parser.add_argument("--hr-port", type=int, default=3401)
+    parser.add_argument("--mcp-port", type=int, default=3400)
+    parser.add_argument("--mcp-url", help="Use a running MCP server instead of starting one")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    load_test = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_load_test.py")
+    env = {**os.environ, "HR_API_URL": f"http://127.0.0.1:{args.hr_port}{HR_PATH}"}
+    processes = [
+        _start(
+            [sys.executable, load_test, "--fake-hr", "--hr-port", str(args.hr_port), "--latency", str(args.latency)],
+            env, args.hr_port,
+        )
+    ]
+    try:
+        url = args.mcp_url
+        if url is None:
+            processes.append(
+                _start(
+                    [sys.executable, "-m", "uvicorn", "app.mcp.mcp_server:app", "--port", str(args.mcp_port),
+                     "--log-level", "warning", "--app-dir", root],
+                    env, args.mcp_port,
+                )
+            )
+            url = f"http://127.0.0.1:{args.mcp_port}/mcp"
+
+        print("=" * 66)
+        print(f"MCP SESSION BENCHMARK ({args.turns} turns, 1 tool call each, HR latency {args.latency}s)")
+        print("=" * 66)
+        print(f"{'mode':>10} {'handshake p50':>14} {'handshake max':>14} {'turn p50':>11} {'turn max':>11}")
+        _row("per-run", *asyncio.run(per_run(url, args.turns)))
+        _row("reused", *asyncio.run(reused(url, args.turns)))
+        print("=" * 66)
+        print("Times in ms.")
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
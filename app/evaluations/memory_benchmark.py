@@ -0,0 +1,198 @@
+"""Benchmark: in-run vs. deferred user-memory extraction (app/memory/deferred.py).
+
+Runs an agent with a LearningMachine (user memory, ALWAYS) against a fake
+OpenAI-compatible server: answers take --answer-latency, each memory extraction
+request (calls that offer the add_memory tool) takes --extract-latency and
+saves one memory. Memories go to a temporary SQLite db. --users users take
+--turns-per-user turns each, interleaved.
+
+- inline:   agno's LearningMachine, extraction inside every run
+- deferred: DeferredLearningMachine + defer_memory_extraction post-hook, the
+            memory worker flushing every --flush-interval seconds
+
+Reports response latency, extraction model calls, memories saved and the
+memory-write lag.
+
+    python app/evaluations/memory_benchmark.py --users 6 --turns-per-user 5
+    python app/evaluations/memory_benchmark.py --flush-interval 2 --extract-latency 1.5
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.agent import Agent
+from agno.db.sqlite import SqliteDb
+from agno.learn import LearningMachine, LearningMode, UserMemoryConfig
+from agno.models.openai import OpenAIChat
+
+from app.config.settings import settings
+from app.evaluations.mcp_load_test import _start
+from app.memory import deferred
+from app.memory.deferred import DeferredLearningMachine, MemoryQueue, defer_memory_extraction
+
+QUESTIONS = [
+    "Halo kak, aku Rina, aku sering susah tidur. Hipnoterapi bisa bantu?",
+    "Aku lebih suka sesi online karena tinggal di Bandung.",
+    "Harga sesinya berapa ya?",
+    "Aku bisanya weekend aja kak.",
+    "Oke, aku mau booking untuk Sabtu depan.",
+]
+
+
+def fake_openai_app(answer_latency: float, extract_latency: float):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    counts = {"answer_calls": 0, "extraction_calls": 0}
+
+    def completion(message: dict, finish_reason: str = "stop"):
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": 0, "message": {"role": "assistant", **message}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": 300, "completion_tokens": 30, "total_tokens": 330},
+        }
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    def stats():
+        return counts
+
+    @app.post("/v1/chat/completions")
+    async def completions(body: dict):
+        tools = [t["function"]["name"] for t in body.get("tools") or []]
+        if "add_memory" not in tools:
+            counts["answer_calls"] += 1
+            await asyncio.sleep(answer_latency)
+            return completion({"content": "Bisa banget kak! Sesi kami bisa online maupun offline."})
+        if body["messages"][-1]["role"] == "tool":
+            return completion({"content": "Memories updated."})
+        counts["extraction_calls"] += 1
+        await asyncio.sleep(extract_latency)
+        call = {"id": f"call_{counts['extraction_calls']}", "type": "function",
+                "function": {"name": "add_memory", "arguments": json.dumps({"memory": "Prefers online weekend sessions"})}}
+        return completion({"content": None, "tool_calls": [call]}, "tool_calls")
+
+    return app
+
+
+async def run_mode(mode: str, args, base_url: str, db: SqliteDb) -> dict:
+    settings.MEMORY_DEFERRED = mode == "deferred"
+    machine = DeferredLearningMachine if mode == "deferred" else LearningMachine
+    model = OpenAIChat(id="fake", base_url=base_url, api_key="fake")
+    agent = Agent(
+        name=f"bench-{mode}",
+        model=model,
+        db=db,
+        learning=machine(model=model, user_memory=UserMemoryConfig(mode=LearningMode.ALWAYS)),
+        post_hooks=[defer_memory_extraction],
+        telemetry=False,
+    )
+    deferred.memory_queue = queue = MemoryQueue()
+    worker = asyncio.create_task(run_worker(queue, args.flush_interval)) if mode == "deferred" else None
+
+    timings: List[float] = []
+    start = time.perf_counter()
+    for turn in range(args.turns_per_user):
+        for user in range(args.users):
+            t0 = time.perf_counter()
+            await agent.arun(QUESTIONS[turn % len(QUESTIONS)], user_id=f"user-{mode}-{user}",
+                             session_id=f"{mode}-{user}-{turn // 2}")
+            timings.append(time.perf_counter() - t0)
+    if worker is not None:
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        while len(queue):
+            await deferred.flush(queue)
+    total = time.perf_counter() - start
+
+    store = agent.get_learning_machine().user_memory_store
+    saved = sum(
+        len((store.get(user_id=f"user-{mode}-{user}") or {}).memories if store.get(user_id=f"user-{mode}-{user}") else [])
+        for user in range(args.users)
+    )
+    stats = queue.stats.to_dict()
+    lag = f"{stats['lag_p50_seconds']:.2f}s / {stats['lag_p99_seconds']:.2f}s" if stats["lag_p50_seconds"] is not None else "0 (in run)"
+    print(
+        f"{mode:<9} {statistics.median(timings) * 1000:>8.0f}ms {statistics.fmean(timings) * 1000:>8.0f}ms "
+        f"{total:>8.1f}s {saved:>9} {lag:>18}"
+    )
+    return stats
+
+
+async def run_worker(queue: MemoryQueue, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        while len(queue):
+            await deferred.flush(queue)
+
+
+async def compare(args, base_url: str, stats_url: str) -> None:
+    import httpx
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # One db for both modes (users differ): agno's SQLite tables share one MetaData per process
+        db = SqliteDb(db_file=os.path.join(tmp, "memories.db"))
+        for mode in ("inline", "deferred"):
+            async with httpx.AsyncClient() as client:
+                before = (await client.get(stats_url)).json()
+            stats = await run_mode(mode, args, base_url, db)
+            async with httpx.AsyncClient() as client:
+                after = (await client.get(stats_url)).json()
+            calls = after["extraction_calls"] - before["extraction_calls"]
+            print(f"{'':<9} extraction model calls: {calls}, {args.users * args.turns_per_user / calls:.2f} turns per call, "
+                  f"{stats['dropped']} turns dropped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=6)
+    parser.add_argument("--turns-per-user", type=int, default=5)
+    parser.add_argument("--answer-latency", type=float, default=0.5)
+    parser.add_argument("--extract-latency", type=float, default=0.8)
+    parser.add_argument("--flush-interval", type=float, default=settings.MEMORY_FLUSH_INTERVAL_SECONDS)
+    parser.add_argument("--port", type=int, default=3404)
+    parser.add_argument("--fake-openai", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_openai:
+        import uvicorn
+
+        uvicorn.run(fake_openai_app(args.answer_latency, args.extract_latency), port=args.port, log_level="warning")
+        return
+
+    server = _start(
+        [sys.executable, __file__, "--fake-openai", "--port", str(args.port),
+         "--answer-latency", str(args.answer_latency), "--extract-latency", str(args.extract_latency)],
+        dict(os.environ), args.port,
+    )
+    try:
+        print("=" * 78)
+        print(f"DEFERRED MEMORY ({args.users} users x {args.turns_per_user} turns, answer {args.answer_latency}s, "
+              f"extraction {args.extract_latency}s, flush every {args.flush_interval}s)")
+        print("=" * 78)
+        print(f"{'mode':<9} {'p50':>10} {'mean':>10} {'total':>9} {'memories':>9} {'write lag p50/p99':>18}")
+        # One event loop for both modes: agno shares its default async HTTP client
+        asyncio.run(compare(args, f"http://127.0.0.1:{args.port}/v1", f"http://127.0.0.1:{args.port}/stats"))
+        print("=" * 78)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
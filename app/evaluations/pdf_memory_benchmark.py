@@ -0,0 +1,148 @@
+"""Peak-RSS benchmark: streaming PDF ingestion vs. eager extraction.
+
+Run `uv pip install agno pdfminer.six pypdf` to install dependencies, then:
+
+    python app/evaluations/pdf_memory_benchmark.py --pages 250 1000 2000
+
+Each measurement runs in a fresh subprocess so `ru_maxrss` reflects only that run.
+Embedding is replaced by a no-op sink so the numbers isolate reading + chunking.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+WORDS = (
+    "karyawan cuti gaji departemen kinerja pelatihan absensi evaluasi manajer "
+    "tim proyek laporan jadwal kebijakan hak kewajiban kantor rapat target"
+).split()
+
+
+def write_synthetic_pdf(path: str, num_pages: int, lines_per_page: int = 45) -> None:
+    """Write a text-only PDF page by page (the generator itself is streaming too)."""
+    rng = random.Random(42)
+    offsets = []
+
+    with open(path, "wb") as fh:
+        def write_obj(obj_id: int, body: bytes) -> None:
+            offsets.append((obj_id, fh.tell()))
+            fh.write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        fh.write(b"%PDF-1.4\n")
+        # 1: catalog, 2: pages, 3: font, then (page, content) pairs from 4
+        page_ids = [4 + 2 * i for i in range(num_pages)]
+        write_obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode()
+        write_obj(2, b"<< /Type /Pages /Kids [" + kids + b"] /Count " + str(num_pages).encode() + b" >>")
+        write_obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+        for page_id in page_ids:
+            lines = []
+            for _ in range(lines_per_page):
+                lines.append(" ".join(rng.choice(WORDS) for _ in range(12)) + ".")
+            text_ops = ["BT /F1 10 Tf 40 800 Td 12 TL"]
+            text_ops += [f"({line}) Tj T*" for line in lines]
+            text_ops.append("ET")
+            stream = "\n".join(text_ops).encode()
+
+            write_obj(
+                page_id,
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                b"/Resources << /Font << /F1 3 0 R >> >> /Contents "
+                + str(page_id + 1).encode() + b" 0 R >>",
+            )
+            write_obj(
+                page_id + 1,
+                b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+            )
+
+        xref_offset = fh.tell()
+        total = 4 + 2 * num_pages
+        fh.write(f"xref\n0 {total}\n".encode())
+        fh.write(b"0000000000 65535 f \n")
+        for _, offset in sorted(offsets):
+            fh.write(f"{offset:010d} 00000 n \n".encode())
+        fh.write(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(mode: str, pdf_path: str) -> dict:
+    from pipelines.streaming_pdf import chunk_pages, iter_batches, iter_pdf_pages
+
+    # Import both PDF libraries up front so the baseline excludes module import cost
+    import pdfminer.pdfpage  # noqa: F401
+    from pypdf import PdfReader
+
+    baseline_mb = _peak_rss_mb()
+    start = time.perf_counter()
+    chunks = 0
+
+    if mode == "streaming":
+        documents = chunk_pages(iter_pdf_pages(pdf_path), name="synthetic")
+        for batch in iter_batches(documents, batch_size=32):
+            chunks += len(batch)  # no-op embedding sink
+    else:
+        # What agno's PDFReader does: extract the whole document with pypdf, then chunk
+        reader = PdfReader(pdf_path)
+        pages = [(i + 1, page.extract_text() or "") for i, page in enumerate(reader.pages)]
+        documents = list(chunk_pages(iter(pages), name="synthetic"))
+        chunks = len(documents)
+
+    return {
+        "mode": mode,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - start, 2),
+        "baseline_rss_mb": round(baseline_mb, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[250, 1000, 2000])
+    parser.add_argument("--modes", nargs="+", default=["streaming", "eager"])
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PDF_PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(*args.worker)))
+        return
+
+    print("=" * 80)
+    print("PDF INGESTION MEMORY BENCHMARK")
+    print("=" * 80)
+    print(f"{'pages':>6} {'mode':>10} {'chunks':>8} {'seconds':>8} {'peak RSS MB':>12} {'delta MB':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_pages in args.pages:
+            pdf_path = os.path.join(tmp, f"synthetic_{num_pages}.pdf")
+            write_synthetic_pdf(pdf_path, num_pages)
+
+            for mode in args.modes:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, pdf_path],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                delta = r["peak_rss_mb"] - r["baseline_rss_mb"]
+                print(f"{num_pages:>6} {mode:>10} {r['chunks']:>8} {r['seconds']:>8} {r['peak_rss_mb']:>12} {delta:>9.1f}")
+
+    print("=" * 80)
+    print("Streaming delta should stay flat as pages grow; eager grows with page count.")
+
+
+if __name__ == "__main__":
+    main()
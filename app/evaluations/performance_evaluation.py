@@ -4,10 +4,9 @@ import os
 import sys
 import time
 from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from sql_agent import sql_agent
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.models.admission import AdmittedChat, background
 
 
 TEST_CASES = [
@@ -40,7 +39,7 @@ EXPECTED_OUTPUT_SQL_PATTERN = [
 # 🔥 Evaluator Agent
 evaluator_agent = Agent(
     name="SQL Evaluator",
-    model=OpenAIChat(id="gpt-4o-mini"),
+    model=AdmittedChat(id="gpt-4o-mini"),
     instructions="""
 You are a strict SQL evaluator.
 
@@ -65,7 +64,36 @@ Return JSON:
 )
 
 
+def evaluate(question: str, expected_sql: str, agent_output: str):
+    """Judge one answer; returns (raw evaluation, score, pass)."""
+    eval_prompt = f"""
+User Question:
+{question}
+
+Expected SQL Pattern:
+{expected_sql}
+
+Agent Output:
+{agent_output}
+
+Evaluate correctness.
+"""
+
+    eval_response = evaluator_agent.run(eval_prompt)
+    evaluation = eval_response.content
+
+    # Parse score from evaluation (assuming JSON response)
+    try:
+        import json
+        eval_data = json.loads(evaluation)
+        return evaluation, eval_data.get("score", 0), eval_data.get("pass", False)
+    except:
+        return evaluation, 0, False
+
+
 def run_single_iteration():
+    from app.agents.sql_agent import sql_agent
+
     agent = sql_agent
     results = []
     total_time = 0
@@ -94,39 +122,15 @@ def run_single_iteration():
         print(f"⏱️  Execution Time: {elapsed_time:.2f}s")
 
         # Run evaluator
-        eval_prompt = f"""
-User Question:
-{question}
-
-Expected SQL Pattern:
-{expected_sql}
-
-Agent Output:
-{agent_output}
-
-Evaluate correctness.
-"""
-
-        eval_response = evaluator_agent.run(eval_prompt)
-        evaluation = eval_response.content
+        evaluation, score, pass_status = evaluate(question, expected_sql, agent_output)
 
         print(f"\n📊 Evaluation:\n{evaluation}")
 
         # Track metrics
         total_time += elapsed_time
-        
-        # Parse score from evaluation (assuming JSON response)
-        try:
-            import json
-            eval_data = json.loads(evaluation)
-            score = eval_data.get("score", 0)
-            pass_status = eval_data.get("pass", False)
-            total_score += score
-            if pass_status:
-                passed += 1
-        except:
-            score = 0
-            pass_status = False
+        total_score += score
+        if pass_status:
+            passed += 1
 
         results.append({
             "test_number": i,
@@ -154,4 +158,7 @@ Evaluate correctness.
 
 
 if __name__ == "__main__":
-    results = run_single_iteration()
\ No newline at end of file
+    # Caps this process's evaluation calls at MODEL_BACKGROUND_MAX_CONCURRENCY;
+    # admission is per process, so they do not queue behind the server (app/models/admission.py)
+    with background():
+        results = run_single_iteration()
\ No newline at end of file
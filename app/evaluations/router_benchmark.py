@@ -0,0 +1,158 @@
+"""Benchmark: routing accuracy and latency of the intent router (app/services/intent_router.py).
+
+Routes labelled questions that are not router exemplars: the Indonesian SQL
+test questions from performance_evaluation.TEST_CASES (sql-agent), plus
+Houpe business and leave balance questions. Reports per-agent accuracy,
+fallback rate, confusion and routing latency (p50/p99 over --repeat passes).
+
+    python app/evaluations/router_benchmark.py
+    python app/evaluations/router_benchmark.py --k 3 --min-similarity 0.1 --min-margin 0.0
+
+--dispatch then posts one question per agent id to POST /route/dispatch
+(app/orchestrator/intent_routes.py) with the registry's agents, their model
+pointed at a fake OpenAI-compatible server, and checks the run came from the
+agent the router chose. Starts the MCP server on port 3333 for the leave
+agent. Needs uvicorn.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.config.settings import settings
+from app.evaluations.mcp_load_test import _start
+from app.evaluations.performance_evaluation import TEST_CASES
+from app.services.intent_router import IntentRouter
+
+# (question, expected agent id)
+QUESTIONS: List[Tuple[str, str]] = [
+    *[(question, "sql-agent") for question in TEST_CASES],
+    ("Departemen mana yang turnover karyawannya paling tinggi?", "sql-agent"),
+    ("Tampilkan 5 karyawan dengan rating performa terendah", "sql-agent"),
+    ("Kak, hipnoterapi bisa bantu fobia ketinggian nggak?", "houpe-agentic"),
+    ("Biaya satu kali sesi terapi di Houpe berapa ya kak?", "houpe-agentic"),
+    ("Alamat klinik Houpe di mana?", "houpe-agentic"),
+    ("Hipnoterapi ada efek sampingnya nggak kak?", "houpe-agentic"),
+    ("Bisa daftar konsultasi buat hari Sabtu?", "houpe-agentic"),
+    ("Aku sering panik, hipnoterapi cocok buat aku?", "houpe-agentic"),
+    ("Ada paket terapi untuk pasangan?", "houpe-agentic"),
+    ("Apakah terapinya bisa lewat Zoom?", "houpe-agentic"),
+    ("Sisa cuti saya tanggal 2025-08-01 berapa?", "leave-agent"),
+    ("Jatah cuti tahunan saya tinggal berapa hari lagi?", "leave-agent"),
+    ("Saya mau ambil cuti 3 hari, saldonya masih cukup?", "leave-agent"),
+    ("Berapa hari cuti yang bisa saya ambil bulan ini?", "leave-agent"),
+    ("Cek sisa cuti saya dong", "leave-agent"),
+    ("How many vacation days do I still have?", "leave-agent"),
+    ("Cuti saya hangus kapan?", "leave-agent"),
+    ("Total cuti yang sudah saya pakai tahun ini berapa?", "leave-agent"),
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def check_dispatch(port: int) -> bool:
+    """One /route/dispatch per agent id; True when every run came from the routed agent."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.evaluations.memory_benchmark import fake_openai_app
+    from app.orchestrator.intent_routes import build_intent_router
+
+    if "--fake-openai" in sys.argv:
+        import uvicorn
+
+        uvicorn.run(fake_openai_app(0.0, 0.0), port=port, log_level="warning")
+        return True
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    servers = [
+        _start([sys.executable, __file__, "--fake-openai", "--port", str(port)], dict(os.environ), port),
+        # The leave agent lists its tools from the MCP server at localhost:3333
+        _start([sys.executable, "-m", "uvicorn", "app.mcp.mcp_server:app", "--port", "3333", "--log-level", "warning",
+                "--app-dir", root], dict(os.environ), 3333),
+    ]
+    # Agents are built on first registry.get, after this
+    settings.RUNPOD_BASE_URL = f"http://127.0.0.1:{port}/v1"
+    settings.RUNPOD_API_KEY = "fake"
+    app = FastAPI()
+    app.include_router(build_intent_router())
+    passed = True
+    try:
+        print("=" * 100)
+        print("DISPATCH")
+        with TestClient(app) as client:
+            for agent_id in ("sql-agent", "houpe-agentic", "leave-agent"):
+                question = next(q for q, expected in QUESTIONS if expected == agent_id)
+                response = client.post("/route/dispatch", json={"message": question})
+                body = response.json()
+                ok = response.status_code == 200 and body.get("agent_id") == agent_id == body["route"]["agent_id"]
+                passed &= ok
+                detail = f"run status {body.get('status')}" if response.status_code == 200 else body.get("detail")
+                print(f"{agent_id:<14} HTTP {response.status_code} {'ok' if ok else 'FAILED'}  {detail}")
+    finally:
+        for server in servers:
+            server.terminate()
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=settings.ROUTER_K)
+    parser.add_argument("--min-similarity", type=float, default=settings.ROUTER_MIN_SIMILARITY)
+    parser.add_argument("--min-margin", type=float, default=settings.ROUTER_MIN_MARGIN)
+    parser.add_argument("--repeat", type=int, default=50, help="Routing passes over the questions for latency")
+    parser.add_argument("--dispatch", action="store_true", help="Also check POST /route/dispatch for every agent id")
+    parser.add_argument("--port", type=int, default=3410)
+    parser.add_argument("--fake-openai", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_openai:
+        check_dispatch(args.port)
+        return
+
+    start = time.perf_counter()
+    router = IntentRouter(k=args.k, min_similarity=args.min_similarity, min_margin=args.min_margin)
+    print(f"Router built from {len(router.labels)} exemplars in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    routes = [(question, expected, router.route(question)) for question, expected in QUESTIONS]
+    latencies = [router.route(question).seconds for _ in range(args.repeat) for question, _ in QUESTIONS]
+
+    print("=" * 100)
+    print(f"{'expected':<14} {'routed':<14} {'fallback':>8} {'score':>6}  question")
+    print("=" * 100)
+    for question, expected, route in routes:
+        mark = "" if route.agent_id == expected else "  <-- wrong"
+        print(
+            f"{expected:<14} {route.agent_id:<14} {'yes' if route.fallback else 'no':>8} "
+            f"{route.scores[route.agent_id]:>6.3f}  {question[:50]}{mark}"
+        )
+
+    print("=" * 100)
+    for agent in router.exemplars:
+        rows = [r for r in routes if r[1] == agent]
+        correct = sum(r[2].agent_id == agent for r in rows)
+        print(f"{agent:<14} accuracy {correct}/{len(rows)} ({correct / len(rows):.0%})")
+    correct = sum(r[2].agent_id == r[1] for r in routes)
+    fallbacks = sum(r[2].fallback for r in routes)
+    confusion = Counter((r[1], r[2].agent_id) for r in routes if r[2].agent_id != r[1])
+    print(f"{'overall':<14} accuracy {correct}/{len(routes)} ({correct / len(routes):.0%}), fallback {fallbacks}")
+    if confusion:
+        print("Misroutes: " + ", ".join(f"{a} -> {b} x{n}" for (a, b), n in confusion.items()))
+    print(
+        f"Routing latency over {len(latencies)} calls: p50 {statistics.median(latencies) * 1000:.3f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.3f} ms, max {max(latencies) * 1000:.3f} ms"
+    )
+    if args.dispatch and not check_dispatch(args.port):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
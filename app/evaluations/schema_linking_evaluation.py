@@ -0,0 +1,134 @@
+"""Schema linking evaluation: prompt tokens and accuracy, full semantic model vs. linked schema.
+
+Uses the TEST_CASES of performance_evaluation.py.
+
+Retrieval (default, embeddings only, no chat model):
+    python app/evaluations/schema_linking_evaluation.py
+  per question: schema tokens (full semantic model vs. linked tables/columns) and
+  recall/precision of the linked tables against EXPECTED_TABLES
+
+End-to-end (--judge, runs the SQL Agent twice in separate processes):
+    python app/evaluations/schema_linking_evaluation.py --judge
+  per mode: judge pass rate and average score (performance_evaluation.evaluate)
+  and the agent's average input tokens per question
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.utils.tokens import count_text_tokens
+
+from app.evaluations.performance_evaluation import EXPECTED_OUTPUT_SQL_PATTERN, TEST_CASES
+
+# Tables a correct answer needs, aligned with TEST_CASES
+EXPECTED_TABLES = [
+    {"employees", "departments"},
+    {"employees", "departments"},
+    {"salary_history"},
+    {"employees"},
+    {"employees"},
+    {"attendance"},
+    {"employees", "salary_history"},
+    {"training_history", "employees", "departments"},
+    {"employees", "performance_reviews"},
+    {"training_history"},
+]
+
+
+def run_retrieval() -> None:
+    from app.services.schema_index import get_schema_index
+    from app.services.semantic_model import SEMANTIC_MODEL_STR
+
+    index = get_schema_index()
+    start = time.perf_counter()
+    index.refresh()
+    print(f"Index built: {len(index.tables)} tables in {time.perf_counter() - start:.2f}s")
+    full_tokens = count_text_tokens(SEMANTIC_MODEL_STR, "gpt-4o")
+
+    print("=" * 96)
+    print(f"{'#':>2} {'full':>6} {'linked':>7} {'recall':>7} {'prec':>6}  linked tables")
+    print("=" * 96)
+    linked_total, recall_total, precision_total = 0, 0.0, 0.0
+    for i, (question, expected) in enumerate(zip(TEST_CASES, EXPECTED_TABLES), 1):
+        link = index.link(question)
+        tokens = count_text_tokens(link.to_text(), "gpt-4o")
+        found = set(link.table_names)
+        recall = len(found & expected) / len(expected)
+        precision = len(found & expected) / len(found) if found else 0.0
+        linked_total += tokens
+        recall_total += recall
+        precision_total += precision
+        missing = f"  (missing: {', '.join(sorted(expected - found))})" if expected - found else ""
+        print(f"{i:>2} {full_tokens:>6} {tokens:>7} {recall:>7.2f} {precision:>6.2f}  {', '.join(link.table_names)}{missing}")
+
+    n = len(TEST_CASES)
+    print("=" * 96)
+    print(f"Schema tokens per question: full {full_tokens}, linked {linked_total / n:.0f} "
+          f"({1 - linked_total / n / full_tokens:.0%} fewer)")
+    print(f"Table recall {recall_total / n:.2f}, precision {precision_total / n:.2f}")
+
+    # Incremental rebuild: touching one file re-embeds only that file
+    path = next(iter(sorted(index.knowledge_dir.glob("*.json"))))
+    before = index.rebuilds
+    os.utime(path)
+    index.refresh()
+    print(f"Touched {path.name}: {index.rebuilds - before} file(s) re-embedded")
+
+
+def worker(mode: str) -> None:
+    """Run the SQL Agent over TEST_CASES with schema linking on/off (env set by the parent)."""
+    from app.agents.sql_agent import sql_agent
+    from app.evaluations.performance_evaluation import evaluate
+
+    scores, passed, input_tokens = [], 0, []
+    for question, expected_sql in zip(TEST_CASES, EXPECTED_OUTPUT_SQL_PATTERN):
+        response = sql_agent.run(question)
+        _, score, pass_status = evaluate(question, expected_sql, response.content)
+        scores.append(score)
+        passed += bool(pass_status)
+        if response.metrics is not None:
+            input_tokens.append(response.metrics.input_tokens)
+    print(json.dumps({
+        "mode": mode,
+        "passed": passed,
+        "avg_score": sum(scores) / len(scores),
+        "avg_input_tokens": sum(input_tokens) / len(input_tokens) if input_tokens else None,
+    }))
+
+
+def run_judge() -> None:
+    print("=" * 64)
+    print(f"{'mode':>8} {'passed':>8} {'avg score':>10} {'input tokens':>13}")
+    print("=" * 64)
+    for mode, linking in (("full", "false"), ("linked", "true")):
+        env = {**os.environ, "SQL_SCHEMA_LINKING": linking}
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", mode], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        tokens = f"{result['avg_input_tokens']:.0f}" if result["avg_input_tokens"] is not None else "-"
+        print(f"{mode:>8} {result['passed']:>5}/{len(TEST_CASES):<2} {result['avg_score']:>10.2f} {tokens:>13}")
+    print("=" * 64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--judge", action="store_true", help="Run the SQL Agent with and without schema linking")
+    parser.add_argument("--worker", choices=["full", "linked"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+    elif args.judge:
+        run_judge()
+    else:
+        run_retrieval()
+
+
+if __name__ == "__main__":
+    main()
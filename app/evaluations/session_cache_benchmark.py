@@ -0,0 +1,186 @@
+"""Benchmark: per-turn db time with and without the session cache (app/database/session_cache.py).
+
+Runs an agent with history (add_history_to_context) and user-memory recall
+(DeferredLearningMachine) against a fake OpenAI-compatible server answering in
+--model-latency seconds. Sessions and learnings go to a temporary SQLite db
+whose every statement pays --rtt-ms, standing in for the network round trip to
+Postgres. --users users take --turns-per-user turns each, interleaved.
+
+- plain:   agno SqliteDb, every read and write on the request path
+- through: the same db with SessionCacheMixin, session writes going through
+           (SESSION_CACHE_INVALIDATION="notify", workers without stickiness)
+- behind:  SessionCacheMixin with write-behind (sticky sessions), dirty
+           sessions flushed every --flush-interval seconds from a background task
+
+Reports db statements and db time per turn on the request path (the event loop
+thread) and, for write-behind, the statements of the background flushes; then
+checks that every run reached the table.
+
+    python app/evaluations/session_cache_benchmark.py --users 8 --turns-per-user 6
+    python app/evaluations/session_cache_benchmark.py --rtt-ms 5 --flush-interval 0.5
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.agent import Agent
+from agno.db.base import SessionType
+from agno.db.sqlite import SqliteDb
+from agno.learn import LearningMode, UserMemoryConfig
+from agno.models.openai import OpenAIChat
+from sqlalchemy import event
+
+from app.config.settings import settings
+from app.database.session_cache import SessionCacheMixin
+from app.evaluations.mcp_load_test import _start
+from app.evaluations.memory_benchmark import QUESTIONS, fake_openai_app
+from app.memory.deferred import DeferredLearningMachine
+
+
+class CachedSqliteDb(SessionCacheMixin, SqliteDb):
+    pass
+
+
+class StatementClock:
+    """Counts statements and their time per thread, sleeping `rtt` before each one."""
+
+    def __init__(self, engine, rtt: float):
+        self.rtt = rtt
+        self.count: Dict[int, int] = defaultdict(int)
+        self.seconds: Dict[int, float] = defaultdict(float)
+        self._started = threading.local()
+        event.listen(engine, "before_cursor_execute", self.before)
+        event.listen(engine, "after_cursor_execute", self.after)
+
+    def before(self, *args) -> None:
+        self._started.at = time.perf_counter()
+        time.sleep(self.rtt)
+
+    def after(self, *args) -> None:
+        thread = threading.get_ident()
+        self.count[thread] += 1
+        self.seconds[thread] += time.perf_counter() - self._started.at
+
+    def snapshot(self, thread: int):
+        return self.count[thread], self.seconds[thread]
+
+    def background(self, thread: int):
+        return (sum(c for t, c in self.count.items() if t != thread),
+                sum(s for t, s in self.seconds.items() if t != thread))
+
+
+async def run_mode(mode: str, args, base_url: str, db: SqliteDb, clock: StatementClock) -> None:
+    model = OpenAIChat(id="fake", base_url=base_url, api_key="fake")
+    agent = Agent(
+        name=f"bench-{mode}",
+        model=model,
+        db=db,
+        learning=DeferredLearningMachine(model=model, user_memory=UserMemoryConfig(mode=LearningMode.ALWAYS)),
+        add_history_to_context=True,
+        num_history_runs=3,
+        telemetry=False,
+    )
+    flusher = asyncio.create_task(run_flusher(db, args.flush_interval)) if mode == "behind" else None
+
+    loop_thread = threading.get_ident()
+    statements: List[int] = []
+    db_ms: List[float] = []
+    latency: List[float] = []
+    for turn in range(args.turns_per_user):
+        for user in range(args.users):
+            count, seconds = clock.snapshot(loop_thread)
+            start = time.perf_counter()
+            await agent.arun(QUESTIONS[turn % len(QUESTIONS)], user_id=f"{mode}-user-{user}", session_id=f"{mode}-{user}")
+            latency.append(time.perf_counter() - start)
+            after_count, after_seconds = clock.snapshot(loop_thread)
+            statements.append(after_count - count)
+            db_ms.append((after_seconds - seconds) * 1000)
+    if flusher is not None:
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        await asyncio.to_thread(db.flush_all)
+
+    # Skip the first turn of every user (session creation, table checks)
+    warm = slice(args.users, None)
+    print(
+        f"{mode:<7} {statistics.fmean(statements[warm]):>11.1f} {statistics.fmean(db_ms[warm]):>9.1f}ms "
+        f"{statistics.median(db_ms[warm]):>9.1f}ms {statistics.median(latency[warm]) * 1000:>10.0f}ms",
+        end="",
+    )
+    if mode == "behind":
+        count, seconds = clock.background(loop_thread)
+        stats = db.cache_stats.to_dict()
+        print(f"   background: {count} statements, {seconds:.2f}s, {stats['flushes']} flushes, "
+              f"{stats['flushed']} rows for {stats['writes']} writes, hit rate {stats['hit_rate']}")
+    else:
+        print()
+
+    runs = 0
+    for user in range(args.users):
+        session = SqliteDb.get_session(db, session_id=f"{mode}-{user}", session_type=SessionType.AGENT)
+        runs += len(session.runs or []) if session else 0
+    print(f"{'':<7} runs in the table: {runs}/{args.users * args.turns_per_user}")
+
+
+async def run_flusher(db: CachedSqliteDb, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(db.flush_all)
+
+
+async def compare(args, base_url: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("plain", "through", "behind"):
+            db_file = os.path.join(tmp, f"{mode}.db")
+            db = SqliteDb(db_file=db_file) if mode == "plain" else CachedSqliteDb(db_file=db_file, write_behind=mode == "behind")
+            clock = StatementClock(db.db_engine, args.rtt_ms / 1000)
+            await run_mode(mode, args, base_url, db, clock)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--turns-per-user", type=int, default=6)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--flush-interval", type=float, default=settings.SESSION_FLUSH_INTERVAL_SECONDS)
+    parser.add_argument("--port", type=int, default=3406)
+    parser.add_argument("--fake-openai", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_openai:
+        import uvicorn
+
+        uvicorn.run(fake_openai_app(args.model_latency, args.model_latency), port=args.port, log_level="warning")
+        return
+
+    server = _start(
+        [sys.executable, __file__, "--fake-openai", "--port", str(args.port), "--model-latency", str(args.model_latency)],
+        dict(os.environ), args.port,
+    )
+    try:
+        print("=" * 78)
+        print(f"SESSION CACHE ({args.users} users x {args.turns_per_user} turns, {args.rtt_ms} ms per statement, "
+              f"flush every {args.flush_interval}s)")
+        print("=" * 78)
+        print(f"{'mode':<7} {'stmts/turn':>11} {'db mean':>11} {'db p50':>11} {'turn p50':>12}")
+        # One event loop for both modes: agno shares its default async HTTP client
+        asyncio.run(compare(args, f"http://127.0.0.1:{args.port}/v1"))
+        print("=" * 78)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark: inline vs. speculative pre-hooks (app/hooks/speculative.py).
+
+Runs a SpeculativeAgent against a fake OpenAI-compatible chat endpoint with a
+fixed latency, guarded by a simulated guardrail hook (sleeps, then rejects
+questions marked off-topic), once with SPECULATIVE_PRE_HOOKS off (hooks inline
+before the model) and once on. Reports per-turn latency for accepted and
+rejected questions and the time saved / wasted counters, then checks the
+session (a temporary SQLite db) holds no rejected run that later turns would
+see as history (status other than error);
+with --model-latency under --hook-latency the model finishes before the
+guardrail rejects.
+
+    python app/evaluations/speculative_benchmark.py --turns 40 --model-latency 0.8 --hook-latency 0.6
+    python app/evaluations/speculative_benchmark.py --model-latency 0.2 --hook-latency 0.4
+    python app/evaluations/speculative_benchmark.py --real-guardrail   # validate_out_of_context, needs OPENAI_API_KEY
+
+Needs uvicorn.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agno.db.sqlite import SqliteDb
+from agno.exceptions import CheckTrigger, InputCheckError
+from agno.models.openai import OpenAIChat
+from agno.run.agent import RunInput
+from agno.run.base import RunStatus
+
+from app.config.settings import settings
+from app.evaluations.mcp_load_test import _start
+from app.hooks.speculative import SpeculativeAgent, speculation_stats
+
+ON_TOPIC = "How many leave days do I have left on 2025-0{}-01?"
+OFF_TOPIC = "Write me a poem about the ocean, version {} [off-topic]"
+
+
+def fake_openai_app(latency: float):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    @app.post("/v1/chat/completions")
+    async def completions(body: dict):
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "You have 9 days left."}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 8, "total_tokens": 108},
+        }
+
+    return app
+
+
+def simulated_guardrail(latency: float):
+    def validate(run_input: RunInput) -> None:
+        time.sleep(latency)
+        if "[off-topic]" in run_input.input_content_string():
+            raise InputCheckError("Out of scope", check_trigger=CheckTrigger.INPUT_NOT_ALLOWED)
+
+    return validate
+
+
+async def run_turns(agent: SpeculativeAgent, questions: List[str]) -> Dict[str, List[float]]:
+    timings: Dict[str, List[float]] = {"accepted": [], "rejected": []}
+    for question in questions:
+        start = time.perf_counter()
+        output = await agent.arun(question, stream=False, session_id=f"{agent.name}-session")
+        elapsed = time.perf_counter() - start
+        timings["rejected" if output.status == RunStatus.error else "accepted"].append(elapsed)
+    return timings
+
+
+async def compare(hook, questions: List[str], port: int, db_dir: str) -> None:
+    for mode, enabled in (("inline", False), ("speculative", True)):
+        settings.SPECULATIVE_PRE_HOOKS = enabled
+        agent = SpeculativeAgent(
+            name=f"bench-{mode}",
+            model=OpenAIChat(id="fake", base_url=f"http://127.0.0.1:{port}/v1", api_key="fake"),
+            db=SqliteDb(db_file=os.path.join(db_dir, f"{mode}.db")),
+            add_history_to_context=True,
+            speculative_hooks=[hook],
+            telemetry=False,
+        )
+        timings = await run_turns(agent, questions)
+        stats = speculation_stats.get(agent.name)
+        summary = stats.to_dict() if stats else {"avg_saved_ms": 0.0, "avg_wasted_ms": 0.0}
+        print(
+            f"{mode:<12} {statistics.median(timings['accepted']) * 1000:>11.0f}ms "
+            f"{statistics.median(timings['rejected']) * 1000 if timings['rejected'] else 0:>11.0f}ms "
+            f"{summary['avg_saved_ms']:>13.0f} {summary['avg_wasted_ms']:>19.0f}"
+        )
+        session = agent.get_session(session_id=f"{agent.name}-session")
+        runs = (session.runs if session else None) or []
+        leaked = sum("[off-topic]" in run.input.input_content_string() and run.status != RunStatus.error for run in runs)
+        print(f"{'':<12} session: {len(runs)} runs stored, {leaked} rejected runs in the history")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--off-topic-every", type=int, default=5, help="Every Nth question is off-topic")
+    parser.add_argument("--model-latency", type=float, default=0.8, help="Fake model latency (seconds)")
+    parser.add_argument("--hook-latency", type=float, default=0.6, help="Simulated guardrail latency (seconds)")
+    parser.add_argument("--real-guardrail", action="store_true", help="Use validate_out_of_context")
+    parser.add_argument("--port", type=int, default=3402)
+    parser.add_argument("--fake-openai", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_openai:
+        import uvicorn
+
+        uvicorn.run(fake_openai_app(args.model_latency), port=args.port, log_level="warning")
+        return
+
+    if args.real_guardrail:
+        from app.hooks.pre_hooks import validate_out_of_context as hook
+    else:
+        hook = simulated_guardrail(args.hook_latency)
+
+    server = _start(
+        [sys.executable, __file__, "--fake-openai", "--port", str(args.port), "--model-latency", str(args.model_latency)],
+        dict(os.environ), args.port,
+    )
+    questions = [
+        OFF_TOPIC.format(i) if (i + 1) % args.off_topic_every == 0 else ON_TOPIC.format(i % 9 + 1)
+        for i in range(args.turns)
+    ]
+    try:
+        print("=" * 78)
+        print(f"SPECULATIVE PRE-HOOKS ({args.turns} turns, model {args.model_latency}s, hook "
+              f"{'validate_out_of_context' if args.real_guardrail else f'{args.hook_latency}s'})")
+        print("=" * 78)
+        print(f"{'mode':<12} {'accepted p50':>13} {'rejected p50':>13} {'saved ms/run':>13} {'wasted ms/rejected':>19}")
+        # One event loop for both modes: agno shares its default async HTTP client
+        with tempfile.TemporaryDirectory() as db_dir:
+            asyncio.run(compare(hook, questions, args.port, db_dir))
+        print("=" * 78)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
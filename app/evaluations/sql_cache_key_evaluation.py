@@ -0,0 +1,47 @@
+"""Check: SQL result cache keys (app/tools/sql_cache.py).
+
+Queries that only differ in whitespace or keyword/identifier case must share a
+cache entry; queries Postgres evaluates differently must not. Integer vs.
+numeric literals are the trap: `SUM(work_hours)/3` is integer division,
+`SUM(work_hours)/3.0` is numeric.
+
+    python app/evaluations/sql_cache_key_evaluation.py
+
+Exits 1 if any pair is keyed wrongly. Needs no database.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.tools.sql_cache import cache_key
+
+SAME = [
+    ("SELECT COUNT(*) FROM attendance", "select   count(*)\nFROM Attendance"),
+    ("SELECT status FROM attendance WHERE status = 'Late'", "SELECT status\n  FROM attendance\n WHERE status = 'Late'"),
+]
+
+DIFFERENT = [
+    ("SELECT SUM(work_hours)/3.0 FROM attendance", "SELECT SUM(work_hours)/3 FROM attendance"),
+    ("SELECT COUNT(*)*1.0/7 FROM attendance", "SELECT COUNT(*)*1/7 FROM attendance"),
+    ("SELECT status FROM attendance WHERE status = 'Late'", "SELECT status FROM attendance WHERE status = 'late'"),
+]
+
+
+def main() -> None:
+    failures = 0
+    for expected, pairs in (("same key", SAME), ("different keys", DIFFERENT)):
+        for a, b in pairs:
+            same = cache_key(a, 50) == cache_key(b, 50)
+            ok = same == (expected == "same key")
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {expected:<15} {' '.join(a.split())!r} vs {' '.join(b.split())!r}")
+    if cache_key("SELECT COUNT(*) FROM attendance", 50) == cache_key("SELECT COUNT(*) FROM attendance", 100):
+        failures += 1
+        print("FAIL different keys   row limit 50 vs 100")
+    print(f"{failures} failure(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
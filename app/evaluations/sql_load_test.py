@@ -0,0 +1,128 @@
+"""Load test: SQL Agent tool throughput, sync thread-per-session vs. async pool.
+
+Simulates N concurrent SQL Agent sessions. Each session runs several reasoning
+steps, and every step issues the same three independent queries the agent
+typically needs (a headcount, an aggregate and a detail lookup):
+
+- sync:  GovernedSQLTools.run_sql_queries in a thread per session (what a blocking
+         toolkit costs under AgentOS), queries within a step run one after another
+- async: GovernedSQLTools.arun_sql_queries on the shared asyncpg pool, queries
+         within a step run concurrently
+
+Uses the `attendance_bench` table from sql_result_benchmark.py (created if missing):
+
+    python app/evaluations/sql_load_test.py --sessions 50 --steps 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from sqlalchemy import create_engine, text
+
+from app.config.settings import settings
+from app.evaluations.sql_result_benchmark import TABLE, create_table
+
+EMPLOYEE_IDS = list(range(1, 51))
+
+
+def step_queries(rng: random.Random) -> List[str]:
+    employee_id = rng.choice(EMPLOYEE_IDS)
+    return [
+        f"SELECT COUNT(*) AS days FROM {TABLE} WHERE employee_id = {employee_id} AND status = 'Late'",
+        f"SELECT status, ROUND(AVG(work_hours), 2) AS avg_hours FROM {TABLE} WHERE employee_id = {employee_id} GROUP BY status",
+        f"SELECT attendance_date, check_in_time, status FROM {TABLE} WHERE employee_id = {employee_id} ORDER BY attendance_date DESC LIMIT 10",
+    ]
+
+
+def _summary(mode: str, latencies: List[float], seconds: float, queries: int, errors: int) -> None:
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(
+        f"{mode:>6} {queries:>8} {seconds:>8.2f} {queries / seconds:>9.1f} "
+        f"{statistics.median(latencies) * 1000:>9.1f} {p95 * 1000:>9.1f} {errors:>7}"
+    )
+
+
+def run_sync(make_tools: Callable, sessions: int, steps: int) -> None:
+    tools = make_tools()
+    latencies: List[float] = []
+    errors = 0
+
+    def session(seed: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed)
+        for _ in range(steps):
+            start = time.perf_counter()
+            output = tools.run_sql_queries(step_queries(rng), limit=10)
+            latencies.append(time.perf_counter() - start)
+            errors += output.count("Error running query")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    _summary("sync", latencies, time.perf_counter() - start, sessions * steps * 3, errors)
+
+
+async def run_async(make_tools: Callable, sessions: int, steps: int) -> None:
+    from app.database.sql_pool import close_sql_pool, get_sql_pool
+
+    tools = make_tools()
+    await get_sql_pool()  # exclude pool creation from the measurement
+    latencies: List[float] = []
+    errors = 0
+
+    async def session(seed: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed)
+        for _ in range(steps):
+            start = time.perf_counter()
+            output = await tools.arun_sql_queries(step_queries(rng), limit=10)
+            latencies.append(time.perf_counter() - start)
+            errors += output.count("Error running query")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(seed) for seed in range(sessions)))
+    _summary("async", latencies, time.perf_counter() - start, sessions * steps * 3, errors)
+    await close_sql_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=settings.POSTGRES_URL_DUMMY_DATA)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    from app.tools.sql_tools import GovernedSQLTools
+
+    create_table(args.db_url, args.rows)
+    with create_engine(args.db_url).begin() as conn:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {TABLE}_employee_idx ON {TABLE} (employee_id)"))
+
+    def make_tools() -> GovernedSQLTools:
+        # No result cache: every query must reach Postgres
+        return GovernedSQLTools(db_url=args.db_url)
+
+    print("=" * 64)
+    print(f"SQL TOOL LOAD TEST ({args.sessions} sessions x {args.steps} steps x 3 queries)")
+    print(f"pool {settings.SQL_POOL_MIN_SIZE}-{settings.SQL_POOL_MAX_SIZE}, statement cache {settings.SQL_PREPARED_STATEMENT_CACHE_SIZE}")
+    print("=" * 64)
+    print(f"{'mode':>6} {'queries':>8} {'seconds':>8} {'q/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+
+    run_sync(make_tools, args.sessions, args.steps)
+    asyncio.run(run_async(make_tools, args.sessions, args.steps))
+    print("=" * 64)
+    print("Latencies are per reasoning step (3 queries).")
+
+
+if __name__ == "__main__":
+    main()
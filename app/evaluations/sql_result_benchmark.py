@@ -0,0 +1,147 @@
+"""Benchmark: SQL tool output size and memory, JSON row dumps vs. compact streamed text.
+
+Creates a synthetic `attendance_bench` table (same columns as `attendance`) with
+1M rows in the dummy-data Postgres database, then runs each mode in a fresh
+subprocess so `ru_maxrss` reflects only that run:
+
+- agno_json:  agno SQLTools.run_sql_query (client-side cursor, JSON list of dicts)
+- gated_json: GovernedSQLTools rows, serialized as JSON like before
+- compact:    GovernedSQLTools.run_sql_query (server-side cursor, CSV-like text, budgets)
+
+    python app/evaluations/sql_result_benchmark.py --rows 1000000
+    python app/evaluations/sql_result_benchmark.py --keep-table   # reuse the table next run
+
+Tokens are counted with agno's tokenizer helper (tiktoken when installed).
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from sqlalchemy import create_engine, text
+
+from app.config.settings import settings
+
+TABLE = "attendance_bench"
+COLUMNS = "attendance_id, employee_id, attendance_date, check_in_time, check_out_time, status, work_hours, notes"
+
+QUERIES = {
+    "no_limit": f"SELECT {COLUMNS} FROM {TABLE}",
+    "late_500": f"SELECT {COLUMNS} FROM {TABLE} WHERE status = 'Late' ORDER BY attendance_date DESC LIMIT 500",
+    "by_status": f"SELECT status, COUNT(*) AS days, ROUND(AVG(work_hours), 2) AS avg_hours FROM {TABLE} GROUP BY status ORDER BY days DESC",
+}
+
+
+def create_table(db_url: str, num_rows: int) -> None:
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        existing = conn.execute(text(f"SELECT to_regclass('{TABLE}') IS NOT NULL")).scalar()
+        if existing and conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar() == num_rows:
+            print(f"♻️  Reusing {TABLE} ({num_rows:,} rows)")
+            return
+        print(f"🏗️  Creating {TABLE} with {num_rows:,} rows...")
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(f"""
+            CREATE TABLE {TABLE} AS
+            SELECT
+                i AS attendance_id,
+                1 + (i % 500) AS employee_id,
+                DATE '2025-01-01' + (i / 500)::int % 365 AS attendance_date,
+                CASE WHEN i % 11 = 0 THEN NULL ELSE TIME '08:00' + (i % 60) * INTERVAL '1 minute' END AS check_in_time,
+                CASE WHEN i % 11 = 0 THEN NULL ELSE TIME '17:00' + (i % 45) * INTERVAL '1 minute' END AS check_out_time,
+                (ARRAY['Present', 'Present', 'Present', 'Late', 'Remote', 'Half Day', 'Absent'])[1 + i % 7] AS status,
+                ROUND((4 + (i % 50) / 10.0)::numeric, 2) AS work_hours,
+                CASE WHEN i % 13 = 0 THEN 'Traffic jam on the way to the office' END AS notes
+            FROM generate_series(1, {num_rows}) AS s(i)
+        """))
+        conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(mode: str, query_name: str, db_url: str) -> dict:
+    from agno.tools.sql import SQLTools
+    from agno.utils.tokens import count_text_tokens
+
+    from app.tools.sql_tools import GovernedSQLTools
+
+    engine = create_engine(db_url)
+    # Large plan cost limit: this measures output handling, not the cost gate
+    governed = GovernedSQLTools(db_engine=engine, max_plan_cost=float("inf"))
+    plain = SQLTools(db_engine=engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    baseline_mb = _peak_rss_mb()
+    sql = QUERIES[query_name]
+    start = time.perf_counter()
+
+    if mode == "agno_json":
+        output = plain.run_sql_query(sql, limit=50)
+    elif mode == "gated_json":
+        output = json.dumps(governed.run_sql(sql, limit=50), default=str)
+    else:
+        output = governed.run_sql_query(sql, limit=50)
+
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "rss_delta_mb": round(_peak_rss_mb() - baseline_mb, 1),
+        "chars": len(output),
+        "tokens": count_text_tokens(output),
+        "footer": output.rsplit("\n", 1)[-1] if mode == "compact" else "",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=settings.POSTGRES_URL_DUMMY_DATA)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", nargs="+", default=["agno_json", "gated_json", "compact"])
+    parser.add_argument("--keep-table", action="store_true")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "QUERY", "DB_URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(*args.worker)))
+        return
+
+    create_table(args.db_url, args.rows)
+
+    print("=" * 96)
+    print(f"SQL TOOL OUTPUT BENCHMARK ({args.rows:,} rows, token budget {settings.SQL_RESULT_MAX_TOKENS})")
+    print("=" * 96)
+    print(f"{'query':>10} {'mode':>11} {'seconds':>8} {'RSS +MB':>8} {'chars':>9} {'tokens':>8}  footer")
+
+    try:
+        for query_name in QUERIES:
+            for mode in args.modes:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, query_name, args.db_url],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{query_name:>10} {mode:>11} {r['seconds']:>8} {r['rss_delta_mb']:>8} "
+                    f"{r['chars']:>9,} {r['tokens']:>8,}  {r['footer']}"
+                )
+    finally:
+        if not args.keep_table:
+            with create_engine(args.db_url).begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+    print("=" * 96)
+    print("agno_json buffers the whole result client-side even though only 50 rows are kept;")
+    print("compact stays within the token budget, so compress_tool_results is no longer needed.")
+
+
+if __name__ == "__main__":
+    main()
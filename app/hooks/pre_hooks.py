@@ -1,11 +1,15 @@
-from agno.exceptions import CheckTrigger
-from agno.run.agent import RunInput
-from pydantic import BaseModel
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Literal
-from langchain_openai import ChatOpenAI
-from langchain_classic.prompts import ChatPromptTemplate
-from langchain_classic.output_parsers import PydanticOutputParser
+
 from agno.exceptions import CheckTrigger, InputCheckError
+from agno.run.agent import RunInput
+from agno.utils.log import logger
+from pydantic import BaseModel
+
+from app.config.settings import settings
+from app.services.guardrail_classifier import GuardrailStats, VerdictCache, get_guardrail_classifier
+from app.services.saved_query_index import normalize_question
 
 
 class ContextValidationResult(BaseModel):
@@ -14,8 +18,21 @@ class ContextValidationResult(BaseModel):
     reason: str
     category: Literal["leave_related", "hr_related", "completely_irrelevant"]
 
-def validate_out_of_context(run_input: RunInput) -> None:
-    user_question = run_input.input_content
+
+@dataclass
+class GuardrailVerdict:
+    result: ContextValidationResult
+    tier: Literal["cache", "local", "llm"]
+
+
+@lru_cache(maxsize=1)
+def get_llm_chain():
+    """Prompt | gpt-4o-mini | parser, built once per process."""
+    # langchain is imported here, not at startup: most verdicts come from the cache or the local classifier
+    from langchain_classic.output_parsers import PydanticOutputParser
+    from langchain_classic.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
     llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
     parser = PydanticOutputParser(
         pydantic_object=ContextValidationResult
@@ -34,14 +51,58 @@ def validate_out_of_context(run_input: RunInput) -> None:
         format_instructions=parser.get_format_instructions()
     )
 
-    chain = prompt | llm | parser
-    result = chain.invoke({
-    "question": user_question
-})
-    print("RESULT", result)
+    return prompt | llm | parser
+
+
+def llm_classify(question: str) -> ContextValidationResult:
+    return get_llm_chain().invoke({"question": question})
+
+
+verdict_cache: VerdictCache[ContextValidationResult] = VerdictCache()
+guardrail_stats = GuardrailStats()
+
+
+def classify_question(question: str) -> GuardrailVerdict:
+    """Tiered relevance check: verdict cache, local centroid classifier, then the LLM.
+
+    The local classifier only decides when its margin clears
+    GUARDRAIL_CONFIDENCE_MARGIN; anything closer escalates to gpt-4o-mini.
+    """
+    key = normalize_question(question)
+    cached = verdict_cache.get(key)
+    if cached is not None:
+        guardrail_stats.cached += 1
+        return GuardrailVerdict(result=cached, tier="cache")
+
+    if settings.GUARDRAIL_LOCAL_CLASSIFIER:
+        try:
+            local = get_guardrail_classifier().classify(question)
+        except Exception as e:
+            guardrail_stats.local_errors += 1
+            logger.warning(f"Local guardrail classifier failed, escalating to LLM: {e}")
+            local = None
+        if local is not None and local.confident():
+            guardrail_stats.local += 1
+            result = ContextValidationResult(
+                is_relevant=local.is_relevant,
+                reason=f"Local classifier: closest to {local.category} (margin {local.margin:+.3f})",
+                category=local.category,
+            )
+            verdict_cache.put(key, result)
+            return GuardrailVerdict(result=result, tier="local")
+
+    guardrail_stats.escalated += 1
+    result = llm_classify(question)
+    verdict_cache.put(key, result)
+    return GuardrailVerdict(result=result, tier="llm")
+
+
+def validate_out_of_context(run_input: RunInput) -> None:
+    verdict = classify_question(run_input.input_content_string())
+    logger.debug(f"Guardrail verdict ({verdict.tier}): {verdict.result}")
 
-    if not result.is_relevant:
+    if not verdict.result.is_relevant:
         raise InputCheckError(
-            f"{result.reason}",
+            f"{verdict.result.reason}",
             check_trigger=CheckTrigger.INPUT_NOT_ALLOWED,
         )
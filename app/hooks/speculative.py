@@ -0,0 +1,250 @@
+"""
+Speculative Pre-Hooks
+=====================
+
+Run validation pre-hooks (e.g. validate_out_of_context) concurrently with the
+agent instead of before it, so guardrail latency overlaps the first model call.
+
+`SpeculativeAgent` is an Agent with two extra fields, set per agent:
+- speculative_hooks: validation hooks that may run concurrently
+- speculative_safe_tools: tools without side effects that need not wait for them
+
+For a non-streaming `arun`:
+- the hooks start in the background and the agent run starts immediately
+  (the same hooks stay in `pre_hooks`, but skip themselves inside that run)
+- every other tool waits for the hooks to pass (tool hook)
+- the finished output is held until the hooks pass
+- if a hook raises InputCheckError the in-flight run task is cancelled
+  (including a pending model request) and the caller gets an error RunOutput
+  with the check's message, as with inline pre-hooks; the cancelled run is not
+  stored in the session
+- if the run finished first, agno has already stored it as completed; on a
+  rejection the stored run is updated to the error and message, as agno
+  stores a run rejected inline, so the answer stays out of later turns'
+  history (agno skips runs with status error)
+
+Streaming runs would emit content before the check completes, so they keep
+the normal order (hooks inline, then the model); so do sync `run` calls and
+all runs while SPECULATIVE_PRE_HOOKS is off.
+
+`speculation_stats[agent name]` records the time saved (hook time hidden
+behind the agent run) and, for rejected runs, the wasted agent time.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from agno.agent import Agent
+from agno.exceptions import InputCheckError, StopAgentRun
+from agno.run.agent import RunInput, RunOutput
+from agno.run.base import RunContext, RunStatus
+from agno.utils.hooks import filter_hook_args
+from agno.utils.log import logger
+
+from app.config.settings import settings
+
+
+@dataclass
+class SpeculationStats:
+    runs: int = 0
+    passed: int = 0
+    rejected: int = 0
+    saved_seconds: float = 0.0  # hook time hidden behind the agent run
+    wasted_seconds: float = 0.0  # agent time spent on runs that were then rejected
+    gate_wait_seconds: float = 0.0  # tool calls waiting for the hooks
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "avg_saved_ms": round(self.saved_seconds / self.passed * 1000, 1) if self.passed else 0.0,
+            "avg_wasted_ms": round(self.wasted_seconds / self.rejected * 1000, 1) if self.rejected else 0.0,
+        }
+
+
+@dataclass
+class _Validation:
+    task: "asyncio.Task[None]"
+    safe_tools: List[str]
+    seconds: float = 0.0  # hook time, set when the hooks finish
+    gate_wait: float = 0.0
+
+
+# AgentOS runs a fresh deep copy of the agent per request, so per-run state is
+# keyed by run_id here rather than kept on the instance
+_validations: Dict[str, _Validation] = {}
+speculation_stats: Dict[str, SpeculationStats] = {}
+
+
+def skip_when_speculating(hook: Callable[..., Any]) -> Callable[..., Any]:
+    """Inline pre-hook that defers to the background validation of a speculative run."""
+    if getattr(hook, "__speculative__", False):
+        return hook
+
+    if inspect.iscoroutinefunction(hook):
+
+        async def inline_hook(run_context: RunContext, **kwargs: Any) -> None:
+            if run_context.run_id not in _validations:
+                await hook(**filter_hook_args(hook, {"run_context": run_context, **kwargs}))
+
+    else:
+
+        def inline_hook(run_context: RunContext, **kwargs: Any) -> None:  # type: ignore[misc]
+            if run_context.run_id not in _validations:
+                hook(**filter_hook_args(hook, {"run_context": run_context, **kwargs}))
+
+    # Not functools.wraps: agno reads the hook signature and must see run_context
+    inline_hook.__name__ = getattr(hook, "__name__", "speculative_hook")
+    inline_hook.__speculative__ = True  # type: ignore[attr-defined]
+    return inline_hook
+
+
+async def gate_tool(
+    function_name: str, function_call: Callable[..., Any], arguments: Dict[str, Any], run_context: RunContext
+) -> Any:
+    """Tool hook: hold side-effecting tool calls of a speculative run until its hooks pass."""
+    validation = _validations.get(run_context.run_id) if run_context is not None else None
+    if validation is not None and function_name not in validation.safe_tools and not validation.task.done():
+        start = time.perf_counter()
+        await asyncio.wait({validation.task})
+        validation.gate_wait += time.perf_counter() - start
+    if validation is not None and validation.task.done() and validation.task.exception() is not None:
+        raise StopAgentRun(f"Input rejected, not running {function_name}")
+    result = function_call(**arguments)
+    return await result if inspect.isawaitable(result) else result
+
+
+@dataclass(init=False)
+class SpeculativeAgent(Agent):
+    speculative_hooks: Optional[List[Callable[..., Any]]] = None
+    speculative_safe_tools: Optional[List[str]] = None
+
+    def __init__(
+        self,
+        *,
+        speculative_hooks: Optional[List[Callable[..., Any]]] = None,
+        speculative_safe_tools: Optional[List[str]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.speculative_hooks = speculative_hooks
+        self.speculative_safe_tools = speculative_safe_tools
+        if speculative_hooks:
+            # Also the inline path (streaming, sync run); deep_copy passes the wrapped list back in
+            wrapped = [skip_when_speculating(hook) for hook in speculative_hooks]
+            others = [hook for hook in self.pre_hooks or [] if not getattr(hook, "__speculative__", False)]
+            self.pre_hooks = [*wrapped, *others]
+            if gate_tool not in (self.tool_hooks or []):
+                self.tool_hooks = [*(self.tool_hooks or []), gate_tool]
+
+    def arun(self, input: Any, *, stream: Optional[bool] = None, **kwargs: Any) -> Any:  # type: ignore[override]
+        speculate = settings.SPECULATIVE_PRE_HOOKS and self.speculative_hooks
+        if not speculate or (stream if stream is not None else bool(self.stream)):
+            return super().arun(input, stream=stream, **kwargs)
+        return self._speculative_arun(input, **kwargs)
+
+    async def _validate(self, input: Any, run_id: str, user_id: Optional[str]) -> None:
+        start = time.perf_counter()
+        args = {"run_input": RunInput(input_content=input), "agent": self, "user_id": user_id}
+        try:
+            for hook in self.speculative_hooks or []:
+                hook_args = filter_hook_args(hook, args)
+                if inspect.iscoroutinefunction(hook):
+                    await hook(**hook_args)
+                else:
+                    await asyncio.to_thread(hook, **hook_args)
+        except InputCheckError:
+            raise
+        except Exception as e:
+            # Same as a failing inline pre-hook: logged, the run goes on
+            logger.error(f"Speculative pre-hook failed: {e}")
+        finally:
+            validation = _validations.get(run_id)
+            if validation is not None:
+                validation.seconds = time.perf_counter() - start
+
+    async def _speculative_arun(self, input: Any, run_id: Optional[str] = None, **kwargs: Any) -> RunOutput:
+        stats = speculation_stats.setdefault(self.name or self.id or "agent", SpeculationStats())
+        run_id = run_id or str(uuid4())
+        start = time.perf_counter()
+        validation = _Validation(
+            task=asyncio.create_task(self._validate(input, run_id, kwargs.get("user_id"))),
+            safe_tools=self.speculative_safe_tools or [],
+        )
+        _validations[run_id] = validation
+        stats.runs += 1
+
+        run = asyncio.ensure_future(super().arun(input, stream=False, run_id=run_id, **kwargs))
+        try:
+            await asyncio.wait({run, validation.task}, return_when=asyncio.FIRST_COMPLETED)
+            if validation.task.done() and validation.task.exception() is not None:
+                # Rejected while the model is still working: cancel the run now
+                run.cancel()
+                await asyncio.wait({run})
+            else:
+                run_output = await run
+                run_seconds = time.perf_counter() - start
+                # Output is held until the hooks have passed
+                await asyncio.wait({validation.task})
+        finally:
+            for task in (run, validation.task):
+                if not task.done():
+                    task.cancel()
+            _validations.pop(run_id, None)
+
+        error = validation.task.exception()
+        if error is None:
+            hold_wait = time.perf_counter() - start - run_seconds
+            saved = max(0.0, validation.seconds - validation.gate_wait - hold_wait)
+            stats.passed += 1
+            stats.saved_seconds += saved
+            stats.gate_wait_seconds += validation.gate_wait
+            logger.info(
+                f"Speculative run {run_id}: hooks {validation.seconds * 1000:.0f} ms, saved {saved * 1000:.0f} ms "
+                f"(tools waited {validation.gate_wait * 1000:.0f} ms, output held {hold_wait * 1000:.0f} ms)"
+            )
+            return run_output
+
+        wasted = time.perf_counter() - start
+        stats.rejected += 1
+        stats.wasted_seconds += wasted
+        logger.info(f"Speculative run {run_id} rejected after {wasted * 1000:.0f} ms of agent work: {error}")
+        if run.cancelled() or run.exception() is not None:
+            return RunOutput(
+                run_id=run_id,
+                agent_id=self.id,
+                agent_name=self.name,
+                session_id=kwargs.get("session_id"),
+                user_id=kwargs.get("user_id"),
+                content=str(error),
+                status=RunStatus.error,
+            )
+        run_output = run.result()
+        run_output.status = RunStatus.error
+        run_output.content = str(error)
+        await self._store_rejection(run_output)
+        return run_output
+
+    async def _store_rejection(self, run_output: RunOutput) -> None:
+        """Replace the stored copy of a completed run that was then rejected."""
+        if self.db is None or not run_output.session_id:
+            return
+        try:
+            # agno's aget_session awaits the db, so a sync db goes through the sync calls
+            if self._has_async_db():
+                session = await self.aget_session(session_id=run_output.session_id)
+            else:
+                session = self.get_session(session_id=run_output.session_id)
+            if session is None or not session.runs:
+                return
+            session.runs = [run_output if run.run_id == run_output.run_id else run for run in session.runs]
+            session.session_data = session.session_data or {}
+            if self._has_async_db():
+                await self.asave_session(session)
+            else:
+                self.save_session(session)
+        except Exception as e:
+            logger.error(f"Speculative run {run_output.run_id}: could not mark the stored run rejected: {e}")
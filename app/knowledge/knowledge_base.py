@@ -1,18 +1,78 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List
 
 from agno.knowledge.knowledge import Knowledge
+from app.config.settings import settings
 from app.database.postgres_db import get_postgres_db_dummy_data
-from app.memory.vector_db import get_vector_db
+
+
+class LazyVectorDb:
+    """Vector db built on first use.
+
+    Building one imports qdrant_client and checks (or creates) the collection,
+    a round trip to Qdrant; behind this proxy that happens in the warmup task
+    (app/agents/registry.py) or on the first search instead of at import.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._db = None
+        self._lock = threading.Lock()
+        lazy_vector_dbs.append(self)
+
+    def get(self) -> Any:
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    db = self._factory()
+                    if not db.exists():
+                        db.create()
+                    self._db = db
+        return self._db
+
+    def __getattr__(self, name: str) -> Any:
+        # Private and copy/pickle lookups must not build the db
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+lazy_vector_dbs: List[LazyVectorDb] = []
+
+
+def warm_vector_dbs() -> None:
+    for vector_db in lazy_vector_dbs:
+        vector_db.get()
+
+
+@dataclass
+class LazyKnowledge(Knowledge):
+    """Knowledge that leaves the collection check to its LazyVectorDb."""
+
+    def __post_init__(self):
+        self.construct_readers()
+
+
+def _vector_db() -> Any:
+    from app.memory.vector_db import get_vector_db
+
+    return get_vector_db()
+
+
+def _knowledge(**kwargs) -> Knowledge:
+    if settings.LAZY_STARTUP:
+        return LazyKnowledge(vector_db=LazyVectorDb(_vector_db), **kwargs)
+    return Knowledge(vector_db=_vector_db(), **kwargs)
 
 def get_knowledge():
-    return(Knowledge(
-        vector_db=get_vector_db(),
+    return(_knowledge(
         max_results=4
     ))
 
 def get_knowledge_sql_agent():
-    return(Knowledge(
+    return(_knowledge(
     name="SQL Agent Knowledge",
-    vector_db=get_vector_db(),
     max_results=5,
     contents_db=get_postgres_db_dummy_data(),
-))
\ No newline at end of file
+))
@@ -1,3 +1,8 @@
-from app.orchestrator.agent_os import agent_os
+from app.orchestrator.startup_profile import profiler
 
-app = agent_os.get_app()
+with profiler.imports():
+    from app.orchestrator.agent_os import agent_os
+profiler.mark("imported")
+
+with profiler.component("agent os app"):
+    app = agent_os.get_app()
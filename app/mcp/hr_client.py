@@ -0,0 +1,115 @@
+"""
+HR API Client
+=============
+
+Shared async HTTP client for the MCP server's calls to the HR API.
+
+`requests.get` inside the async MCP handler blocked the event loop for the
+whole HR round trip, so one slow lookup stalled every other MCP client. This
+client is non-blocking end to end:
+- one `httpx.AsyncClient` per event loop with keep-alive and pool limits
+  (HR_API_MAX_CONNECTIONS / HR_API_MAX_KEEPALIVE_CONNECTIONS), so repeat calls
+  reuse TLS connections
+- a semaphore caps in-flight requests toward the HR API (HR_API_MAX_CONCURRENCY);
+  excess calls wait instead of piling onto the upstream
+- transport errors and 429/502/503/504 are retried up to HR_API_MAX_RETRIES
+  times with full-jitter exponential backoff; a numeric Retry-After from the
+  HR API replaces the backoff, capped at HR_API_RETRY_AFTER_MAX_SECONDS
+- every attempt is timed into hr_api_request_duration_seconds (/metrics)
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from agno.utils.log import logger
+
+from app.config.mcp_settings import mcp_settings
+from app.mcp.observability import hr_api_duration, hr_api_retries
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class HRClient:
+    def __init__(
+        self,
+        timeout: float = mcp_settings.HR_API_TIMEOUT_SECONDS,
+        max_connections: int = mcp_settings.HR_API_MAX_CONNECTIONS,
+        max_keepalive_connections: int = mcp_settings.HR_API_MAX_KEEPALIVE_CONNECTIONS,
+        max_concurrency: int = mcp_settings.HR_API_MAX_CONCURRENCY,
+        max_retries: int = mcp_settings.HR_API_MAX_RETRIES,
+        backoff_base: float = mcp_settings.HR_API_BACKOFF_BASE_SECONDS,
+        backoff_max: float = mcp_settings.HR_API_BACKOFF_MAX_SECONDS,
+        retry_after_max: float = mcp_settings.HR_API_RETRY_AFTER_MAX_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_keepalive_connections
+            ),
+            transport=transport,
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.retry_after_max)
+        # Full jitter: spreads retries of concurrent callers instead of synchronizing them
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def get_json(self, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> Any:
+        """GET `url` and decode JSON, retrying transient failures."""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self.semaphore:
+                    start = time.perf_counter()
+                    try:
+                        response = await self.client.get(url, params=params, headers=headers)
+                    finally:
+                        outcome = str(response.status_code) if response is not None else "error"
+                        hr_api_duration.observe(time.perf_counter() - start, outcome)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error: Exception = httpx.HTTPStatusError(
+                    f"HR API returned {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            delay = self._backoff(attempt, response)
+            hr_api_retries.inc()
+            logger.warning(f"HR API attempt {attempt + 1} failed ({error!r}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_clients: Dict[int, HRClient] = {}
+
+
+def get_hr_client() -> HRClient:
+    """Return the client for the running event loop, creating it on first use."""
+    loop_id = id(asyncio.get_running_loop())
+    client = _clients.get(loop_id)
+    if client is None:
+        client = _clients[loop_id] = HRClient()
+    return client
+
+
+async def close_hr_client() -> None:
+    """Close the client of the running event loop (MCP server shutdown)."""
+    client = _clients.pop(id(asyncio.get_running_loop()), None)
+    if client is not None:
+        await client.aclose()
@@ -1,12 +1,48 @@
-from fastapi import FastAPI, HTTPException, Request
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-import requests
+import httpx
 import re
 import json
-from typing import Dict, Any, Optional, List, Union
-from datetime import datetime
+from typing import Callable, Dict, Any, Optional, List, Union
 
-app = FastAPI(title="Leave Accrual MCP Server", version="0.1.0")
+from app.config.mcp_settings import mcp_settings
+from app.mcp.hr_client import close_hr_client, get_hr_client
+from app.mcp.observability import (
+    configure_logging,
+    http_requests,
+    log_event,
+    render_metrics,
+    rpc_duration,
+    rpc_errors,
+    sample_body,
+    shutdown_logging,
+    truncate,
+)
+from app.mcp.sessions import SESSION_HEADER, McpSession, SessionStore
+from app.mcp.tool_cache import ToolResultCache, cache_key, caller_identity
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    yield
+    await close_hr_client()
+    _executor.shutdown(wait=False)
+    shutdown_logging()
+
+
+app = FastAPI(title="Leave Accrual MCP Server", version="0.1.0", lifespan=lifespan)
+
+leave_accrual_cache = ToolResultCache()
+sessions = SessionStore()
 
 
 # ============================================
@@ -53,119 +89,262 @@ class ToolInfo(BaseModel):
     inputSchema: Dict[str, Any]
 
 
+# ============================================
+# Method Registry
+# ============================================
+
+@dataclass
+class RequestContext:
+    caller: str = "anonymous"
+    session: Optional[McpSession] = None
+
+
+RPCHandler = Callable[[Optional[Dict[str, Any]], RequestContext], Any]
+
+
+@dataclass
+class RPCMethod:
+    handler: RPCHandler
+    blocking: bool = False
+
+
+METHODS: Dict[str, RPCMethod] = {}
+
+# Bounded pool for sync handlers that block (I/O, heavy CPU); keeps them off the event loop
+_executor = ThreadPoolExecutor(max_workers=mcp_settings.MCP_EXECUTOR_WORKERS, thread_name_prefix="mcp-rpc")
+
+
+def rpc_method(name: str, blocking: bool = False):
+    """Register a JSON-RPC method handler `(params, context) -> result`.
+
+    Async handlers are awaited. Sync handlers run inline, or on the bounded
+    executor when marked `blocking`.
+    """
+    def decorator(handler: RPCHandler) -> RPCHandler:
+        METHODS[name] = RPCMethod(handler=handler, blocking=blocking)
+        return handler
+    return decorator
+
+
+async def call_method(method: RPCMethod, params: Optional[Dict[str, Any]], context: RequestContext) -> Any:
+    if inspect.iscoroutinefunction(method.handler):
+        return await method.handler(params, context)
+    if method.blocking:
+        return await asyncio.get_running_loop().run_in_executor(_executor, method.handler, params, context)
+    return method.handler(params, context)
+
+
+def rpc_error(code: int, message: str, id: Optional[Union[int, str]], data: Optional[Any] = None) -> Dict[str, Any]:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return JSONRPCResponse(jsonrpc="2.0", error=error, id=id).dict()
+
+
+async def dispatch(item: Any, context: RequestContext) -> Optional[Dict[str, Any]]:
+    """Handle one JSON-RPC request object; returns None for notifications."""
+    if not isinstance(item, dict):
+        rpc_errors.inc("invalid", "-32600")
+        return rpc_error(-32600, "Invalid Request", None, "Request must be an object")
+    
+    try:
+        rpc_request = JSONRPCRequest(**item)
+    except Exception as e:
+        rpc_errors.inc("invalid", "-32600")
+        log_event(logging.WARNING, "rpc_invalid", id=item.get("id"), error=str(e))
+        return rpc_error(-32600, "Invalid Request", item.get("id"), str(e))
+    
+    # Requests without an id are notifications: never answered, not even with errors
+    is_notification = "id" not in item
+    
+    method = METHODS.get(rpc_request.method)
+    if method is None:
+        # Client-chosen names are not used as metric labels
+        rpc_errors.inc("unknown", "-32601")
+        log_event(logging.WARNING, "rpc_method_not_found", method=rpc_request.method, id=rpc_request.id)
+        if is_notification:
+            return None
+        return rpc_error(-32601, f"Method not found: {rpc_request.method}", rpc_request.id)
+    
+    start = time.perf_counter()
+    try:
+        result = await call_method(method, rpc_request.params, context)
+    except Exception as e:
+        rpc_duration.observe(time.perf_counter() - start, rpc_request.method)
+        rpc_errors.inc(rpc_request.method, "-32603")
+        log_event(logging.ERROR, "rpc_error", method=rpc_request.method, id=rpc_request.id, error=str(e))
+        return None if is_notification else rpc_error(-32603, "Internal error", rpc_request.id, str(e))
+    elapsed = time.perf_counter() - start
+    rpc_duration.observe(elapsed, rpc_request.method)
+    log_event(
+        logging.DEBUG, "rpc", method=rpc_request.method, id=rpc_request.id, duration_ms=round(elapsed * 1000, 2)
+    )
+    
+    if is_notification:
+        return None
+    return JSONRPCResponse(jsonrpc="2.0", result=result, id=rpc_request.id).dict()
+
+
 # ============================================
 # Main Endpoint
 # ============================================
 
 @app.post("/mcp")
 async def mcp_handler(request: Request):
-    """Handle MCP JSON-RPC requests"""
-    
-    # Get raw body
+    """Handle MCP JSON-RPC requests (single or batch)"""
+    start = time.perf_counter()
     body_bytes = await request.body()
-    body_str = body_bytes.decode('utf-8')
+    if sample_body():
+        log_event(logging.DEBUG, "mcp_request_body", body=truncate(body_bytes.decode("utf-8", "replace")))
     
-    # Log incoming request
-    print("\n" + "="*70)
-    print(f"🕐 TIMESTAMP: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("="*70)
-    print("📦 RAW BODY:")
-    print(body_str)
-    print("-"*70)
-    
-    # Parse JSON
+    body_json = None
     try:
-        body_json = json.loads(body_str)
-        print("✅ PARSED JSON:")
-        print(json.dumps(body_json, indent=2, ensure_ascii=False))
-        print("-"*70)
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON PARSE ERROR: {e}")
-        print("="*70 + "\n")
-        return JSONRPCResponse(
-            jsonrpc="2.0",
-            error={
-                "code": -32700,
-                "message": "Parse error",
-                "data": str(e)
-            },
-            id=None
-        ).dict()
+        body_json = json.loads(body_bytes)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        rpc_errors.inc("invalid", "-32700")
+        log_event(logging.WARNING, "mcp_parse_error", error=str(e))
+        response = JSONResponse(rpc_error(-32700, "Parse error", None, str(e)))
+    else:
+        response = await handle_body(request, body_json)
     
-    # Parse JSON-RPC request
-    try:
-        rpc_request = JSONRPCRequest(**body_json)
-        print(f"✅ JSON-RPC METHOD: {rpc_request.method}")
-        print(f"   Params: {rpc_request.params}")
-        print(f"   ID: {rpc_request.id}")
-    except Exception as e:
-        print(f"❌ JSON-RPC VALIDATION ERROR: {e}")
-        print("="*70 + "\n")
-        return JSONRPCResponse(
-            jsonrpc="2.0",
-            error={
-                "code": -32600,
-                "message": "Invalid Request",
-                "data": str(e)
-            },
-            id=body_json.get("id")
-        ).dict()
+    http_requests.inc(str(response.status_code))
+    log_event(
+        logging.INFO, "mcp_request",
+        method=_method_summary(body_json),
+        status=response.status_code,
+        duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        session=response.headers.get(SESSION_HEADER),
+        streamed=isinstance(response, StreamingResponse),
+    )
+    return response
+
+
+async def handle_body(request: Request, body_json: Any) -> Response:
+    # Sessions: initialize opens one, every other request must carry a live id (if any)
+    session_id = request.headers.get(SESSION_HEADER)
+    if isinstance(body_json, dict) and body_json.get("method") == "initialize":
+        session = sessions.create(body_json.get("params"))
+        log_event(logging.INFO, "mcp_session_created", session=session.id)
+    elif session_id:
+        session = sessions.get(session_id)
+        if session is None:
+            log_event(logging.WARNING, "mcp_unknown_session", session=session_id)
+            return JSONResponse(rpc_error(-32001, "Session not found", _request_id(body_json)), status_code=404)
+    elif mcp_settings.MCP_REQUIRE_SESSION:
+        return JSONResponse(
+            rpc_error(-32600, "Invalid Request", _request_id(body_json), f"Missing {SESSION_HEADER} header"),
+            status_code=400,
+        )
+    else:
+        session = None
+    headers = {SESSION_HEADER: session.id} if session is not None else {}
+    context = RequestContext(caller=caller_identity(request.headers.get("authorization")), session=session)
     
-    print("="*70 + "\n")
+    items = body_json if isinstance(body_json, list) else [body_json]
+    if isinstance(body_json, list):
+        if not body_json:
+            return JSONResponse(rpc_error(-32600, "Invalid Request", None, "Empty batch"), headers=headers)
+        if len(body_json) > mcp_settings.MCP_MAX_BATCH_SIZE:
+            return JSONResponse(
+                rpc_error(-32600, "Invalid Request", None, f"Batch larger than {mcp_settings.MCP_MAX_BATCH_SIZE}"),
+                headers=headers,
+            )
     
-    # Route to appropriate handler
+    # Tool calls can take seconds (HR API): stream them as SSE when the client accepts it,
+    # with keep-alives / progress notifications until the result is ready
+    if "text/event-stream" in request.headers.get("accept", "") and any(_is_tool_call(item) for item in items):
+        return StreamingResponse(
+            sse_events(items, context),
+            media_type="text/event-stream",
+            headers={**headers, "Cache-Control": "no-cache"},
+        )
+    
+    # Batch: dispatched concurrently, responses in request order, notifications omitted
+    responses = await asyncio.gather(*(dispatch(item, context) for item in items))
+    responses = [r for r in responses if r is not None]
+    if not responses:
+        return Response(status_code=202, headers=headers)
+    return JSONResponse(responses if isinstance(body_json, list) else responses[0], headers=headers)
+
+
+def _method_summary(body: Any) -> Optional[str]:
+    if isinstance(body, list):
+        return f"batch[{len(body)}]"
+    method = body.get("method") if isinstance(body, dict) else None
+    return method if method in METHODS else ("unknown" if method else None)
+
+
+def _request_id(body: Any) -> Optional[Union[int, str]]:
+    return body.get("id") if isinstance(body, dict) else None
+
+
+def _is_tool_call(item: Any) -> bool:
+    return isinstance(item, dict) and item.get("method") == "tools/call" and "id" in item
+
+
+def _sse(message: Dict[str, Any]) -> str:
+    return f"event: message\ndata: {json.dumps(message)}\n\n"
+
+
+async def sse_events(items: List[Any], context: RequestContext):
+    """Dispatch `items` concurrently and emit each response as an SSE message when ready."""
+    tasks = {asyncio.create_task(dispatch(item, context)): item for item in items}
+    pending = set(tasks)
+    progress = 0
     try:
-        if rpc_request.method == "initialize":
-            result = handle_initialize(rpc_request.params)
-        elif rpc_request.method == "tools/list":
-            result = handle_tools_list(rpc_request.params)
-        elif rpc_request.method == "tools/call":
-            result = handle_tools_call(rpc_request.params)
-        elif rpc_request.method == "ping":
-            result = {}
-        else:
-            return JSONRPCResponse(
-                jsonrpc="2.0",
-                error={
-                    "code": -32601,
-                    "message": f"Method not found: {rpc_request.method}"
-                },
-                id=rpc_request.id
-            ).dict()
-        
-        print(f"✅ Response prepared for method: {rpc_request.method}\n")
-        
-        return JSONRPCResponse(
-            jsonrpc="2.0",
-            result=result,
-            id=rpc_request.id
-        ).dict()
-        
-    except Exception as e:
-        print(f"❌ ERROR handling {rpc_request.method}: {e}\n")
-        return JSONRPCResponse(
-            jsonrpc="2.0",
-            error={
-                "code": -32603,
-                "message": "Internal error",
-                "data": str(e)
-            },
-            id=rpc_request.id
-        ).dict()
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=mcp_settings.MCP_SSE_KEEPALIVE_SECONDS)
+            for task in done:
+                if task.result() is not None:
+                    yield _sse(task.result())
+            if done:
+                continue
+            progress += 1
+            tokens = [
+                token for task in pending
+                if (token := ((tasks[task].get("params") or {}).get("_meta") or {}).get("progressToken")) is not None
+            ]
+            if not tokens:
+                yield ": keepalive\n\n"
+            for token in tokens:
+                yield _sse({
+                    "jsonrpc": "2.0",
+                    "method": "notifications/progress",
+                    "params": {"progressToken": token, "progress": progress, "message": "Waiting for HR API"},
+                })
+    finally:
+        # Client went away: do not leave tool calls running for nobody
+        for task in pending:
+            task.cancel()
+
+
+@app.delete("/mcp")
+async def mcp_delete_session(request: Request):
+    """End an MCP session"""
+    session_id = request.headers.get(SESSION_HEADER)
+    if not session_id:
+        return Response(status_code=400)
+    log_event(logging.INFO, "mcp_session_closed", session=session_id)
+    return Response(status_code=200 if sessions.delete(session_id) else 404)
+
+
+@app.get("/mcp")
+async def mcp_get_stream():
+    """No server-initiated messages: the optional GET stream is not offered"""
+    return Response(status_code=405, headers={"Allow": "POST, DELETE"})
 
 
 # ============================================
 # MCP Method Handlers
 # ============================================
 
-def handle_initialize(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+@rpc_method("initialize")
+def handle_initialize(params: Optional[Dict[str, Any]], context: RequestContext) -> Dict[str, Any]:
     """Handle initialize request"""
-    print("🔧 Handling initialize...")
-    
     return {
         "protocolVersion": "2025-11-25",
         "capabilities": {
-            "tools": {}
+            "tools": {"listChanged": False}
         },
         "serverInfo": {
             "name": "LeaveAccrual",
@@ -174,50 +353,48 @@ def handle_initialize(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def handle_tools_list(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-    """Handle tools/list request"""
-    print("📋 Handling tools/list...")
-    
-    return {
-        "tools": [
-            {
-                "name": "GetLeaveAccrual",
-                "description": (
-                    "Get the remaining employee leave balance as of a specific date. "
-                    "The date information must be from the user, not you."
-                    "Use this tool when you need to calculate or check how many leave days "
-                    "are still available on a given date. "
-                    "Returns remaining employee leave balance based on date."
-                ),
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "date": {
-                            "type": "string",
-                            "description": "Date to check leave balance for (YYYY-MM-DD)",
-                            "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                        }
-                    },
-                    "required": ["date"]
+# Static tool list: built once, advertised with listChanged=false so clients
+# can keep it for the whole session
+TOOLS: List[Dict[str, Any]] = [
+    {
+        "name": "GetLeaveAccrual",
+        "description": (
+            "Get the remaining employee leave balance as of a specific date. "
+            "The date information must be from the user, not you."
+            "Use this tool when you need to calculate or check how many leave days "
+            "are still available on a given date. "
+            "Returns remaining employee leave balance based on date."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "date": {
+                    "type": "string",
+                    "description": "Date to check leave balance for (YYYY-MM-DD)",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
                 }
-            }
-        ]
+            },
+            "required": ["date"]
+        }
     }
+]
 
 
-def handle_tools_call(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-    """Handle tools/call request"""
-    print("🛠️  Handling tools/call...")
-    
+@rpc_method("tools/list")
+def handle_tools_list(params: Optional[Dict[str, Any]], context: RequestContext) -> Dict[str, Any]:
+    """Handle tools/list request"""
+    return {"tools": TOOLS}
+
+
+@rpc_method("tools/call")
+async def handle_tools_call(params: Optional[Dict[str, Any]], context: RequestContext) -> Dict[str, Any]:
+    """Handle tools/call request (`context.caller` scopes cached results to the MCP client)"""
     if not params:
         raise ValueError("Missing params for tools/call")
     
     tool_name = params.get("name")
     arguments = params.get("arguments", {})
     
-    print(f"   Tool: {tool_name}")
-    print(f"   Arguments: {arguments}")
-    
     if tool_name != "GetLeaveAccrual":
         raise ValueError(f"Unknown tool: {tool_name}")
     
@@ -232,9 +409,8 @@ def handle_tools_call(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         raise ValueError(f"Invalid date format: {date_str}. Expected YYYY-MM-DD")
     
     # Call the HR API
-    print(f"🚀 Calling HR API with date: {date_str}")
-    leave_data = get_leave_accrual(date_str)
-    print(f"✅ HR API call successful")
+    leave_data = await get_leave_accrual(date_str, caller=context.caller)
+    log_event(logging.DEBUG, "tool_call", tool=tool_name, date=date_str, status=leave_data["status"])
     
     return {
         "content": [
@@ -246,22 +422,42 @@ def handle_tools_call(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
+@rpc_method("ping")
+def handle_ping(params: Optional[Dict[str, Any]], context: RequestContext) -> Dict[str, Any]:
+    """Handle ping request"""
+    return {}
+
+
+# Standard client notifications: nothing to do, but acknowledged so they are
+# not logged and counted as unknown methods on every handshake
+@rpc_method("notifications/initialized")
+@rpc_method("notifications/cancelled")
+def handle_notification(params: Optional[Dict[str, Any]], context: RequestContext) -> None:
+    """Handle client notifications (no-op)"""
+    return None
+
+
 # ============================================
 # HR API Call
 # ============================================
 
-def get_leave_accrual(date: str) -> Dict[str, Any]:
+async def get_leave_accrual(date: str, caller: str = "anonymous") -> Dict[str, Any]:
     """
     Fetch leave accrual data from the HR API
     
+    Non-blocking: goes through the shared pooled client (app/mcp/hr_client.py),
+    which retries transient failures and caps concurrent upstream calls.
+    Successful results are cached per (people_uuid, date, caller), concurrent
+    identical calls share one request, and a stale result is served if the
+    HR API fails (app/mcp/tool_cache.py).
+    
     Args:
         date: Date in YYYY-MM-DD format
+        caller: Caller identity from caller_identity()
         
     Returns:
         Dictionary containing leave accrual data
     """
-    url = "https://hrp07-dev-be-v3.harpa-go.com:8080/apps/accrualPlans/getNetEntitleMobile/"
-    
     params = {
         "people_uuid": "7f9ae3e9-b13e-425c-9476-55d3344bd21b",
         "effective_date": date
@@ -277,16 +473,19 @@ def get_leave_accrual(date: str) -> Dict[str, Any]:
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
+        leave_data = await leave_accrual_cache.get_or_fetch(
+            cache_key("GetLeaveAccrual", params, caller),
+            lambda: get_hr_client().get_json(mcp_settings.HR_API_URL, params=params, headers=headers),
+        )
         
         return {
             "status": "success",
             "as_of_date": date,
-            "leave_data": response.json()
+            "leave_data": leave_data
         }
         
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
+        log_event(logging.WARNING, "hr_api_failed", date=date, error=str(e))
         return {
             "status": "error",
             "message": f"Failed to get leave data: {str(e)}"
@@ -300,8 +499,35 @@ def root():
         "status": "healthy",
         "service": "Leave Accrual MCP Server",
         "protocol": "JSON-RPC 2.0",
-        "version": "0.1.0"
+        "version": "0.1.0",
+        "cache": {
+            "GetLeaveAccrual": leave_accrual_cache.snapshot()
+        },
+        "sessions": sessions.snapshot()
     }
 
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics"""
+    cache = leave_accrual_cache.snapshot()
+    session_stats = sessions.snapshot()
+    return PlainTextResponse(
+        render_metrics(
+            gauges={
+                "mcp_tool_cache_entries": cache["entries"],
+                "mcp_sessions_active": session_stats["active"],
+            },
+            counters={
+                "mcp_tool_cache_hits_total": cache["hits"],
+                "mcp_tool_cache_misses_total": cache["misses"],
+                "mcp_tool_cache_coalesced_total": cache["coalesced"],
+                "mcp_tool_cache_stale_served_total": cache["stale_served"],
+                "mcp_sessions_created_total": session_stats["created"],
+            },
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 # Run with: uvicorn main:app --reload --port 8000
\ No newline at end of file
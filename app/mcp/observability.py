@@ -0,0 +1,187 @@
+"""
+MCP Observability
+=================
+
+Structured logging and metrics for the MCP server.
+
+Logging:
+- one JSON line per event on the "mcp" logger, level MCP_LOG_LEVEL
+- records are handed to a QueueHandler; a background QueueListener does the
+  formatting and the console write, so request handlers never block on stderr
+- `log_event` checks the level before building anything, so disabled events
+  cost one comparison
+- request bodies are logged at DEBUG for a sample of requests only
+  (MCP_LOG_BODY_SAMPLE_RATE), truncated to MCP_LOG_BODY_MAX_CHARS
+
+Metrics (Prometheus text format on GET /metrics):
+- mcp_rpc_duration_seconds{method}          histogram per JSON-RPC method
+- mcp_rpc_errors_total{method,code}         JSON-RPC error responses
+- mcp_http_requests_total{status}           POST /mcp responses by status
+- hr_api_request_duration_seconds{outcome}  histogram per HR API attempt
+- hr_api_retries_total                      retried HR API attempts
+plus gauges taken from the result cache and session store at scrape time.
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+from bisect import bisect_left
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config.mcp_settings import mcp_settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ============================================
+# Logging
+# ============================================
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+logger = logging.getLogger("mcp")
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str = mcp_settings.MCP_LOG_LEVEL) -> None:
+    """Route the "mcp" logger through a queue to a JSON console handler."""
+    global _listener
+    if _listener is not None:
+        return
+    console = logging.StreamHandler()
+    console.setFormatter(JsonFormatter())
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    _listener = QueueListener(log_queue, console)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records (MCP server shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_event(level: int, event: str, **fields: Any) -> None:
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def sample_body() -> bool:
+    """Whether this request's body should be logged."""
+    rate = mcp_settings.MCP_LOG_BODY_SAMPLE_RATE
+    return rate > 0 and logger.isEnabledFor(logging.DEBUG) and random.random() < rate
+
+
+def truncate(text: str, limit: int = mcp_settings.MCP_LOG_BODY_MAX_CHARS) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}... ({len(text)} chars)"
+
+
+# ============================================
+# Metrics
+# ============================================
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        # /metrics renders in the threadpool while the event loop adds label sets
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        # Copy under the lock: a consistent snapshot of each series' buckets and sum
+        with self._lock:
+            series = sorted((labels, (list(counts), list(total))) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {total[0]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+rpc_duration = Histogram("mcp_rpc_duration_seconds", "JSON-RPC method handling time", ["method"])
+rpc_errors = Counter("mcp_rpc_errors_total", "JSON-RPC error responses", ["method", "code"])
+http_requests = Counter("mcp_http_requests_total", "POST /mcp responses", ["status"])
+hr_api_duration = Histogram("hr_api_request_duration_seconds", "HR API request time per attempt", ["outcome"])
+hr_api_retries = Counter("hr_api_retries_total", "Retried HR API attempts")
+
+METRICS = [rpc_duration, rpc_errors, http_requests, hr_api_duration, hr_api_retries]
+
+
+def render_metrics(gauges: Optional[Dict[str, float]] = None, counters: Optional[Dict[str, float]] = None) -> str:
+    """Prometheus text exposition of all metrics plus values read from other components."""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for kind, values in (("gauge", gauges), ("counter", counters)):
+        for name, value in (values or {}).items():
+            lines.extend([f"# TYPE {name} {kind}", f"{name} {value:g}"])
+    return "\n".join(lines) + "\n"
+
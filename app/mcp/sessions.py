@@ -0,0 +1,85 @@
+"""
+MCP Sessions
+============
+
+Session state for the streamable-HTTP MCP transport.
+
+`initialize` creates a session and the server returns its id in the
+`Mcp-Session-Id` response header; clients send it back on every request and
+end it with `DELETE /mcp`. A request carrying an unknown or expired id gets
+HTTP 404, which tells spec-compliant clients to initialize again.
+
+Sessions expire after MCP_SESSION_IDLE_SECONDS without requests; at most
+MCP_MAX_SESSIONS are kept (least recently used dropped first).
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.config.mcp_settings import mcp_settings
+
+SESSION_HEADER = "Mcp-Session-Id"
+
+
+@dataclass
+class McpSession:
+    id: str
+    protocol_version: Optional[str] = None
+    client_info: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+    last_seen: float = field(default_factory=time.monotonic)
+    requests: int = 0
+
+
+class SessionStore:
+    def __init__(
+        self,
+        idle_seconds: float = mcp_settings.MCP_SESSION_IDLE_SECONDS,
+        max_sessions: int = mcp_settings.MCP_MAX_SESSIONS,
+    ):
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, McpSession]" = OrderedDict()
+        self.created = 0
+        self.expired = 0
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        # Ordered by last use, so expired sessions are at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen <= self.idle_seconds and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def create(self, params: Optional[Dict[str, Any]] = None) -> McpSession:
+        params = params or {}
+        session = McpSession(
+            id=secrets.token_hex(16),
+            protocol_version=params.get("protocolVersion"),
+            client_info=params.get("clientInfo") or {},
+        )
+        self._sessions[session.id] = session
+        self.created += 1
+        self._prune()
+        return session
+
+    def get(self, session_id: str) -> Optional[McpSession]:
+        """Return and touch a live session; None if unknown or expired."""
+        self._prune()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_seen = time.monotonic()
+            session.requests += 1
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"active": len(self._sessions), "created": self.created, "expired": self.expired}
@@ -0,0 +1,139 @@
+"""
+MCP Tool Result Cache
+=====================
+
+TTL cache for MCP tool results (GetLeaveAccrual).
+
+The Leave Agent asks for the same (people_uuid, effective_date) over and over
+within a conversation, and different users ask for the same day. Results are
+keyed by tool name, canonical JSON arguments and caller identity, so one
+caller's answer is never served to another:
+- fresh for MCP_CACHE_TTL_SECONDS
+- single-flight: concurrent identical calls share one upstream request
+- stale-if-error: after the TTL an entry is kept for MCP_CACHE_STALE_SECONDS
+  more; if refetching fails within that window the stale value is served
+- bounded LRU (MCP_CACHE_MAX_ENTRIES)
+
+Failed fetches are never cached. Counters are exposed on the MCP server's
+health endpoint.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from agno.utils.log import logger
+
+from app.config.mcp_settings import mcp_settings
+
+
+def cache_key(tool: str, arguments: Dict[str, Any], caller: str) -> str:
+    return f"{tool}:{caller}:{json.dumps(arguments, sort_keys=True, separators=(',', ':'))}"
+
+
+def caller_identity(authorization: Optional[str]) -> str:
+    """Stable short identity for a caller credential (never the credential itself)."""
+    if not authorization:
+        return "anonymous"
+    return hashlib.sha256(authorization.encode()).hexdigest()[:16]
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    # Mark a failed fetch retrieved when every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    stale_served: int = 0
+    errors: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {**asdict(self), "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0}
+
+
+class ToolResultCache:
+    def __init__(
+        self,
+        ttl_seconds: float = mcp_settings.MCP_CACHE_TTL_SECONDS,
+        stale_seconds: float = mcp_settings.MCP_CACHE_STALE_SECONDS,
+        max_entries: int = mcp_settings.MCP_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.stats = ToolCacheStats()
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _store(self, key: str, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value for `key`, calling `fetch` at most once per key at a time."""
+        entry = self._entries.get(key)
+        age = time.monotonic() - entry[1] if entry is not None else None
+        if entry is not None and age <= self.ttl_seconds:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            # The fetch runs in its own task, so a cancelled caller (client
+            # disconnect) - including the one that started it - never cancels
+            # the request the other callers are waiting on.
+            inflight = asyncio.ensure_future(self._fetch(key, fetch, entry, age))
+            inflight.add_done_callback(_retrieve_exception)
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        entry: Optional[Tuple[Any, float]],
+        age: Optional[float],
+    ) -> Any:
+        try:
+            value = await fetch()
+        except Exception as e:
+            self.stats.errors += 1
+            if entry is not None and age <= self.ttl_seconds + self.stale_seconds:
+                self.stats.stale_served += 1
+                logger.warning(f"Upstream failed for {key}, serving {age:.0f}s old result: {e}")
+                return entry[0]
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._store(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            **self.stats.to_dict(),
+        }
@@ -0,0 +1,219 @@
+"""
+Deferred Memory Extraction
+==========================
+
+User-memory extraction (a model call plus Postgres writes) taken off the
+request path.
+
+- `DeferredLearningMachine` is a LearningMachine whose in-run processing skips
+  the user_memory store (recall into the context is unchanged)
+- `defer_memory_extraction` (post-hook) queues the finished turn: the user
+  input and the answer
+- `run_memory_worker` (started from the AgentOS lifespan) takes pending users
+  every MEMORY_FLUSH_INTERVAL_SECONDS and runs one extraction per user over all
+  of that user's queued turns, across sessions
+
+The queue is bounded:
+- turns of a user already in the queue are coalesced into that user's entry;
+  past MEMORY_MAX_TURNS_PER_USER the oldest turn is dropped
+- a new user beyond MEMORY_QUEUE_MAX_USERS is handled by MEMORY_QUEUE_OVERFLOW:
+  "drop_oldest" evicts the user queued longest, "drop_newest" drops the new turn
+
+`memory_queue.stats` counts queued, coalesced, dropped and written turns and
+keeps the memory-write lag (turn queued -> memories written). Extraction model
+calls run at background priority in model admission control.
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from agno.learn import LearningMachine
+from agno.models.message import Message
+from agno.run.agent import RunOutput
+from agno.utils.log import logger
+
+from app.config.settings import settings
+from app.models.admission import background
+
+
+@dataclass
+class DeferredLearningMachine(LearningMachine):
+    """LearningMachine that leaves user-memory extraction to the deferred worker."""
+
+    def _in_run_stores(self) -> Dict[str, Any]:
+        if not settings.MEMORY_DEFERRED:
+            return self.stores
+        return {name: store for name, store in self.stores.items() if name != "user_memory"}
+
+    def _context(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {**kwargs, "namespace": kwargs.get("namespace") or self.namespace}
+
+    def process(self, messages: List[Any], **kwargs: Any) -> None:
+        for name, store in self._in_run_stores().items():
+            try:
+                store.process(messages=messages, **self._context(kwargs))
+            except Exception as e:
+                logger.warning(f"Error processing through {name}: {e}")
+
+    async def aprocess(self, messages: List[Any], **kwargs: Any) -> None:
+        for name, store in self._in_run_stores().items():
+            try:
+                await store.aprocess(messages=messages, **self._context(kwargs))
+            except Exception as e:
+                logger.warning(f"Error processing through {name}: {e}")
+
+
+@dataclass
+class Turn:
+    session_id: Optional[str]
+    messages: List[Message]
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PendingMemory:
+    user_id: str
+    agent_id: Optional[str]
+    store: Any  # the agent's UserMemoryStore
+    turns: List[Turn] = field(default_factory=list)
+
+
+@dataclass
+class MemoryQueueStats:
+    queued: int = 0
+    coalesced: int = 0  # turns added to a user already in the queue
+    dropped: int = 0
+    written: int = 0  # turns whose memories were extracted and saved
+    extractions: int = 0  # model calls (one per user per batch)
+    errors: int = 0
+    lag: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def to_dict(self) -> Dict[str, Any]:
+        lag = sorted(self.lag)
+        data = {k: v for k, v in asdict(self).items() if k != "lag"}
+        data["lag_p50_seconds"] = round(statistics.median(lag), 3) if lag else None
+        data["lag_p99_seconds"] = round(lag[min(len(lag) - 1, int(len(lag) * 0.99))], 3) if lag else None
+        data["turns_per_extraction"] = round(self.written / self.extractions, 2) if self.extractions else None
+        return data
+
+
+class MemoryQueue:
+    def __init__(
+        self,
+        max_users: int = settings.MEMORY_QUEUE_MAX_USERS,
+        max_turns_per_user: int = settings.MEMORY_MAX_TURNS_PER_USER,
+        overflow: str = settings.MEMORY_QUEUE_OVERFLOW,
+    ):
+        self.max_users = max_users
+        self.max_turns_per_user = max_turns_per_user
+        self.overflow = overflow
+        self.stats = MemoryQueueStats()
+        self._pending: "OrderedDict[str, PendingMemory]" = OrderedDict()
+        self._lock = threading.Lock()  # post-hooks of sync runs call put() from worker threads
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, user_id: str, agent_id: Optional[str], store: Any, turn: Turn) -> bool:
+        with self._lock:
+            self.stats.queued += 1
+            pending = self._pending.get(user_id)
+            if pending is None:
+                if len(self._pending) >= self.max_users:
+                    if self.overflow == "drop_newest":
+                        self.stats.dropped += 1
+                        return False
+                    _, evicted = self._pending.popitem(last=False)
+                    self.stats.dropped += len(evicted.turns)
+                pending = self._pending[user_id] = PendingMemory(user_id=user_id, agent_id=agent_id, store=store)
+            else:
+                self.stats.coalesced += 1
+                pending.store = store
+            pending.turns.append(turn)
+            if len(pending.turns) > self.max_turns_per_user:
+                pending.turns.pop(0)
+                self.stats.dropped += 1
+            return True
+
+    def take(self, max_users: int) -> List[PendingMemory]:
+        with self._lock:
+            batch = []
+            while self._pending and len(batch) < max_users:
+                batch.append(self._pending.popitem(last=False)[1])
+            return batch
+
+
+memory_queue = MemoryQueue()
+
+
+def defer_memory_extraction(run_output: RunOutput, agent: Any, user_id: Optional[str] = None) -> None:
+    """Post-hook: queue the finished turn for the memory worker."""
+    if not settings.MEMORY_DEFERRED:
+        return
+    user_id = user_id or run_output.user_id
+    learning = agent.get_learning_machine() if hasattr(agent, "get_learning_machine") else None
+    store = learning.user_memory_store if learning is not None else None
+    if not user_id or store is None or run_output.input is None:
+        return
+    # Just this turn: user input and answer, without history or knowledge context
+    messages = [Message(role="user", content=run_output.input.input_content_string())]
+    if run_output.content:
+        messages.append(Message(role="assistant", content=str(run_output.content)))
+    memory_queue.put(user_id, agent.id, store, Turn(session_id=run_output.session_id, messages=messages))
+
+
+def _extract(pending: PendingMemory) -> None:
+    messages = [message for turn in pending.turns for message in turn.messages]
+    # Queues behind interactive model calls (app/models/admission.py)
+    with background():
+        pending.store.extract_and_save(messages=messages, user_id=pending.user_id, agent_id=pending.agent_id)
+
+
+async def flush(queue: MemoryQueue = memory_queue, max_users: int = settings.MEMORY_BATCH_MAX_USERS) -> int:
+    """Extract and save memories for up to `max_users` pending users; returns the turns written."""
+    batch = queue.take(max_users)
+    if not batch:
+        return 0
+    semaphore = asyncio.Semaphore(settings.MEMORY_WORKER_CONCURRENCY)
+
+    async def run(pending: PendingMemory) -> int:
+        async with semaphore:
+            try:
+                await asyncio.to_thread(_extract, pending)
+            except Exception as e:
+                queue.stats.errors += 1
+                logger.error(f"Deferred memory extraction failed for user {pending.user_id}: {e}")
+                return 0
+        done = time.monotonic()
+        queue.stats.extractions += 1
+        queue.stats.written += len(pending.turns)
+        queue.stats.lag.extend(done - turn.queued_at for turn in pending.turns)
+        return len(pending.turns)
+
+    written = sum(await asyncio.gather(*(run(pending) for pending in batch)))
+    logger.debug(f"Deferred memory: {written} turns from {len(batch)} users written, {len(queue)} users pending")
+    return written
+
+
+async def run_memory_worker(interval: float = settings.MEMORY_FLUSH_INTERVAL_SECONDS) -> None:
+    """Flush the memory queue every `interval` seconds (started from the AgentOS lifespan)."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            while len(memory_queue):
+                await flush()
+    finally:
+        # Shutdown: write what is still queued, bounded by MEMORY_SHUTDOWN_TIMEOUT_SECONDS
+        async def drain() -> None:
+            while len(memory_queue):
+                await flush()
+
+        try:
+            await asyncio.wait_for(drain(), settings.MEMORY_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Deferred memory: {len(memory_queue)} users still pending at shutdown")
@@ -0,0 +1,201 @@
+"""
+History Compaction
+==================
+
+Bounded prompts for long sessions. `CompactingAgent` is an Agent that
+post-processes the history agno adds to the context (add_history_to_context /
+num_history_runs):
+
+- tool results in history are replaced by what the model needs to remember
+  about them: the SQL (tool arguments) and the row-count footer of the
+  app/tools/sql_result.py encoding; other tools are cut to
+  HISTORY_TOOL_RESULT_MAX_CHARS
+- only the last `history_raw_turns` turns stay verbatim; older turns are
+  folded into a rolling summary, one digest line per turn (question, start of
+  the answer, SQL run and rows returned), built without a model call
+- the summary is persisted with the session (session_data["history_summary"])
+  and extended incrementally: each turn is digested once, when it leaves the
+  raw window; the oldest lines go once it exceeds HISTORY_SUMMARY_MAX_TOKENS
+- `history_max_prompt_tokens` is a hard budget for the prompt (messages plus
+  tool definitions): over it, the oldest raw turns are folded into the summary,
+  then the oldest summary lines are dropped
+
+The summary reaches the model as one history-tagged user message ahead of the
+raw turns, so agno never stores it as part of the conversation.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from agno.agent import Agent
+from agno.models.message import Message
+from agno.run.messages import RunMessages
+from agno.utils.log import logger
+from agno.utils.tokens import count_tokens
+
+from app.config.settings import settings
+
+SUMMARY_KEY = "history_summary"
+_ROWS_FOOTER = re.compile(r"^-- \d[\d,]* of .*rows.*$", re.MULTILINE)
+
+
+def _tokens(message: Message, model_id: str) -> int:
+    return count_tokens([message], model_id=model_id)
+
+
+def _one_line(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def _sql_of(message: Message) -> Optional[str]:
+    args = message.tool_args if isinstance(message.tool_args, dict) else {}
+    sql = args.get("query") or args.get("sql") or args.get("queries")
+    return " | ".join(sql) if isinstance(sql, list) else sql
+
+
+def compact_tool_result(message: Message) -> str:
+    content = message.get_content_string()
+    sql = _sql_of(message)
+    footers = _ROWS_FOOTER.findall(content)
+    if sql or footers:
+        parts = [f"SQL: {_one_line(sql, 600)}"] if sql else []
+        parts.append(" ".join(footers) if footers else _one_line(content, 200))
+        return "[earlier result compacted] " + "\n".join(parts)
+    return _one_line(content, settings.HISTORY_TOOL_RESULT_MAX_CHARS)
+
+
+def split_turns(history: List[Message]) -> List[List[Message]]:
+    """History messages grouped per turn; a turn starts at a user message."""
+    turns: List[List[Message]] = []
+    for message in history:
+        if message.role == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def digest(turn: List[Message]) -> str:
+    question = next((m.get_content_string() for m in turn if m.role == "user"), "")
+    answer = next((m.get_content_string() for m in reversed(turn) if m.role == "assistant" and m.content), "")
+    line = f"- User: {_one_line(question, 200)} | Assistant: {_one_line(answer, 240)}"
+    for message in turn:
+        if message.role == "tool":
+            sql = _sql_of(message)
+            footer = _ROWS_FOOTER.search(message.get_content_string())
+            if sql:
+                line += f" | SQL: {_one_line(sql, 300)}"
+            if footer:
+                line += f" ({footer.group(0).lstrip('- ')})"
+    return line
+
+
+@dataclass
+class HistorySummary:
+    lines: List[str]
+    turn_ids: List[str]  # ids of the user messages of digested turns (recent window only)
+
+    @classmethod
+    def load(cls, session: Any) -> "HistorySummary":
+        data = (getattr(session, "session_data", None) or {}).get(SUMMARY_KEY) or {}
+        return cls(lines=list(data.get("lines", [])), turn_ids=list(data.get("turn_ids", [])))
+
+    def save(self, session: Any) -> None:
+        if session.session_data is None:
+            session.session_data = {}
+        session.session_data[SUMMARY_KEY] = {"lines": self.lines, "turn_ids": self.turn_ids[-200:]}
+
+    def add(self, turn: List[Message]) -> None:
+        turn_id = turn[0].id
+        if turn_id in self.turn_ids:
+            return
+        self.lines.append(digest(turn))
+        self.turn_ids.append(turn_id)
+
+    def trim(self, max_tokens: int, model_id: str) -> None:
+        while self.lines and _tokens(self.to_message(), model_id) > max_tokens:
+            self.lines.pop(0)
+
+    def to_message(self) -> Message:
+        content = "Summary of the earlier conversation (oldest first):\n" + "\n".join(self.lines)
+        return Message(role="user", content=content, from_history=True)
+
+
+@dataclass(init=False)
+class CompactingAgent(Agent):
+    history_raw_turns: Optional[int] = None
+    history_max_prompt_tokens: Optional[int] = None
+
+    def __init__(
+        self,
+        *,
+        history_raw_turns: Optional[int] = None,
+        history_max_prompt_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.history_raw_turns = history_raw_turns if history_raw_turns is not None else settings.HISTORY_RAW_TURNS
+        self.history_max_prompt_tokens = history_max_prompt_tokens
+
+    def _get_run_messages(self, **kwargs: Any) -> RunMessages:
+        run_messages = super()._get_run_messages(**kwargs)
+        self._compact(run_messages, kwargs.get("session"), kwargs.get("tools"))
+        return run_messages
+
+    async def _aget_run_messages(self, **kwargs: Any) -> RunMessages:
+        run_messages = await super()._aget_run_messages(**kwargs)
+        self._compact(run_messages, kwargs.get("session"), kwargs.get("tools"))
+        return run_messages
+
+    def _compact(self, run_messages: RunMessages, session: Any, tools: Optional[List[Any]]) -> None:
+        if not settings.HISTORY_COMPACTION or session is None:
+            return
+        history = [m for m in run_messages.messages if m.from_history]
+        if not history:
+            return
+        model_id = self.model.id if self.model is not None else "gpt-4o"
+        before = count_tokens(history, model_id=model_id)
+
+        for message in history:
+            if message.role == "tool":
+                message.content = compact_tool_result(message)
+                message.compressed_content = None
+
+        turns = split_turns(history)
+        summary = HistorySummary.load(session)
+        keep = max(self.history_raw_turns, 0)
+        for turn in turns[: len(turns) - keep] if keep else turns:
+            summary.add(turn)
+        raw = turns[len(turns) - keep:] if keep else []
+        summary.trim(settings.HISTORY_SUMMARY_MAX_TOKENS, model_id)
+
+        if self.history_max_prompt_tokens:
+            others = [m for m in run_messages.messages if not m.from_history]
+            fixed = count_tokens(others, tools=tools, model_id=model_id)
+            turn_tokens = [count_tokens(turn, model_id=model_id) for turn in raw]
+
+            def total() -> int:
+                return fixed + sum(turn_tokens) + (_tokens(summary.to_message(), model_id) if summary.lines else 0)
+
+            while raw and total() > self.history_max_prompt_tokens:
+                summary.add(raw.pop(0))
+                turn_tokens.pop(0)
+            while summary.lines and total() > self.history_max_prompt_tokens:
+                summary.lines.pop(0)
+            if total() > self.history_max_prompt_tokens:
+                logger.warning(
+                    f"{self.name}: prompt is {total()} tokens without history, over the "
+                    f"{self.history_max_prompt_tokens} token budget"
+                )
+
+        summary.save(session)
+        compacted = ([summary.to_message()] if summary.lines else []) + [m for turn in raw for m in turn]
+        # History sits between the system/extra messages and the new user message
+        start = run_messages.messages.index(history[0])
+        rest = [m for m in run_messages.messages[start:] if not m.from_history]
+        run_messages.messages[start:] = compacted + rest
+        logger.debug(
+            f"{self.name}: history {before} -> {count_tokens(compacted, model_id=model_id)} tokens "
+            f"({len(raw)} raw turns, {len(summary.lines)} summary lines)"
+        )
@@ -0,0 +1,192 @@
+"""
+Knowledge Maintenance
+=====================
+
+Filtered, rate-limited deletion of knowledge points.
+
+Points are matched on the payload agno writes to Qdrant:
+- meta_data.source / meta_data.title / meta_data.category  (exact match)
+- meta_data.url                                             (prefix match, checked client-side)
+- meta_data.ingested_at                                     (epoch seconds, stamped at ingestion)
+
+Deletion runs in paged batches with `wait=True` and a batches-per-second cap,
+so a large cleanup does not compete with live search traffic. Matching rows
+in the agent contents_db are removed once none of their points remain.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from agno.utils.log import logger
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from app.config.settings import settings
+
+
+def ingestion_timestamp() -> int:
+    """Value stored in `meta_data.ingested_at` for new content."""
+    return int(time.time())
+
+
+@dataclass
+class KnowledgeFilter:
+    source: Optional[str] = None
+    title: Optional[str] = None
+    category: Optional[str] = None
+    url_prefix: Optional[str] = None
+    ingested_before: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return not any([self.source, self.title, self.category, self.url_prefix, self.ingested_before])
+
+    def to_qdrant(self) -> models.Filter:
+        must: List[Any] = []
+        for key in ("source", "title", "category"):
+            value = getattr(self, key)
+            if value:
+                must.append(models.FieldCondition(key=f"meta_data.{key}", match=models.MatchValue(value=value)))
+        if self.ingested_before:
+            # Points ingested before `ingested_at` was stamped have no value and never match
+            must.append(
+                models.FieldCondition(
+                    key="meta_data.ingested_at",
+                    range=models.Range(lt=self.ingested_before.timestamp()),
+                )
+            )
+        return models.Filter(must=must)
+
+    def matches_url(self, payload: Dict[str, Any]) -> bool:
+        if not self.url_prefix:
+            return True
+        url = (payload.get("meta_data") or {}).get("url") or ""
+        return url.startswith(self.url_prefix)
+
+
+@dataclass
+class DeleteResult:
+    matched: int = 0
+    deleted: int = 0
+    batches: int = 0
+    content_rows_deleted: int = 0
+    content_ids: Set[str] = field(default_factory=set)
+    dry_run: bool = False
+
+
+def iter_matching_batches(
+    client: QdrantClient,
+    collection: str,
+    knowledge_filter: KnowledgeFilter,
+    batch_size: int,
+) -> Iterator[Tuple[List[Any], Set[str]]]:
+    """Scroll matching points page by page, yielding `(point_ids, content_ids)`."""
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            scroll_filter=knowledge_filter.to_qdrant(),
+            limit=batch_size,
+            offset=offset,
+            with_payload=["meta_data.url", "content_id"],
+            with_vectors=False,
+        )
+        matched = [p for p in points if knowledge_filter.matches_url(p.payload or {})]
+        if matched:
+            yield (
+                [p.id for p in matched],
+                {p.payload["content_id"] for p in matched if (p.payload or {}).get("content_id")},
+            )
+        if offset is None:
+            return
+
+
+def count_matching(client: QdrantClient, collection: str, knowledge_filter: KnowledgeFilter, batch_size: int = 1000) -> int:
+    if not knowledge_filter.url_prefix:
+        return client.count(collection_name=collection, count_filter=knowledge_filter.to_qdrant(), exact=True).count
+    return sum(len(ids) for ids, _ in iter_matching_batches(client, collection, knowledge_filter, batch_size))
+
+
+def _delete_orphaned_content_rows(client: QdrantClient, collection: str, content_ids: Set[str], contents_db) -> int:
+    """Delete contents_db rows whose points are all gone (a URL-prefix delete may leave some)."""
+    deleted = 0
+    for content_id in content_ids:
+        remaining = client.count(
+            collection_name=collection,
+            count_filter=models.Filter(
+                must=[models.FieldCondition(key="content_id", match=models.MatchValue(value=content_id))]
+            ),
+            exact=True,
+        ).count
+        if remaining == 0:
+            contents_db.delete_knowledge_content(id=content_id)
+            deleted += 1
+    return deleted
+
+
+def delete_knowledge(
+    knowledge_filter: KnowledgeFilter,
+    batch_size: int = 256,
+    max_batches_per_second: float = 2.0,
+    dry_run: bool = False,
+    contents_db=None,
+    client: Optional[QdrantClient] = None,
+    collection: Optional[str] = None,
+) -> DeleteResult:
+    """Delete knowledge points matching `knowledge_filter` in rate-limited batches.
+
+    Args:
+        knowledge_filter: What to delete. An empty filter is rejected; use `delete_points.py --all`.
+        batch_size: Points per scroll page / delete request.
+        max_batches_per_second: Upper bound on delete requests per second.
+        dry_run: Only count matching points.
+        contents_db: Optional agno db (e.g. `get_postgres_db_dummy_data()`) whose knowledge
+            rows are removed when all their points are deleted.
+        client: Optional QdrantClient (defaults to settings).
+        collection: Collection or alias (defaults to QDRANT_COLLECTION_NAME).
+
+    Returns:
+        DeleteResult: Counts of matched/deleted points and deleted content rows.
+    """
+    if knowledge_filter.is_empty():
+        raise ValueError("Refusing to delete with an empty filter")
+
+    client = client or QdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+    collection = collection or settings.QDRANT_COLLECTION_NAME
+    result = DeleteResult(dry_run=dry_run)
+
+    if dry_run:
+        result.matched = count_matching(client, collection, knowledge_filter)
+        return result
+
+    min_interval = 1.0 / max_batches_per_second if max_batches_per_second > 0 else 0.0
+    last_batch = 0.0
+    for point_ids, content_ids in iter_matching_batches(client, collection, knowledge_filter, batch_size):
+        wait_for = min_interval - (time.monotonic() - last_batch)
+        if wait_for > 0:
+            time.sleep(wait_for)
+        last_batch = time.monotonic()
+
+        # wait=True applies back-pressure: the next page is not read until this delete is committed
+        client.delete(
+            collection_name=collection,
+            points_selector=models.PointIdsList(points=point_ids),
+            wait=True,
+        )
+        result.matched += len(point_ids)
+        result.deleted += len(point_ids)
+        result.batches += 1
+        result.content_ids |= content_ids
+        logger.debug(f"Deleted batch {result.batches}: {len(point_ids)} points")
+
+    if contents_db is not None and result.content_ids:
+        result.content_rows_deleted = _delete_orphaned_content_rows(
+            client, collection, result.content_ids, contents_db
+        )
+
+    logger.info(
+        f"Deleted {result.deleted} points in {result.batches} batches, "
+        f"{result.content_rows_deleted} contents_db rows"
+    )
+    return result
@@ -0,0 +1,194 @@
+"""
+Blue/Green Reindexing
+=====================
+
+Zero-downtime rebuilds of the knowledge collection using Qdrant aliases.
+
+`QDRANT_COLLECTION_NAME` (e.g. "agent-knowledge") is an alias pointing at a
+versioned collection such as "agent-knowledge__v20261019T101500". A rebuild:
+1. Creates a new versioned collection with the live collection's config
+2. Ingests everything into it while agents keep searching the old version
+3. Waits for the upserts to land, then verifies the point count against the live version
+4. Atomically re-points the alias (delete + create in one request)
+5. Garbage-collects old versions, keeping the newest few for rollback
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from agno.utils.log import logger
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from app.config.settings import settings
+
+VERSION_SEPARATOR = "__v"
+
+
+class ReindexError(Exception):
+    """Raised when a rebuild fails verification; the alias is left untouched."""
+
+
+def get_qdrant_client() -> QdrantClient:
+    return QdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """Return the collection an alias points at, or None if it is not an alias."""
+    for item in client.get_aliases().aliases:
+        if item.alias_name == alias:
+            return item.collection_name
+    return None
+
+
+def list_versions(client: QdrantClient, alias: str) -> List[str]:
+    """Versioned collections for `alias`, oldest first (names sort by timestamp)."""
+    prefix = f"{alias}{VERSION_SEPARATOR}"
+    names = [c.name for c in client.get_collections().collections]
+    return sorted(name for name in names if name.startswith(prefix))
+
+
+def new_version_name(alias: str) -> str:
+    return f"{alias}{VERSION_SEPARATOR}{datetime.now(timezone.utc):%Y%m%dT%H%M%S}"
+
+
+def count_points(client: QdrantClient, collection: str) -> int:
+    return client.count(collection_name=collection, exact=True).count
+
+
+def wait_for_count(client: QdrantClient, collection: str, settle: float = 3.0, timeout: float = 120.0) -> int:
+    """Point count of `collection` once it stops changing.
+
+    Qdrant.insert upserts with wait=False, so points are still being applied
+    when the build returns. Poll until the count is unchanged for `settle`
+    seconds (or `timeout` passes) so verification does not undercount.
+    """
+    deadline = time.monotonic() + timeout
+    count = count_points(client, collection)
+    stable_since = time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(0.5)
+        current = count_points(client, collection)
+        if current != count:
+            count, stable_since = current, time.monotonic()
+        elif time.monotonic() - stable_since >= settle:
+            break
+    else:
+        logger.warning(f"Point count of {collection} still changing after {timeout}s; verifying with {count}")
+    return count
+
+
+def create_version_like(client: QdrantClient, source: str, target: str) -> None:
+    """Create `target` with the same vector, sparse-vector and payload-index config as `source`."""
+    info = client.get_collection(collection_name=source)
+    params = info.config.params
+
+    client.create_collection(
+        collection_name=target,
+        vectors_config=params.vectors,
+        sparse_vectors_config=params.sparse_vectors,
+        on_disk_payload=params.on_disk_payload,
+    )
+
+    # Keyword indexes (e.g. content_hash, meta_data.title) are needed for
+    # filtered search and must exist before traffic switches over.
+    for field_name, index in (info.payload_schema or {}).items():
+        client.create_payload_index(
+            collection_name=target,
+            field_name=field_name,
+            field_schema=index.params or index.data_type,
+        )
+
+
+def switch_alias(client: QdrantClient, alias: str, collection: str) -> None:
+    """Atomically point `alias` at `collection`.
+
+    Both operations are applied in one request, so searches never observe
+    a missing alias.
+    """
+    operations = []
+    if resolve_alias(client, alias) is not None:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+    operations.append(
+        models.CreateAliasOperation(
+            create_alias=models.CreateAlias(collection_name=collection, alias_name=alias)
+        )
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+
+def garbage_collect(client: QdrantClient, alias: str, keep: int = 2) -> List[str]:
+    """Delete all but the newest `keep` versions. The live version is never deleted."""
+    live = resolve_alias(client, alias)
+    versions = list_versions(client, alias)
+    stale = [v for v in versions[: max(len(versions) - keep, 0)] if v != live]
+    for name in stale:
+        client.delete_collection(collection_name=name)
+        logger.info(f"Deleted old knowledge version: {name}")
+    return stale
+
+
+def reindex(
+    build: Callable[[str], None],
+    alias: str = settings.QDRANT_COLLECTION_NAME,
+    min_ratio: float = 0.9,
+    keep: int = 2,
+    migrate: bool = False,
+    client: Optional[QdrantClient] = None,
+) -> str:
+    """Rebuild the knowledge base into a new version and switch `alias` to it.
+
+    Args:
+        build: Callback that ingests all sources into the given collection name.
+            It must raise if any source failed, so a partial index is never switched to.
+        alias: Alias that agents search (QDRANT_COLLECTION_NAME).
+        min_ratio: Minimum new/old point-count ratio required to switch.
+        keep: Number of versions to keep after switching (including the live one).
+        migrate: Allow replacing a concrete collection named `alias` with an alias.
+            This one-time step has a brief window where `alias` does not exist.
+        client: Optional QdrantClient (defaults to settings).
+
+    Returns:
+        str: Name of the new live collection.
+    """
+    client = client or get_qdrant_client()
+
+    live = resolve_alias(client, alias)
+    is_concrete = live is None and client.collection_exists(collection_name=alias)
+    if is_concrete and not migrate:
+        raise ReindexError(
+            f"'{alias}' is a concrete collection, not an alias. "
+            "Re-run with migrate=True (--migrate) once to convert it."
+        )
+    source = live or (alias if is_concrete else None)
+
+    target = new_version_name(alias)
+    if source:
+        create_version_like(client, source, target)
+    logger.info(f"Building knowledge version {target} (live: {source or 'none'})")
+
+    try:
+        build(target)
+    except Exception as e:
+        raise ReindexError(f"Build of {target} failed, alias unchanged: {e}") from e
+
+    new_count = wait_for_count(client, target)
+    old_count = count_points(client, source) if source else 0
+    logger.info(f"Point count: new={new_count} old={old_count}")
+    if new_count == 0 or (old_count and new_count < old_count * min_ratio):
+        raise ReindexError(
+            f"Verification failed for {target}: {new_count} points vs {old_count} live "
+            f"(min ratio {min_ratio}). Alias unchanged; delete {target} or investigate."
+        )
+
+    if is_concrete:
+        # Qdrant cannot alias over an existing collection name
+        logger.warning(f"Migrating concrete collection '{alias}' to an alias")
+        client.delete_collection(collection_name=alias)
+
+    switch_alias(client, alias, target)
+    logger.info(f"Alias '{alias}' now points at {target}")
+
+    garbage_collect(client, alias, keep=keep)
+    return target
@@ -3,9 +3,24 @@ from agno.knowledge.embedder.openai import OpenAIEmbedder
 from app.config.settings import settings
 
 
-def get_vector_db():
-    return Qdrant(
-        collection=settings.QDRANT_COLLECTION_NAME,
+class AliasAwareQdrant(Qdrant):
+    """Qdrant that treats a collection alias as an existing collection.
+
+    QDRANT_COLLECTION_NAME may be an alias managed by app/scripts/reindex.py.
+    Without this, `create()` would try to create a real collection with the
+    alias name on the first ingestion after a reindex.
+    """
+
+    def exists(self) -> bool:
+        if super().exists():
+            return True
+        aliases = self.client.get_aliases().aliases
+        return any(alias.alias_name == self.collection for alias in aliases)
+
+
+def get_vector_db(collection: str | None = None):
+    return AliasAwareQdrant(
+        collection=collection or settings.QDRANT_COLLECTION_NAME,
         url=settings.QDRANT_URL,
         api_key=settings.QDRANT_API_KEY,
         embedder=OpenAIEmbedder(
@@ -0,0 +1,445 @@
+"""
+Model Admission Control
+=======================
+
+One admission controller in front of every remote model call of the process
+(RunPod / OpenAI-compatible), so a spike queues here instead of piling
+timeouts and retries onto the endpoint.
+
+A call is admitted when all of these hold:
+- fewer than MODEL_MAX_CONCURRENCY calls are running
+- fewer than MODEL_AGENT_MAX_CONCURRENCY calls of the same agent are running
+- for background work, fewer than MODEL_BACKGROUND_MAX_CONCURRENCY background
+  calls are running, so interactive chat always has slots left
+- the request bucket (MODEL_REQUESTS_PER_SECOND, MODEL_REQUESTS_BURST) and the
+  token bucket (MODEL_TOKENS_PER_MINUTE, charged the estimated prompt tokens,
+  corrected with the reported usage afterwards) have room; 0 disables a bucket
+
+Otherwise the call waits in a priority queue: interactive before background,
+first come first served within a priority. A call that is rate limited holds
+the head of the queue (nothing behind it overtakes); a call blocked only by its
+own agent's or the background limit lets the next one through. A call still
+queued after MODEL_QUEUE_TIMEOUT_SECONDS, or arriving at a full queue
+(MODEL_MAX_QUEUE_DEPTH), fails with ModelOverloadedError (503), which agno
+does not retry.
+
+Priority is a context variable: `with background():` marks the model calls
+made inside it; MODEL_DEFAULT_PRIORITY is used elsewhere. `AdmittedChat` is
+the OpenAIChat that goes through `admission`; CascadeChat's remote tier builds
+on it.
+
+The controller, its limits and its queue are per process. In the server that
+means deferred memory extraction queues behind interactive chat. The
+evaluation and chunking scripts run in their own processes with their own
+controller: `with background():` there only orders the script's own calls and
+caps them at MODEL_BACKGROUND_MAX_CONCURRENCY, it does not make them wait for
+the server's traffic.
+
+`admission.stats` keeps queue depth, wait times per priority, admitted,
+rejected and timed-out calls; served at GET /models/admission/stats.
+"""
+
+import asyncio
+import heapq
+import itertools
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from agno.exceptions import ModelProviderError
+from agno.models.message import Message
+from agno.models.openai import OpenAIChat
+from agno.models.response import ModelResponse
+from agno.run.base import RunStatus
+from agno.utils.log import logger
+
+from app.config.settings import settings
+
+OVERLOADED = "Model overloaded"
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("model_priority", default=None)
+
+
+def current_priority() -> Priority:
+    priority = _priority.get()
+    return priority if priority is not None else Priority[settings.MODEL_DEFAULT_PRIORITY.upper()]
+
+
+@contextmanager
+def priority(value: Priority) -> Iterator[None]:
+    token = _priority.set(value)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def background():
+    """Model calls made inside `with background():` queue behind interactive ones."""
+    return priority(Priority.BACKGROUND)
+
+
+class ModelOverloadedError(ModelProviderError):
+    def __init__(self, message: str, model_name: Optional[str] = None, model_id: Optional[str] = None):
+        super().__init__(f"{OVERLOADED}: {message}", status_code=503, model_name=model_name, model_id=model_id)
+
+
+def is_overloaded(run_output: Any) -> bool:
+    """True for a run that agno ended with a ModelOverloadedError (agno returns errors as content)."""
+    return getattr(run_output, "status", None) == RunStatus.error and str(run_output.content or "").startswith(OVERLOADED)
+
+
+class TokenBucket:
+    """`rate` units per second, up to `capacity`; `rate` 0 means unlimited. Not thread-safe."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available; 0 when it is available now."""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        if self.rate:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund, when negative) the difference to an estimate; may go below zero."""
+        if self.rate:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+@dataclass
+class AdmissionStats:
+    admitted: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    queued: Dict[str, int] = field(default_factory=lambda: defaultdict(int))  # admitted after waiting
+    rejected: Dict[str, int] = field(default_factory=lambda: defaultdict(int))  # queue full
+    timed_out: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    rate_limited: int = 0  # dispatches held back by a bucket
+    peak_queue_depth: int = 0
+    waits: Dict[str, Deque[float]] = field(default_factory=lambda: defaultdict(lambda: deque(maxlen=1000)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        def percentile(values: List[float], q: float) -> Optional[float]:
+            return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 1) if values else None
+
+        waits = {}
+        for name, recorded in self.waits.items():
+            values = sorted(recorded)
+            waits[name] = {
+                "p50_ms": round(statistics.median(values) * 1000, 1) if values else None,
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": round(values[-1] * 1000, 1) if values else None,
+            }
+        return {
+            "admitted": dict(self.admitted),
+            "queued": dict(self.queued),
+            "rejected": dict(self.rejected),
+            "timed_out": dict(self.timed_out),
+            "rate_limited": self.rate_limited,
+            "peak_queue_depth": self.peak_queue_depth,
+            "wait": waits,
+        }
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    agent: str
+    tokens: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    admitted: bool = False
+    event: threading.Event = field(default_factory=threading.Event)
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    async_event: Optional[asyncio.Event] = None
+
+    def wake(self) -> None:
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.async_event.set)
+        else:
+            self.event.set()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int = settings.MODEL_MAX_CONCURRENCY,
+        agent_max_concurrency: int = settings.MODEL_AGENT_MAX_CONCURRENCY,
+        background_max_concurrency: int = settings.MODEL_BACKGROUND_MAX_CONCURRENCY,
+        requests_per_second: float = settings.MODEL_REQUESTS_PER_SECOND,
+        requests_burst: int = settings.MODEL_REQUESTS_BURST,
+        tokens_per_minute: float = settings.MODEL_TOKENS_PER_MINUTE,
+        queue_timeout: float = settings.MODEL_QUEUE_TIMEOUT_SECONDS,
+        max_queue_depth: int = settings.MODEL_MAX_QUEUE_DEPTH,
+    ):
+        self.max_concurrency = max_concurrency
+        self.agent_max_concurrency = agent_max_concurrency
+        self.background_max_concurrency = background_max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_queue_depth = max_queue_depth
+        self.requests = TokenBucket(requests_per_second, requests_burst)
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.stats = AdmissionStats()
+        self.running = 0
+        self.running_background = 0
+        self.running_by_agent: Dict[str, int] = defaultdict(int)
+        self._queue: List[Any] = []  # heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._retry_in = 0.0  # set when a bucket holds the head of the queue
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            depth = defaultdict(int)
+            for _, _, waiter in self._queue:
+                depth[waiter.priority.name.lower()] += 1
+            return {
+                "running": self.running,
+                "running_background": self.running_background,
+                "running_by_agent": {agent: n for agent, n in self.running_by_agent.items() if n},
+                "queue_depth": len(self._queue),
+                "queue_depth_by_priority": dict(depth),
+                "limits": {
+                    "max_concurrency": self.max_concurrency,
+                    "agent_max_concurrency": self.agent_max_concurrency,
+                    "background_max_concurrency": self.background_max_concurrency,
+                    "requests_per_second": self.requests.rate,
+                    "tokens_per_minute": round(self.tokens.rate * 60),
+                    "queue_timeout_seconds": self.queue_timeout,
+                    "max_queue_depth": self.max_queue_depth,
+                },
+                **self.stats.to_dict(),
+            }
+
+    # Dispatch (called with the lock held)
+
+    def _fits(self, waiter: _Waiter) -> bool:
+        if self.agent_max_concurrency and self.running_by_agent[waiter.agent] >= self.agent_max_concurrency:
+            return False
+        if waiter.priority == Priority.BACKGROUND and self.running_background >= self.background_max_concurrency:
+            return False
+        return True
+
+    def _start(self, waiter: _Waiter) -> None:
+        self.requests.take(1)
+        self.tokens.take(waiter.tokens)
+        self.running += 1
+        self.running_by_agent[waiter.agent] += 1
+        if waiter.priority == Priority.BACKGROUND:
+            self.running_background += 1
+        waiter.admitted = True
+        name = waiter.priority.name.lower()
+        self.stats.admitted[name] += 1
+        self.stats.waits[name].append(time.monotonic() - waiter.enqueued_at)
+
+    def _dispatch(self) -> None:
+        self._retry_in = 0.0
+        if not self._queue or self.running >= self.max_concurrency:
+            return
+        admitted = []
+        for entry in sorted(self._queue):
+            if self.running >= self.max_concurrency:
+                break
+            waiter = entry[2]
+            if not self._fits(waiter):
+                continue
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(waiter.tokens))
+            if wait:
+                self.stats.rate_limited += 1
+                self._retry_in = wait
+                break
+            self._start(waiter)
+            admitted.append(entry)
+        if admitted:
+            self._queue = [entry for entry in self._queue if not entry[2].admitted]
+            heapq.heapify(self._queue)
+            for entry in admitted:
+                entry[2].wake()
+
+    def _enqueue(self, waiter: _Waiter, model_id: Optional[str]) -> None:
+        name = waiter.priority.name.lower()
+        if self.max_queue_depth and len(self._queue) >= self.max_queue_depth:
+            self.stats.rejected[name] += 1
+            logger.warning(f"Model admission: queue full, {name} call from {waiter.agent} rejected")
+            raise ModelOverloadedError(f"admission queue full ({len(self._queue)} waiting)", model_id=model_id)
+        heapq.heappush(self._queue, (waiter.priority, next(self._seq), waiter))
+        self.stats.peak_queue_depth = max(self.stats.peak_queue_depth, len(self._queue))
+        self._dispatch()
+        if not waiter.admitted:
+            self.stats.queued[name] += 1
+
+    def _give_up(self, waiter: _Waiter, model_id: Optional[str]) -> None:
+        """Timeout: leave the queue, unless admitted in the meantime."""
+        with self._lock:
+            if waiter.admitted:
+                return
+            self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+            heapq.heapify(self._queue)
+            self.stats.timed_out[waiter.priority.name.lower()] += 1
+            depth = len(self._queue)
+            self._dispatch()
+        logger.warning(f"Model admission: {waiter.priority.name.lower()} call from {waiter.agent} timed out in the queue")
+        raise ModelOverloadedError(
+            f"no model capacity after {self.queue_timeout:.0f}s in the admission queue ({depth} still waiting)",
+            model_id=model_id,
+        )
+
+    def _release(self, waiter: _Waiter) -> None:
+        with self._lock:
+            self.running -= 1
+            self.running_by_agent[waiter.agent] -= 1
+            if waiter.priority == Priority.BACKGROUND:
+                self.running_background -= 1
+            self._dispatch()
+
+    def _remaining(self, waiter: _Waiter) -> float:
+        return waiter.enqueued_at + self.queue_timeout - time.monotonic()
+
+    # Acquire and release
+
+    def _waiter(self, agent: str, tokens: int) -> _Waiter:
+        return _Waiter(priority=current_priority(), agent=agent, tokens=tokens)
+
+    @contextmanager
+    def slot(self, agent: str, tokens: int = 0, model_id: Optional[str] = None) -> Iterator[_Waiter]:
+        waiter = self._waiter(agent, tokens)
+        with self._lock:
+            self._enqueue(waiter, model_id)
+        while not waiter.admitted:
+            remaining = self._remaining(waiter)
+            if remaining <= 0:
+                self._give_up(waiter, model_id)
+                break
+            waiter.event.wait(min(remaining, self._retry_in or remaining))
+            waiter.event.clear()
+            with self._lock:
+                if not waiter.admitted:
+                    self._dispatch()
+        try:
+            yield waiter
+        finally:
+            self._release(waiter)
+
+    @asynccontextmanager
+    async def aslot(self, agent: str, tokens: int = 0, model_id: Optional[str] = None) -> AsyncIterator[_Waiter]:
+        waiter = self._waiter(agent, tokens)
+        waiter.loop = asyncio.get_running_loop()
+        waiter.async_event = asyncio.Event()
+        with self._lock:
+            self._enqueue(waiter, model_id)
+        try:
+            while not waiter.admitted:
+                remaining = self._remaining(waiter)
+                if remaining <= 0:
+                    self._give_up(waiter, model_id)
+                    break
+                try:
+                    await asyncio.wait_for(waiter.async_event.wait(), min(remaining, self._retry_in or remaining))
+                except asyncio.TimeoutError:
+                    pass
+                waiter.async_event.clear()
+                with self._lock:
+                    if not waiter.admitted:
+                        self._dispatch()
+        except asyncio.CancelledError:
+            # The run was cancelled while queued: leave the queue, or hand back the slot just granted
+            with self._lock:
+                if not waiter.admitted:
+                    self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+                    heapq.heapify(self._queue)
+                    raise
+            self._release(waiter)
+            raise
+        try:
+            yield waiter
+        finally:
+            self._release(waiter)
+
+    def settle(self, waiter: _Waiter, response: Optional[ModelResponse]) -> None:
+        """Correct the token bucket with the usage the provider reported."""
+        usage = getattr(response, "response_usage", None)
+        if usage is not None and usage.total_tokens:
+            with self._lock:
+                self.tokens.adjust(usage.total_tokens - waiter.tokens)
+
+
+admission = AdmissionController()
+
+
+def _estimate_tokens(messages: List[Message]) -> int:
+    # ~4 characters per token; only needed when the token bucket is on
+    if not admission.tokens.rate:
+        return 0
+    return sum(len(message.get_content_string() or "") for message in messages) // 4 + 4 * len(messages)
+
+
+@dataclass
+class AdmittedChat(OpenAIChat):
+    """OpenAIChat whose calls wait for a slot from `admission`; streams hold it until the last chunk."""
+
+    def _is_retryable_error(self, error: ModelProviderError) -> bool:
+        if isinstance(error, ModelOverloadedError):
+            return False
+        return super()._is_retryable_error(error)
+
+    def _admission_key(self, kwargs: Dict[str, Any]) -> str:
+        return getattr(kwargs.get("run_response"), "agent_id", None) or self.id
+
+    def invoke(self, messages: List[Message], assistant_message: Message, **kwargs: Any) -> ModelResponse:
+        with admission.slot(self._admission_key(kwargs), _estimate_tokens(messages), self.id) as slot:
+            response = super().invoke(messages, assistant_message, **kwargs)
+            admission.settle(slot, response)
+            return response
+
+    async def ainvoke(self, messages: List[Message], assistant_message: Message, **kwargs: Any) -> ModelResponse:
+        async with admission.aslot(self._admission_key(kwargs), _estimate_tokens(messages), self.id) as slot:
+            response = await super().ainvoke(messages, assistant_message, **kwargs)
+            admission.settle(slot, response)
+            return response
+
+    def invoke_stream(self, messages: List[Message], assistant_message: Message, **kwargs: Any) -> Iterator[ModelResponse]:
+        with admission.slot(self._admission_key(kwargs), _estimate_tokens(messages), self.id) as slot:
+            last = None
+            for last in super().invoke_stream(messages, assistant_message, **kwargs):
+                yield last
+            admission.settle(slot, last)
+
+    async def ainvoke_stream(
+        self, messages: List[Message], assistant_message: Message, **kwargs: Any
+    ) -> AsyncIterator[ModelResponse]:
+        async with admission.aslot(self._admission_key(kwargs), _estimate_tokens(messages), self.id) as slot:
+            last = None
+            async for last in super().ainvoke_stream(messages, assistant_message, **kwargs):
+                yield last
+            admission.settle(slot, last)
+
@@ -0,0 +1,247 @@
+"""
+Model Cascade
+=============
+
+`CascadeChat` is the RunPod OpenAIChat with a cheaper model in front of it.
+Each model call goes to `local_model` first (the EXAONE server in
+app/models/exaone_local.py). The local answer is scored:
+
+- confidence: geometric mean token probability, exp(mean logprob), from the
+  logprobs the local server returns
+- grounding: share of the answer's words that appear in the question or the
+  retrieved knowledge (the <references> block agno adds to the user message);
+  only scored when the message has references
+
+If either score is under CASCADE_MIN_CONFIDENCE / CASCADE_MIN_GROUNDING, the
+answer is empty, or the local call fails, the call escalates to the remote
+model (self) with the same messages. Only the remote tier goes through model
+admission control (app/models/admission.py); the local server is not shared.
+
+An answer that can be scored on neither (no logprobs and no references) is
+escalated too: there is nothing to accept it on.
+
+The local tier answers in plain text only (it gets no tools and EXAONE has no
+tool calling), so it is skipped for structured output, for calls that
+continue a tool loop and for calls that require a tool (tool_choice other than
+"auto"/"none"); use it on agents that answer from context, and give anything
+that must call tools (e.g. memory extraction) its own model.
+
+`cascade_stats[agent id]` records the escalation rate, latency per tier and
+the estimated cost and time saved versus sending every call to the remote
+model.
+"""
+
+import math
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from agno.models.message import Message
+from agno.models.openai import OpenAIChat
+from agno.models.response import ModelResponse
+from agno.utils.log import logger
+
+from app.config.settings import settings
+from app.models.admission import AdmittedChat
+
+_REFERENCES = re.compile(r"<references>(.*?)</references>", re.DOTALL)
+_WORD = re.compile(r"\w{4,}")
+
+
+@dataclass
+class CascadeStats:
+    calls: int = 0
+    local_accepted: int = 0
+    escalated: int = 0
+    local_errors: int = 0
+    local_seconds: float = 0.0  # all local calls, accepted or not
+    remote_seconds: float = 0.0
+    remote_calls: int = 0
+    local_tokens: int = 0  # tokens of accepted local answers
+    wasted_local_seconds: float = 0.0  # local calls that were then escalated
+
+    def to_dict(self) -> Dict[str, Any]:
+        avg_remote = self.remote_seconds / self.remote_calls if self.remote_calls else 0.0
+        price_gap = settings.CASCADE_REMOTE_COST_PER_1K_TOKENS - settings.CASCADE_LOCAL_COST_PER_1K_TOKENS
+        return {
+            **asdict(self),
+            "escalation_rate": round(self.escalated / self.calls, 4) if self.calls else 0.0,
+            "avg_local_ms": round(self.local_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+            "avg_remote_ms": round(avg_remote * 1000, 1),
+            # Each accepted local call replaced one remote call; every local call cost its own time
+            "est_saved_seconds": round(self.local_accepted * avg_remote - self.local_seconds, 3),
+            "est_saved_cost": round(self.local_tokens / 1000 * price_gap, 6),
+        }
+
+
+cascade_stats: Dict[str, CascadeStats] = {}
+
+
+@dataclass
+class LocalChat(OpenAIChat):
+    """OpenAIChat that keeps the mean token logprob of the answer (provider_data["mean_logprob"])."""
+
+    logprobs: Optional[bool] = True
+
+    def _parse_provider_response(self, response: Any, **kwargs: Any) -> ModelResponse:
+        model_response = super()._parse_provider_response(response, **kwargs)
+        logprobs = getattr(response.choices[0], "logprobs", None)
+        tokens = [t.logprob for t in (getattr(logprobs, "content", None) or []) if t.logprob is not None]
+        if tokens:
+            model_response.provider_data = {**(model_response.provider_data or {}), "mean_logprob": sum(tokens) / len(tokens)}
+        return model_response
+
+
+def get_local_model() -> Optional[LocalChat]:
+    if not settings.EXAONE_BASE_URL:
+        return None
+    return LocalChat(id=settings.EXAONE_MODEL_NAME, base_url=settings.EXAONE_BASE_URL, api_key="local")
+
+
+def _grounding(answer: str, messages: List[Message]) -> Optional[float]:
+    user = next((m for m in reversed(messages) if m.role == "user"), None)
+    text = user.get_content_string() if user is not None else ""
+    references = "\n".join(_REFERENCES.findall(text))
+    if not references:
+        return None
+    known = {w.lower() for w in _WORD.findall(text)}
+    words = [w.lower() for w in _WORD.findall(answer)]
+    return sum(w in known for w in words) / len(words) if words else 0.0
+
+
+def score(response: ModelResponse, messages: List[Message]) -> Tuple[Optional[float], Optional[float]]:
+    """(confidence, grounding) of a local answer; None where it cannot be scored."""
+    mean_logprob = (response.provider_data or {}).get("mean_logprob")
+    confidence = math.exp(mean_logprob) if mean_logprob is not None else None
+    return confidence, _grounding(response.content or "", messages)
+
+
+@dataclass
+class CascadeChat(AdmittedChat):
+    local_model: Optional[OpenAIChat] = field(default_factory=get_local_model)
+    min_confidence: float = settings.CASCADE_MIN_CONFIDENCE
+    min_grounding: float = settings.CASCADE_MIN_GROUNDING
+
+    def _use_local(self, messages: List[Message], kwargs: Dict[str, Any]) -> bool:
+        tool_choice = kwargs.get("tool_choice")
+        return (
+            settings.CASCADE_ENABLED
+            and self.local_model is not None
+            and kwargs.get("response_format") is None
+            and (tool_choice is None or tool_choice in ("auto", "none"))
+            and bool(messages)
+            and messages[-1].role != "tool"
+        )
+
+    def _stats(self, run_response: Any) -> CascadeStats:
+        key = getattr(run_response, "agent_id", None) or self.id
+        return cascade_stats.setdefault(key, CascadeStats())
+
+    def _accept(self, response: Optional[ModelResponse], messages: List[Message], stats: CascadeStats, seconds: float) -> bool:
+        stats.calls += 1
+        stats.local_seconds += seconds
+        if response is None:
+            stats.escalated += 1
+            stats.wasted_local_seconds += seconds
+            return False
+        confidence, grounding = score(response, messages)
+        accepted = (
+            bool((response.content or "").strip())
+            and not response.tool_calls
+            and (confidence is not None or grounding is not None)
+            and (confidence is None or confidence >= self.min_confidence)
+            and (grounding is None or grounding >= self.min_grounding)
+        )
+        logger.debug(
+            f"Cascade: local answer confidence={confidence} grounding={grounding} "
+            f"-> {'accepted' if accepted else 'escalated'} ({seconds * 1000:.0f} ms)"
+        )
+        if accepted:
+            stats.local_accepted += 1
+            if response.response_usage is not None:
+                stats.local_tokens += response.response_usage.total_tokens
+        else:
+            stats.escalated += 1
+            stats.wasted_local_seconds += seconds
+        return accepted
+
+    def _local_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # Text only: the local tier never sees the tools
+        return {**kwargs, "tools": None, "tool_choice": None}
+
+    def _local_failed(self, stats: CascadeStats, error: Exception) -> None:
+        stats.local_errors += 1
+        logger.warning(f"Cascade: local model failed, escalating: {error}")
+        return None
+
+    def _record_remote(self, stats: CascadeStats, start: float) -> None:
+        stats.remote_calls += 1
+        stats.remote_seconds += time.perf_counter() - start
+
+    def invoke(self, messages: List[Message], assistant_message: Message, **kwargs: Any) -> ModelResponse:
+        stats = self._stats(kwargs.get("run_response"))
+        if self._use_local(messages, kwargs):
+            start = time.perf_counter()
+            try:
+                local = self.local_model.invoke(messages, assistant_message, **self._local_kwargs(kwargs))
+            except Exception as e:
+                local = self._local_failed(stats, e)
+            if self._accept(local, messages, stats, time.perf_counter() - start):
+                return local
+        start = time.perf_counter()
+        response = super().invoke(messages, assistant_message, **kwargs)
+        self._record_remote(stats, start)
+        return response
+
+    async def ainvoke(self, messages: List[Message], assistant_message: Message, **kwargs: Any) -> ModelResponse:
+        stats = self._stats(kwargs.get("run_response"))
+        if self._use_local(messages, kwargs):
+            start = time.perf_counter()
+            try:
+                local = await self.local_model.ainvoke(messages, assistant_message, **self._local_kwargs(kwargs))
+            except Exception as e:
+                local = self._local_failed(stats, e)
+            if self._accept(local, messages, stats, time.perf_counter() - start):
+                return local
+        start = time.perf_counter()
+        response = await super().ainvoke(messages, assistant_message, **kwargs)
+        self._record_remote(stats, start)
+        return response
+
+    # Streaming: the local answer has to be scored before anything is sent, so
+    # it is generated in one call and yielded as a single chunk when accepted;
+    # escalated calls stream from the remote model as usual.
+
+    def invoke_stream(self, messages: List[Message], assistant_message: Message, **kwargs: Any) -> Iterator[ModelResponse]:
+        stats = self._stats(kwargs.get("run_response"))
+        if self._use_local(messages, kwargs):
+            start = time.perf_counter()
+            try:
+                local = self.local_model.invoke(messages, assistant_message, **self._local_kwargs(kwargs))
+            except Exception as e:
+                local = self._local_failed(stats, e)
+            if self._accept(local, messages, stats, time.perf_counter() - start):
+                yield local
+                return
+        start = time.perf_counter()
+        yield from super().invoke_stream(messages, assistant_message, **kwargs)
+        self._record_remote(stats, start)
+
+    async def ainvoke_stream(
+        self, messages: List[Message], assistant_message: Message, **kwargs: Any
+    ) -> AsyncIterator[ModelResponse]:
+        stats = self._stats(kwargs.get("run_response"))
+        if self._use_local(messages, kwargs):
+            start = time.perf_counter()
+            try:
+                local = await self.local_model.ainvoke(messages, assistant_message, **self._local_kwargs(kwargs))
+            except Exception as e:
+                local = self._local_failed(stats, e)
+            if self._accept(local, messages, stats, time.perf_counter() - start):
+                yield local
+                return
+        start = time.perf_counter()
+        async for chunk in super().ainvoke_stream(messages, assistant_message, **kwargs):
+            yield chunk
+        self._record_remote(stats, start)
@@ -27,6 +27,7 @@ class ChatCompletionRequest(BaseModel):
     messages: List[Message]
     temperature: float = 0.2
     max_tokens: int = 512
+    logprobs: bool = False  # CascadeChat scores answers by their token logprobs
 
 @app.post("/v1/chat/completions")
 def chat_completions(req: ChatCompletionRequest):
@@ -46,13 +47,16 @@ def chat_completions(req: ChatCompletionRequest):
 
     inputs = tokenizer(prompt, return_tensors="pt")
 
-    outputs = model.generate(
+    generated = model.generate(
         **inputs,
         max_new_tokens=req.max_tokens,
         temperature=req.temperature,
         do_sample=True,
-        pad_token_id=tokenizer.eos_token_id  # ✅ Tambahkan ini
+        pad_token_id=tokenizer.eos_token_id,  # ✅ Tambahkan ini
+        output_scores=req.logprobs,
+        return_dict_in_generate=True,
     )
+    outputs = generated.sequences
 
     full_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
     
@@ -65,6 +69,18 @@ def chat_completions(req: ChatCompletionRequest):
 
     prompt_tokens = inputs["input_ids"].shape[1]
     completion_tokens = outputs[0].shape[0] - prompt_tokens
+
+    logprobs = None
+    if req.logprobs:
+        # Log-probability of each sampled token (after temperature), OpenAI format
+        scores = model.compute_transition_scores(outputs, generated.scores, normalize_logits=True)[0]
+        logprobs = {
+            "content": [
+                {"token": tokenizer.decode(token), "logprob": float(score), "bytes": None, "top_logprobs": []}
+                for token, score in zip(outputs[0][prompt_tokens:], scores)
+                if token != tokenizer.eos_token_id
+            ]
+        }
     completion_response = {
         "id": "chatcmpl-exaone",
         "object": "chat.completion",
@@ -78,6 +94,7 @@ def chat_completions(req: ChatCompletionRequest):
                     "role": "assistant",
                     "content": answer
                 },
+                "logprobs": logprobs,
                 "finish_reason": "stop"
             }
         ],
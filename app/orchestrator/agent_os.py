@@ -1,10 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from agno.os import AgentOS
-from app.agents.sql_agent import sql_agent
-from app.agents.business_agent import business_agent
+from fastapi import FastAPI
+from app.agents.registry import registry
+from app.api.routes import router as api_router
+from app.config.settings import settings
+from app.database.session_cache import cached_dbs, listen_for_invalidations, run_session_flusher
+from app.database.sql_pool import close_sql_pool
+from app.memory.deferred import memory_queue, run_memory_worker
+from app.models.admission import admission
+from app.models.cascade import cascade_stats
+from app.orchestrator.intent_routes import build_intent_router
+from app.orchestrator.startup_profile import profiler
+from app.services.query_catalog import run_refresh_loop
+from app.services.saved_query_index import run_hit_flusher
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Indexes, classifiers and the vector db are built after the server is listening
+    warmup_task = asyncio.create_task(registry.warmup()) if settings.STARTUP_WARMUP else None
+    refresh_task = None
+    if settings.PRECOMPUTED_REFRESH_INTERVAL_SECONDS > 0:
+        refresh_task = asyncio.create_task(run_refresh_loop(settings.PRECOMPUTED_REFRESH_INTERVAL_SECONDS))
+    memory_task = asyncio.create_task(run_memory_worker()) if settings.MEMORY_DEFERRED else None
+    hits_task = asyncio.create_task(run_hit_flusher())
+    session_tasks = []
+    if cached_dbs:
+        session_tasks.append(asyncio.create_task(run_session_flusher()))
+        if settings.SESSION_CACHE_INVALIDATION == "notify":
+            session_tasks.extend(asyncio.create_task(listen_for_invalidations(db)) for db in cached_dbs)
+    profiler.mark("serving")
+    yield
+    # The memory worker writes through the session db, so it stops before the session flusher
+    for task in (warmup_task, refresh_task, memory_task, hits_task, *session_tasks):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await close_sql_pool()
+
+
+# AgentOS needs the agent objects up front; building them is cheap, the heavy parts warm up later.
+# It connects the leave agent's MCPTools once at startup, so runs reuse one MCP session.
+agents = registry.all()
+
+# /route and /route/dispatch: pick the agent from the message, no LLM call
+base_app = FastAPI()
+base_app.include_router(build_intent_router())
+# Knowledge ingestion and the SQL Agent endpoints (/sql/ask: saved-query answers without a model call)
+base_app.include_router(api_router)
+
+
+@base_app.get("/cascade/stats")
+def get_cascade_stats():
+    return {agent_id: stats.to_dict() for agent_id, stats in cascade_stats.items()}
+
+
+@base_app.get("/models/admission/stats")
+def get_admission_stats():
+    return admission.snapshot()
+
+
+@base_app.get("/sessions/cache/stats")
+def get_session_cache_stats():
+    return {
+        db.db_url.rsplit("/", 1)[-1]: {"pending": db.pending, "cached": db.cached, **db.cache_stats.to_dict()}
+        for db in cached_dbs
+    }
+
+
+@base_app.get("/startup/profile")
+def get_startup_profile():
+    return {"warm": registry.warm, **profiler.report()}
+
+
+@base_app.get("/memory/stats")
+def get_memory_stats():
+    return {"pending_users": len(memory_queue), **memory_queue.stats.to_dict()}
+
 
 agent_os = AgentOS(
-    agents=[
-        sql_agent,
-        business_agent,
-    ],
+    agents=agents,
+    base_app=base_app,
+    lifespan=lifespan,
 )
@@ -0,0 +1,62 @@
+"""
+Intent Routing Endpoints
+========================
+
+- POST /route           classify a message, return the chosen agent and scores
+- POST /route/dispatch  classify, then run the chosen agent and return its answer
+
+Classification is local (app/services/intent_router.py), so dispatch adds no
+model call in front of the agent. The agent is looked up by id per request
+(app/agents/registry.py), so ids set by AgentOS after the router is built
+do not matter.
+"""
+
+from typing import Callable, Optional
+
+from agno.agent import Agent
+from agno.utils.log import logger
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from app.agents.registry import registry
+from app.services.intent_router import get_intent_router
+
+
+class RouteRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+def build_intent_router(get_agent: Callable[[str], Agent] = registry.get) -> APIRouter:
+    router = APIRouter(tags=["Intent Router"])
+
+    @router.post("/route")
+    def route(payload: RouteRequest):
+        return get_intent_router().route(payload.message).to_dict()
+
+    @router.post("/route/dispatch")
+    async def dispatch(payload: RouteRequest):
+        decision = get_intent_router().route(payload.message)
+        try:
+            agent = get_agent(decision.agent_id)
+        except KeyError:
+            raise HTTPException(status_code=500, detail=f"Routed to unknown agent {decision.agent_id!r}")
+        logger.debug(f"Intent router: {decision.to_dict()}")
+        try:
+            # Fresh copy per request, as AgentOS does for its own run endpoints
+            response = await agent.deep_copy().arun(
+                payload.message, session_id=payload.session_id, user_id=payload.user_id, stream=False
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return {
+            "route": decision.to_dict(),
+            "agent_id": agent.id,
+            "run_id": response.run_id,
+            "session_id": response.session_id,
+            "status": response.status,
+            "content": response.content,
+        }
+
+    return router
@@ -0,0 +1,149 @@
+"""
+Startup Profiler
+================
+
+Where the time goes between `uvicorn app.main:app` and a warm server.
+
+- `profiler.imports()` wraps the import of the app: every module imported
+  inside it is timed, cumulative and self time, like `python -X importtime`
+- `profiler.component(name)` times building a component: an agent, the
+  AgentOS app, a warmup step (app/agents/registry.py)
+- `profiler.mark(name)` records a milestone (app imported, serving, warm),
+  measured from the import of this module
+
+`report()` lists the milestones, the components and the slowest imports:
+app modules one by one, third-party modules grouped per top-level package
+(self times, so nothing is counted twice). It is logged when warmup finishes
+and served at GET /startup/profile. STARTUP_PROFILE=false turns the import
+timing off; components and milestones are always kept.
+"""
+
+import importlib.abc
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List
+
+from agno.utils.log import logger
+
+from app.config.settings import settings
+
+
+@dataclass
+class ImportTiming:
+    cumulative: float
+    self_time: float
+
+
+class _TimingLoader:
+    """Loader proxy that times exec_module; the module keeps the real loader."""
+
+    def __init__(self, loader: Any, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        stack = self._profiler._stack
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self._profiler.modules[module.__name__] = ImportTiming(elapsed, elapsed - children)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self.profiler = profiler
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self.profiler)
+            return spec
+        return None
+
+
+@dataclass
+class StartupProfiler:
+    started_at: float = field(default_factory=time.perf_counter)
+    modules: Dict[str, ImportTiming] = field(default_factory=dict)
+    components: Dict[str, float] = field(default_factory=dict)
+    milestones: Dict[str, float] = field(default_factory=dict)
+    _stack: List[float] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @contextmanager
+    def imports(self) -> Iterator[None]:
+        if not settings.STARTUP_PROFILE:
+            yield
+            return
+        finder = _TimingFinder(self)
+        sys.meta_path.insert(0, finder)
+        try:
+            yield
+        finally:
+            sys.meta_path.remove(finder)
+
+    @contextmanager
+    def component(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.components[name] = self.components.get(name, 0.0) + time.perf_counter() - start
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            self.milestones.setdefault(name, time.perf_counter() - self.started_at)
+
+    def report(self, top: int = 15) -> Dict[str, Any]:
+        app_modules = {name: t for name, t in self.modules.items() if name == "app" or name.startswith("app.")}
+        packages: Dict[str, float] = defaultdict(float)
+        for name, timing in self.modules.items():
+            if name not in app_modules:
+                packages[name.split(".", 1)[0]] += timing.self_time
+
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        slowest_app = sorted(app_modules.items(), key=lambda item: item[1].self_time, reverse=True)[:top]
+        return {
+            "milestones_ms": {name: ms(seconds) for name, seconds in self.milestones.items()},
+            "components_ms": {name: ms(seconds) for name, seconds in sorted(self.components.items(), key=lambda i: -i[1])},
+            "import_total_ms": ms(sum(timing.self_time for timing in self.modules.values())),
+            "app_modules_ms": {name: {"self": ms(t.self_time), "cumulative": ms(t.cumulative)} for name, t in slowest_app},
+            "packages_ms": {name: ms(seconds) for name, seconds in sorted(packages.items(), key=lambda i: -i[1])[:top]},
+        }
+
+    def log_summary(self) -> None:
+        report = self.report(top=5)
+        logger.info(
+            f"Startup: {report['milestones_ms']}; imports {report['import_total_ms']} ms, "
+            f"slowest packages {report['packages_ms']}; components {report['components_ms']}"
+        )
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,220 @@
+"""
+Near-Duplicate Chunk Elimination
+================================
+
+MinHash/LSH deduplication of chunks before they are embedded.
+
+Site crawls (e.g. houpe.id) repeat headers, footers and CTAs on every page.
+Embedding each copy wastes embedding spend and index memory, and crowds
+retrieval results with the same text. This stage:
+1. Shingles each chunk into word n-grams
+2. Computes a MinHash signature (vectorized with numpy)
+3. Looks up candidates via LSH banding, then verifies the estimated Jaccard
+4. Drops (or merges into the first copy) chunks above the threshold
+
+Merging edits the kept chunk's metadata, so it only works while that chunk
+has not been inserted yet. Callers that insert as they go (streaming PDF
+ingestion, one deduplicator over several sources) call `release()` after
+each insert; a later duplicate of a released chunk is dropped and counted
+as `unmerged`. The deduplicator holds only unreleased chunks.
+
+Usage:
+    deduplicator = ChunkDeduplicator(threshold=0.85)
+    reader = WebsiteReader(chunking_strategy=DedupChunking(SemanticChunking(...), deduplicator))
+    knowledge.add_content(url=..., reader=reader)
+    logger.info(deduplicator.report())
+"""
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from agno.knowledge.chunking.strategy import ChunkingStrategy
+from agno.knowledge.document import Document
+
+# Mersenne prime 2^31 - 1 keeps (a * h + b) within uint64 for 32-bit shingle hashes
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class DedupStats:
+    seen: int = 0
+    kept: int = 0
+    dropped: int = 0
+    exact_duplicates: int = 0
+    unmerged: int = 0  # merge mode: duplicates of chunks already inserted, dropped only
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.dropped / self.seen if self.seen else 0.0
+
+
+def _lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick (bands, rows) whose S-curve threshold (1/b)^(1/r) is closest to `threshold`."""
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands < 1:
+            break
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class ChunkDeduplicator:
+    """Stateful MinHash/LSH near-duplicate filter for one ingestion run.
+
+    Args:
+        threshold: Estimated Jaccard similarity at or above which a chunk is a duplicate.
+        num_perm: Number of MinHash permutations (signature length).
+        shingle_size: Word n-gram size used for shingling.
+        mode: "drop" discards duplicates; "merge" also records the duplicate's
+            source on the kept chunk (`meta_data["duplicate_sources"]`) while
+            that chunk is not released.
+        seed: Seed for the hash permutations.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        mode: Literal["drop", "merge"] = "drop",
+        seed: int = 1,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if mode not in ("drop", "merge"):
+            raise ValueError(f"mode must be 'drop' or 'merge', got {mode!r}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.mode = mode
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+
+        self.bands, self.rows = _lsh_params(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._held: Dict[int, Document] = {}  # merge mode: kept chunks not inserted yet
+        self._exact: Dict[int, int] = {}
+        self.stats = DedupStats()
+
+    # ------------------------------------------------------------------
+    # MinHash
+    # ------------------------------------------------------------------
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        tokens = _TOKEN.findall(text.lower())
+        k = self.shingle_size
+        if len(tokens) < k:
+            shingles = {" ".join(tokens)}
+        else:
+            shingles = {" ".join(tokens[i : i + k]) for i in range(len(tokens) - k + 1)}
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of `text` as a uint32 vector of length `num_perm`."""
+        hashes = self._shingle_hashes(text)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    # ------------------------------------------------------------------
+    # LSH lookup
+    # ------------------------------------------------------------------
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        r = self.rows
+        return [signature[i * r : (i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def find_duplicate(self, text: str) -> Optional[int]:
+        """Register `text`; return the index of the kept chunk it duplicates, if any."""
+        self.stats.seen += 1
+
+        exact_key = hash(" ".join(text.lower().split()))
+        if exact_key in self._exact:
+            self.stats.dropped += 1
+            self.stats.exact_duplicates += 1
+            return self._exact[exact_key]
+
+        signature = self.signature(text)
+        keys = self._band_keys(signature)
+
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        for candidate in sorted(candidates):
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= self.threshold:
+                self.stats.dropped += 1
+                return candidate
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        self._exact[exact_key] = index
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        self.stats.kept += 1
+        return None
+
+    def filter(self, documents: List[Document]) -> List[Document]:
+        """Return only the documents that are not near-duplicates of earlier ones."""
+        unique = []
+        for document in documents:
+            duplicate_of = self.find_duplicate(document.content)
+            if duplicate_of is None:
+                if self.mode == "merge":
+                    self._held[len(self._signatures) - 1] = document
+                unique.append(document)
+            elif self.mode == "merge":
+                self._merge(duplicate_of, document)
+        return unique
+
+    def release(self) -> None:
+        """Forget the kept chunks: they are inserted, merging into them has no effect any more."""
+        self._held.clear()
+
+    def _merge(self, kept_index: int, duplicate: Document) -> None:
+        kept = self._held.get(kept_index)
+        if kept is None:
+            self.stats.unmerged += 1
+            return
+        meta = kept.meta_data
+        meta["duplicate_count"] = meta.get("duplicate_count", 0) + 1
+        source = (duplicate.meta_data or {}).get("url") or duplicate.name
+        sources = meta.setdefault("duplicate_sources", [])
+        if source and source not in sources and len(sources) < 10:
+            sources.append(source)
+
+    def report(self) -> str:
+        s = self.stats
+        return (
+            f"Dedup: {s.seen} chunks seen, {s.kept} kept, {s.dropped} dropped "
+            f"({s.exact_duplicates} exact), dedup ratio {s.dedup_ratio:.1%}"
+            + (f", {s.unmerged} not merged (already inserted)" if self.mode == "merge" else "")
+        )
+
+
+class DedupChunking(ChunkingStrategy):
+    """Chunking strategy wrapper that removes near-duplicate chunks before embedding.
+
+    The wrapped deduplicator is shared across every document the reader
+    chunks, so a footer repeated on every crawled page is embedded once.
+    """
+
+    def __init__(self, chunking_strategy: ChunkingStrategy, deduplicator: ChunkDeduplicator):
+        self.chunking_strategy = chunking_strategy
+        self.deduplicator = deduplicator
+
+    def chunk(self, document: Document) -> List[Document]:
+        return self.deduplicator.filter(self.chunking_strategy.chunk(document))
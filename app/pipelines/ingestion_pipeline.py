@@ -1,19 +1,47 @@
 import os
 import sys
+from agno.utils.log import logger
 from agno.knowledge.reader.website_reader import WebsiteReader
 from agno.knowledge.chunking.semantic import SemanticChunking
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from knowledge.knowledge_base import get_knowledge
+from config.settings import settings
+from memory.maintenance import ingestion_timestamp
+from pipelines.dedup import ChunkDeduplicator, DedupChunking
+from pipelines.streaming_pdf import ingest_pdf_streaming
 
 knowledge = get_knowledge()
 
+def get_deduplicator():
+    return ChunkDeduplicator(
+        threshold=settings.DEDUP_JACCARD_THRESHOLD,
+        mode=settings.DEDUP_MODE,
+    )
+
 def ingest_website(url: str, metadata: dict):
+    # Fresh deduplicator per run: repeated headers/footers/CTAs across crawled pages are embedded once
+    deduplicator = get_deduplicator()
     knowledge.add_content(
     url=url,
-    reader=WebsiteReader(chunking_strategy=SemanticChunking(
-        chunk_size=600,
-        similarity_threshold=0.5,
+    reader=WebsiteReader(chunking_strategy=DedupChunking(
+        SemanticChunking(
+            chunk_size=600,
+            similarity_threshold=0.5,
+        ),
+        deduplicator,
     )),
-    metadata=metadata or {}
+    metadata={**(metadata or {}), "ingested_at": ingestion_timestamp()}
 )
+    logger.info(f"{url}: {deduplicator.report()}")
+    return deduplicator.stats
+
+def ingest_pdf(path: str, metadata: dict):
+    # Streams pages -> chunks -> embeddings in batches; memory stays flat for large PDFs
+    return ingest_pdf_streaming(
+        path=path,
+        vector_db=knowledge.vector_db,
+        metadata={**(metadata or {}), "ingested_at": ingestion_timestamp()},
+        chunk_size=600,
+        deduplicator=get_deduplicator(),
+    )
 
@@ -0,0 +1,220 @@
+"""
+Streaming PDF Ingestion
+=======================
+
+Bounded-memory PDF ingestion for large documents (e.g. app/docs/*.pdf).
+
+Unlike agno's PDFReader, which extracts every page before chunking, this module:
+1. Yields pages lazily from an open file handle (no page index or object cache is kept)
+2. Chunks across page boundaries with a small carry-over buffer
+3. Embeds and inserts chunks in fixed-size batches
+
+Peak memory is bounded by `batch_size * chunk_size` plus one page of text,
+independent of the number of pages in the PDF.
+"""
+
+import hashlib
+import io
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agno.knowledge.document import Document
+from agno.utils.log import logger
+
+_SENTENCE_END = re.compile(r"[.!?]\s")
+
+
+def iter_pdf_pages(path: str | Path) -> Iterator[Tuple[int, str]]:
+    """Yield `(page_number, text)` for each page of a PDF, one page at a time.
+
+    Uses pdfminer's page-tree walker with object caching disabled, so neither
+    the page index nor parsed content streams accumulate as pages are read.
+    (pypdf flattens and caches the whole page tree, which grows with page count.)
+
+    Args:
+        path: Path to the PDF file.
+
+    Yields:
+        Tuple of 1-based page number and extracted page text.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    laparams = LAParams()
+    with open(path, "rb") as fh:
+        resource_manager = PDFResourceManager(caching=False)
+        for page_number, page in enumerate(PDFPage.get_pages(fh, caching=False), start=1):
+            output = io.StringIO()
+            device = TextConverter(resource_manager, output, laparams=laparams)
+            try:
+                PDFPageInterpreter(resource_manager, device).process_page(page)
+            finally:
+                device.close()
+            yield page_number, output.getvalue()
+
+
+def _split_point(buffer: str, chunk_size: int) -> int:
+    """Find a natural split point (sentence end, else whitespace) at or before chunk_size."""
+    window = buffer[:chunk_size]
+    sentence_ends = [m.end() for m in _SENTENCE_END.finditer(window)]
+    if sentence_ends and sentence_ends[-1] > chunk_size // 2:
+        return sentence_ends[-1]
+    last_space = window.rfind(" ")
+    if last_space > chunk_size // 2:
+        return last_space + 1
+    return chunk_size
+
+
+def chunk_pages(
+    pages: Iterator[Tuple[int, str]],
+    name: str,
+    chunk_size: int = 600,
+    overlap: int = 60,
+    meta_data: Optional[Dict[str, Any]] = None,
+) -> Iterator[Document]:
+    """Chunk a stream of pages into Documents without buffering the whole text.
+
+    Text carries over between pages, so a chunk can span a page boundary.
+    Each chunk records the page range it came from in `meta_data`.
+
+    Args:
+        pages: Iterator of `(page_number, text)` as produced by `iter_pdf_pages`.
+        name: Document name used for every chunk.
+        chunk_size: Target chunk size in characters.
+        overlap: Characters of trailing context repeated at the start of the next chunk.
+        meta_data: Extra metadata merged into every chunk.
+    """
+    # Split points fall past chunk_size // 2, so a smaller overlap always moves the buffer forward
+    if overlap >= chunk_size // 2:
+        raise ValueError("overlap must be smaller than half of chunk_size")
+
+    base_meta = dict(meta_data or {})
+    buffer = ""
+    # (offset in buffer, page number) where each page's text starts, in order
+    page_starts: List[Tuple[int, int]] = []
+    chunk_number = 0
+
+    def page_at(offset: int) -> int:
+        page = page_starts[0][1]
+        for start, page_number in page_starts:
+            if start > offset:
+                break
+            page = page_number
+        return page
+
+    def make_document(content: str, start_page: int, end_page: int) -> Document:
+        nonlocal chunk_number
+        chunk_number += 1
+        return Document(
+            name=name,
+            id=f"{name}_{chunk_number}",
+            content=content.strip(),
+            meta_data={
+                **base_meta,
+                "chunk": chunk_number,
+                "page_start": start_page,
+                "page_end": end_page,
+            },
+        )
+
+    for page_number, text in pages:
+        text = " ".join(text.split())
+        if not text:
+            continue
+        if buffer:
+            buffer += " "
+        page_starts.append((len(buffer), page_number))
+        buffer += text
+
+        while len(buffer) >= chunk_size:
+            cut = _split_point(buffer, chunk_size)
+            chunk_text = buffer[:cut]
+            if chunk_text.strip():
+                yield make_document(chunk_text, page_at(0), page_at(cut - 1))
+            # The remainder keeps `overlap` characters of this chunk
+            start = max(cut - overlap, 1)
+            first_page = page_at(start)
+            buffer = buffer[start:]
+            page_starts = [(0, first_page)] + [(offset - start, page) for offset, page in page_starts if offset > start]
+
+    if buffer.strip():
+        yield make_document(buffer, page_at(0), page_at(len(buffer) - 1))
+
+
+def iter_batches(documents: Iterator[Document], batch_size: int) -> Iterator[List[Document]]:
+    """Group a document stream into lists of at most `batch_size`."""
+    batch: List[Document] = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def file_content_hash(path: str | Path, block_size: int = 1 << 20) -> str:
+    """Hash a file in fixed-size blocks (never loads the whole file)."""
+    digest = hashlib.md5()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def ingest_pdf_streaming(
+    path: str | Path,
+    vector_db,
+    metadata: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 600,
+    overlap: int = 60,
+    batch_size: int = 32,
+    deduplicator=None,
+) -> int:
+    """Stream a PDF into the vector DB page by page, embedding in batches.
+
+    Args:
+        path: Path to the PDF file.
+        vector_db: agno VectorDb (e.g. Qdrant from `get_vector_db()`).
+        metadata: Metadata attached to every chunk (source, title, category, ...).
+        chunk_size: Target chunk size in characters.
+        overlap: Characters of overlap between consecutive chunks.
+        batch_size: Number of chunks embedded and inserted per round trip.
+        deduplicator: Optional `ChunkDeduplicator`; near-duplicate chunks are dropped before embedding.
+
+    Returns:
+        int: Number of chunks inserted.
+    """
+    path = Path(path)
+    content_hash = file_content_hash(path)
+    vector_db.create()
+
+    documents = chunk_pages(
+        iter_pdf_pages(path),
+        name=path.stem,
+        chunk_size=chunk_size,
+        overlap=overlap,
+        meta_data={"source": "pdf", **(metadata or {})},
+    )
+
+    inserted = 0
+    for batch in iter_batches(documents, batch_size):
+        if deduplicator is not None:
+            batch = deduplicator.filter(batch)
+            if not batch:
+                continue
+        # Only this batch of text and its vectors is alive at a time
+        vector_db.insert(content_hash=content_hash, documents=batch)
+        if deduplicator is not None:
+            # Merge mode: this batch is stored, later duplicates can no longer merge into it
+            deduplicator.release()
+        inserted += len(batch)
+        logger.debug(f"Inserted {inserted} chunks from {path.name}")
+
+    logger.info(f"Streamed {inserted} chunks from {path.name} into the vector DB")
+    if deduplicator is not None:
+        logger.info(f"{path.name}: {deduplicator.report()}")
+    return inserted
@@ -1,25 +1,88 @@
+"""Delete knowledge points by metadata filter.
+
+Usage (from the repo root):
+    python app/scripts/delete_points.py --title houpe_homepage --dry-run
+    python app/scripts/delete_points.py --url-prefix https://houpe.id/blog/ --rate 1
+    python app/scripts/delete_points.py --category documentation --ingested-before 2026-01-01
+    python app/scripts/delete_points.py --all      # wipe every point, keep collection & indexes
+
+Prefer app/scripts/reindex.py for a full rebuild: it keeps serving the old
+version while the new one is built.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.config.settings import settings
+from app.memory.maintenance import KnowledgeFilter, delete_knowledge
+
 
-QDRANT_URL = os.getenv("QDRANT_URL")
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-COLLECTION_NAME = "agent-knowledge"
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source")
+    parser.add_argument("--title")
+    parser.add_argument("--category")
+    parser.add_argument("--url-prefix")
+    parser.add_argument("--ingested-before", type=datetime.fromisoformat, help="ISO date/datetime")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--rate", type=float, default=2.0, help="Max delete batches per second")
+    parser.add_argument("--dry-run", action="store_true", help="Only count matching points")
+    parser.add_argument("--skip-contents-db", action="store_true", help="Do not touch the SQL agent contents_db")
+    parser.add_argument("--all", action="store_true", help="Delete all points but keep collection & indexes")
+    args = parser.parse_args()
 
-client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY
-)
+    collection = settings.QDRANT_COLLECTION_NAME
 
-# Delete all points but keep collection & indexes
-client.delete(
-    collection_name=COLLECTION_NAME,
-    points_selector=models.Filter(
-        must=[]  # empty filter = match all
+    if args.all:
+        client = QdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+        if args.dry_run:
+            print(f"🔎 {client.count(collection_name=collection, exact=True).count} points would be deleted")
+            return
+        client.delete(
+            collection_name=collection,
+            points_selector=models.Filter(must=[]),  # empty filter = match all
+        )
+        print(f"All points deleted from collection '{collection}' (collection preserved)")
+        return
+
+    knowledge_filter = KnowledgeFilter(
+        source=args.source,
+        title=args.title,
+        category=args.category,
+        url_prefix=args.url_prefix,
+        ingested_before=args.ingested_before,
     )
-)
+    if knowledge_filter.is_empty():
+        parser.error("Pass at least one filter, or --all to wipe the collection")
+
+    contents_db = None
+    if not args.skip_contents_db:
+        from app.database.postgres_db import get_postgres_db_dummy_data
+
+        contents_db = get_postgres_db_dummy_data()
+
+    result = delete_knowledge(
+        knowledge_filter,
+        batch_size=args.batch_size,
+        max_batches_per_second=args.rate,
+        dry_run=args.dry_run,
+        contents_db=contents_db,
+    )
+
+    if result.dry_run:
+        print(f"🔎 {result.matched} points in '{collection}' match {knowledge_filter}")
+    else:
+        print(
+            f"✅ Deleted {result.deleted} points from '{collection}' in {result.batches} batches; "
+            f"{result.content_rows_deleted} contents_db rows removed"
+        )
+
 
-print(f"All points deleted from collection '{COLLECTION_NAME}' (collection preserved)")
+if __name__ == "__main__":
+    main()
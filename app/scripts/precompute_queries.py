@@ -0,0 +1,86 @@
+"""Precompute the catalog queries and suggest supporting indexes.
+
+Materializes every query in app/knowledge/common_queries.sql as
+precomputed.<name> (see app/services/query_catalog.py) and, optionally, prints
+index suggestions for them with before/after timings.
+
+Usage (from the repo root):
+    python app/scripts/precompute_queries.py                        # create missing / refresh stale views
+    python app/scripts/precompute_queries.py --force                # refresh everything
+    python app/scripts/precompute_queries.py --names average_salary
+    python app/scripts/precompute_queries.py --suggest-indexes      # print suggested CREATE INDEX statements
+    python app/scripts/precompute_queries.py --benchmark-indexes    # time each suggestion, then drop it
+    python app/scripts/precompute_queries.py --benchmark-indexes --apply-indexes   # ... and keep them
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.services.index_advisor import benchmark_suggestions, existing_indexes, suggest_indexes
+from app.services.query_catalog import get_catalog, get_catalog_engine, refresh_catalog
+
+
+def refresh(names, force: bool) -> None:
+    print("=" * 72)
+    print("PRECOMPUTED QUERIES")
+    print("=" * 72)
+    failed = 0
+    for result in refresh_catalog(names=names, force=force):
+        if result.action == "skipped":
+            print(f"{result.name:<40} {result.action:<10}")
+            continue
+        rows = "" if result.rows is None else f"{result.rows:>6} rows"
+        print(f"{result.name:<40} {result.action:<10} {rows:>11} {result.ms:>9.1f} ms  {result.reason}")
+        failed += result.action == "failed"
+    if failed:
+        print(f"❌ {failed} queries failed")
+        sys.exit(1)
+    print("✅ Precomputed results up to date")
+
+
+def indexes(names, benchmark: bool, apply: bool, runs: int) -> None:
+    engine = get_catalog_engine()
+    catalog = get_catalog()
+    queries = [q for q in catalog.values() if not names or q.name in names]
+    suggestions = suggest_indexes(queries, existing_indexes(engine))
+
+    print("=" * 72)
+    print(f"INDEX SUGGESTIONS ({len(suggestions)})")
+    print("=" * 72)
+    for suggestion in suggestions:
+        print(f"{suggestion.ddl};")
+        print(f"    -- {', '.join(suggestion.reasons)}; used by {', '.join(suggestion.queries)}")
+    if not benchmark or not suggestions:
+        return
+
+    print("=" * 72)
+    print(f"{'index':<44} {'query':<30} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for timing in benchmark_suggestions(engine, suggestions, catalog, runs=runs, keep=apply):
+        print(
+            f"{timing.index:<44} {timing.query:<30} {timing.before_ms:>10.1f} "
+            f"{timing.after_ms:>10.1f} {timing.speedup:>7.1f}x"
+        )
+    print("=" * 72)
+    print("✅ Indexes kept" if apply else "Indexes dropped again (use --apply-indexes to keep them)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", nargs="+", help="Only these catalog queries")
+    parser.add_argument("--force", action="store_true", help="Refresh even if nothing changed")
+    parser.add_argument("--suggest-indexes", action="store_true", help="Print index suggestions instead of refreshing")
+    parser.add_argument("--benchmark-indexes", action="store_true", help="Time each suggested index (implies --suggest-indexes)")
+    parser.add_argument("--apply-indexes", action="store_true", help="Keep the benchmarked indexes")
+    parser.add_argument("--runs", type=int, default=3, help="EXPLAIN ANALYZE runs per measurement (median)")
+    args = parser.parse_args()
+
+    if args.suggest_indexes or args.benchmark_indexes:
+        indexes(args.names, args.benchmark_indexes, args.apply_indexes, args.runs)
+    else:
+        refresh(args.names, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import os
+import sys
+import time
 from dotenv import load_dotenv
 from agno.knowledge.knowledge import Knowledge
 from agno.vectordb.qdrant import Qdrant
@@ -6,6 +8,12 @@ from agno.knowledge.reader.website_reader import WebsiteReader
 from agno.knowledge.reader.text_reader import TextReader
 from agno.knowledge.chunking.semantic import SemanticChunking
 from agno.knowledge.embedder.openai import OpenAIEmbedder
+from qdrant_client.http import models
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.memory.maintenance import ingestion_timestamp
+from pipelines.dedup import ChunkDeduplicator, DedupChunking
+from pipelines.streaming_pdf import ingest_pdf_streaming
 
 load_dotenv()
 
@@ -13,63 +21,161 @@ load_dotenv()
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME")
+DEDUP_JACCARD_THRESHOLD = float(os.getenv("DEDUP_JACCARD_THRESHOLD", "0.85"))
+DEDUP_MODE = os.getenv("DEDUP_MODE", "drop")
+DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "docs")
+TEXT_PATH = os.path.join(DOCS_DIR, "info_houpe.txt")
+PDF_PATH = os.path.join(DOCS_DIR, "Surrounded-By-Idiots-Thomas-Erikson-1.pdf")
+VERIFY_TIMEOUT_SECONDS = 30
 
-# Initialize vector DB
-vector_db = Qdrant(
-    collection=COLLECTION_NAME,
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY,
-    embedder=OpenAIEmbedder(
-        id="text-embedding-3-small",
-        dimensions=1536
-    ),
-)
-
-# Create knowledge base
-knowledge = Knowledge(vector_db=vector_db)
-
-# Semantic chunking config (reusable)
-semantic_chunker = SemanticChunking(
-    chunk_size=600,
-    similarity_threshold=0.6,
-)
-
-# Add website content
-try:
-    print("📥 Adding website content...")
-    knowledge.add_content(
-        url="https://houpe.id/",
-        reader=WebsiteReader(chunking_strategy=semantic_chunker),
-        metadata={
-            "source": "web",
-            "title": "houpe_homepage",
-            "category": "company_info",
-        }
+
+def stored_points(vector_db, title, ingested_at):
+    """Points this run stored for `title`.
+
+    Knowledge.add_content does not raise for a bad source (a missing path is
+    only logged, a failed URL only marks the content FAILED), so each source is
+    checked in Qdrant. Qdrant.insert upserts with wait=False: poll until points
+    show up or VERIFY_TIMEOUT_SECONDS passes.
+    """
+    count_filter = models.Filter(
+        must=[
+            models.FieldCondition(key="meta_data.title", match=models.MatchValue(value=title)),
+            models.FieldCondition(key="meta_data.ingested_at", match=models.MatchValue(value=ingested_at)),
+        ]
+    )
+    deadline = time.monotonic() + VERIFY_TIMEOUT_SECONDS
+    while True:
+        count = vector_db.client.count(
+            collection_name=vector_db.collection, count_filter=count_filter, exact=True
+        ).count
+        if count or time.monotonic() >= deadline:
+            return count
+        time.sleep(0.5)
+
+
+def push_knowledge(vector_db, strict=False):
+    """Ingest all knowledge sources into `vector_db`.
+
+    Used directly by this script and by app/scripts/reindex.py, which points
+    `vector_db` at a new versioned collection. A failing source is reported and
+    the rest are still ingested; with `strict=True` the failures are raised at
+    the end, so a partial index is never switched to. A missing local file
+    fails before anything is ingested.
+    """
+    missing = [path for path in (TEXT_PATH, PDF_PATH) if not os.path.isfile(path)]
+    if missing:
+        raise FileNotFoundError(f"Knowledge source(s) not found: {', '.join(missing)}")
+
+    # Create knowledge base
+    knowledge = Knowledge(vector_db=vector_db)
+
+    # Stamped on every point so app/scripts/delete_points.py --ingested-before can target old runs
+    ingested_at = ingestion_timestamp()
+
+    # Semantic chunking config (reusable)
+    semantic_chunker = SemanticChunking(
+        chunk_size=600,
+        similarity_threshold=0.6,
+    )
+
+    # Near-duplicate filter shared across all sources in this run, so repeated
+    # headers/footers/CTAs are embedded only once
+    deduplicator = ChunkDeduplicator(
+        threshold=DEDUP_JACCARD_THRESHOLD,
+        mode=DEDUP_MODE,
     )
-    print("✅ Website content added")
-except Exception as e:
-    print(f"❌ Error adding website: {e}")
-
-# Add text file content
-try:
-    print("📥 Adding text file content...")
-    knowledge.add_content(
-        path="docs/info_houpe.txt",
-        reader=TextReader(chunking_strategy=semantic_chunker),
-        metadata={
-            "source": "text",
-            "title": "houpe_info",
-            "category": "documentation",
-        }
+    dedup_chunker = DedupChunking(semantic_chunker, deduplicator)
+
+    failed = []
+
+    # Add website content
+    try:
+        print("📥 Adding website content...")
+        knowledge.add_content(
+            url="https://houpe.id/",
+            reader=WebsiteReader(chunking_strategy=dedup_chunker),
+            metadata={
+                "source": "web",
+                "title": "houpe_homepage",
+                "category": "company_info",
+                "ingested_at": ingested_at,
+            }
+        )
+        if not stored_points(vector_db, "houpe_homepage", ingested_at):
+            raise RuntimeError("no chunks were stored")
+        print("✅ Website content added")
+        # Inserted: merge mode can no longer update these chunks
+        deduplicator.release()
+    except Exception as e:
+        print(f"❌ Error adding website: {e}")
+        failed.append(f"website: {e}")
+
+    # Add text file content
+    try:
+        print("📥 Adding text file content...")
+        knowledge.add_content(
+            path=TEXT_PATH,
+            reader=TextReader(chunking_strategy=dedup_chunker),
+            metadata={
+                "source": "text",
+                "title": "houpe_info",
+                "category": "documentation",
+                "ingested_at": ingested_at,
+            }
+        )
+        if not stored_points(vector_db, "houpe_info", ingested_at):
+            raise RuntimeError("no chunks were stored")
+        print("✅ Text file content added")
+        deduplicator.release()
+    except Exception as e:
+        print(f"❌ Error adding text file: {e}")
+        failed.append(f"text file: {e}")
+
+    # Add PDF content (streamed page by page, embedded in batches)
+    try:
+        print("📥 Adding PDF content...")
+        inserted = ingest_pdf_streaming(
+            path=PDF_PATH,
+            vector_db=vector_db,
+            metadata={
+                "title": "surrounded_by_idiots",
+                "category": "documentation",
+                "ingested_at": ingested_at,
+            },
+            chunk_size=600,
+            deduplicator=deduplicator,
+        )
+        if not inserted or not stored_points(vector_db, "surrounded_by_idiots", ingested_at):
+            raise RuntimeError("no chunks were stored")
+        print(f"✅ PDF content added ({inserted} chunks)")
+    except Exception as e:
+        print(f"❌ Error adding PDF: {e}")
+        failed.append(f"PDF: {e}")
+
+    print(f"🧹 {deduplicator.report()}")
+    if failed and strict:
+        raise RuntimeError(f"{len(failed)} source(s) failed: " + "; ".join(failed))
+    return knowledge
+
+
+if __name__ == "__main__":
+    # Initialize vector DB
+    vector_db = Qdrant(
+        collection=COLLECTION_NAME,
+        url=QDRANT_URL,
+        api_key=QDRANT_API_KEY,
+        embedder=OpenAIEmbedder(
+            id="text-embedding-3-small",
+            dimensions=1536
+        ),
     )
-    print("✅ Text file content added")
-except Exception as e:
-    print(f"❌ Error adding text file: {e}")
-
-# IMPORTANT: Load/index to Qdrant
-try:
-    print("🚀 Loading knowledge to Qdrant...")
-    knowledge.load(recreate=False)  # set True untuk hapus data lama
-    print("✅ Knowledge base loaded successfully!")
-except Exception as e:
-    print(f"❌ Error loading knowledge: {e}")
+
+    knowledge = push_knowledge(vector_db)
+
+    # IMPORTANT: Load/index to Qdrant
+    try:
+        print("🚀 Loading knowledge to Qdrant...")
+        knowledge.load(recreate=False)  # set True untuk hapus data lama
+        print("✅ Knowledge base loaded successfully!")
+    except Exception as e:
+        print(f"❌ Error loading knowledge: {e}")
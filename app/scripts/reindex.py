@@ -0,0 +1,77 @@
+"""Zero-downtime knowledge rebuild.
+
+Builds every source from push_knowledge.py into a new versioned Qdrant
+collection, verifies it, then atomically switches the QDRANT_COLLECTION_NAME
+alias. Agents keep searching the old version until the switch.
+
+Usage (from the repo root):
+    python app/scripts/reindex.py                 # rebuild + switch + keep 2 versions
+    python app/scripts/reindex.py --migrate       # first run: convert the concrete collection to an alias
+    python app/scripts/reindex.py --rollback      # point the alias back at the previous version
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from app.config.settings import settings
+from app.memory.reindex import (
+    ReindexError,
+    get_qdrant_client,
+    list_versions,
+    reindex,
+    resolve_alias,
+    switch_alias,
+)
+from app.memory.vector_db import get_vector_db
+
+
+def build(collection: str) -> None:
+    from app.scripts.push_knowledge import push_knowledge
+
+    # strict: a source that fails must fail the rebuild, not ship a partial index
+    push_knowledge(get_vector_db(collection=collection), strict=True)
+
+
+def rollback(alias: str) -> None:
+    client = get_qdrant_client()
+    live = resolve_alias(client, alias)
+    older = [v for v in list_versions(client, alias) if live is None or v < live]
+    if not older:
+        print(f"❌ No older version of '{alias}' to roll back to")
+        sys.exit(1)
+    switch_alias(client, alias, older[-1])
+    print(f"✅ '{alias}' rolled back: {live} -> {older[-1]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alias", default=settings.QDRANT_COLLECTION_NAME)
+    parser.add_argument("--min-ratio", type=float, default=0.9, help="Minimum new/old point-count ratio")
+    parser.add_argument("--keep", type=int, default=2, help="Versions to keep after switching")
+    parser.add_argument("--migrate", action="store_true", help="Convert a concrete collection into an alias")
+    parser.add_argument("--rollback", action="store_true", help="Switch the alias to the previous version")
+    args = parser.parse_args()
+
+    if args.rollback:
+        rollback(args.alias)
+        return
+
+    try:
+        live = reindex(
+            build=build,
+            alias=args.alias,
+            min_ratio=args.min_ratio,
+            keep=args.keep,
+            migrate=args.migrate,
+        )
+    except ReindexError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ '{args.alias}' now serves {live}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Guardrail Classifier
+====================
+
+Local first tier for the out-of-context guardrail (app/hooks/pre_hooks.py).
+
+Each category (leave_related, hr_related, completely_irrelevant) is the
+centroid of a handful of example questions, embedded once per process in one
+batched request. A question costs one embedding call plus three dot products:
+
+- relevance margin = best in-scope similarity - out-of-scope similarity
+- |margin| >= GUARDRAIL_CONFIDENCE_MARGIN: the local verdict is final
+- otherwise the question escalates to the LLM classifier
+
+Final verdicts are cached by normalized question (GUARDRAIL_CACHE_TTL_SECONDS,
+LRU bounded by GUARDRAIL_CACHE_MAX_ENTRIES), so repeated questions cost
+nothing.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from agno.knowledge.embedder.openai import OpenAIEmbedder
+
+from app.config.settings import settings
+
+IN_SCOPE = ("leave_related", "hr_related")
+OUT_OF_SCOPE = "completely_irrelevant"
+
+EXAMPLES: Dict[str, List[str]] = {
+    "leave_related": [
+        "How many leave days do I have left?",
+        "What is my remaining annual leave balance as of 2025-06-30?",
+        "Check my leave entitlement for next month",
+        "How many days of leave have I taken this year?",
+        "Can I still take 5 days off in December?",
+        "When does my leave balance reset?",
+        "Do unused leave days carry over to next year?",
+        "How much sick leave do I have?",
+        "Berapa sisa cuti saya?",
+        "Sisa cuti tahunan saya per tanggal 1 Juli berapa?",
+    ],
+    "hr_related": [
+        "How do I submit a leave request?",
+        "What is the company policy on overtime?",
+        "Who do I contact about my payroll?",
+        "When is the next performance review?",
+        "How do I update my bank account for salary payments?",
+        "What are the working hours in the office?",
+        "How does the maternity leave policy work?",
+        "What benefits am I entitled to as a permanent employee?",
+        "Bagaimana cara mengajukan cuti?",
+        "Kapan gaji bulan ini dibayarkan?",
+    ],
+    OUT_OF_SCOPE: [
+        "What's the weather like today?",
+        "Write me a poem about the ocean",
+        "Who won the football match last night?",
+        "Give me a recipe for chocolate cake",
+        "What is the capital of France?",
+        "Explain how black holes form",
+        "Recommend a good movie to watch tonight",
+        "Write a Python function that sorts a list",
+        "Apa resep nasi goreng yang enak?",
+        "Siapa presiden pertama Amerika?",
+    ],
+}
+
+
+@dataclass
+class LocalVerdict:
+    category: str
+    similarities: Dict[str, float]
+    margin: float  # best in-scope similarity - out-of-scope similarity
+
+    @property
+    def is_relevant(self) -> bool:
+        return self.margin > 0
+
+    def confident(self, threshold: float = settings.GUARDRAIL_CONFIDENCE_MARGIN) -> bool:
+        return abs(self.margin) >= threshold
+
+
+class CentroidClassifier:
+    def __init__(self, examples: Dict[str, List[str]] = EXAMPLES, embedder: Optional[OpenAIEmbedder] = None):
+        self.examples = examples
+        self.embedder = embedder or OpenAIEmbedder(id="text-embedding-3-small", dimensions=1536)
+        self._lock = threading.Lock()
+        self._labels: List[str] = []
+        self._centroids: Optional[np.ndarray] = None  # one L2-normalized row per category
+
+    def _ensure_centroids(self) -> np.ndarray:
+        if self._centroids is not None:
+            return self._centroids
+        with self._lock:
+            if self._centroids is None:
+                labels = list(self.examples)
+                texts = [text for label in labels for text in self.examples[label]]
+                response = self.embedder.response(texts)  # type: ignore[arg-type]
+                vectors = _normalize_rows(np.asarray([d.embedding for d in response.data], dtype=np.float32))
+                centroids, offset = [], 0
+                for label in labels:
+                    count = len(self.examples[label])
+                    centroids.append(vectors[offset:offset + count].mean(axis=0))
+                    offset += count
+                self._labels = labels
+                self._centroids = _normalize_rows(np.asarray(centroids))
+        return self._centroids
+
+    def classify(self, question: str) -> LocalVerdict:
+        centroids = self._ensure_centroids()
+        vector = _normalize_rows(np.asarray([self.embedder.get_embedding(question)], dtype=np.float32))[0]
+        similarities = {label: float(score) for label, score in zip(self._labels, centroids @ vector)}
+        in_scope = max(IN_SCOPE, key=lambda label: similarities[label])
+        margin = similarities[in_scope] - similarities[OUT_OF_SCOPE]
+        return LocalVerdict(
+            category=in_scope if margin > 0 else OUT_OF_SCOPE, similarities=similarities, margin=margin
+        )
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+@lru_cache(maxsize=1)
+def get_guardrail_classifier() -> CentroidClassifier:
+    return CentroidClassifier()
+
+
+# ============================================================================
+# Verdict cache and stats
+# ============================================================================
+V = TypeVar("V")
+
+
+class VerdictCache(Generic[V]):
+    """TTL + LRU map from normalized question to final verdict."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.GUARDRAIL_CACHE_TTL_SECONDS,
+        max_entries: int = settings.GUARDRAIL_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[V, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, verdict: V) -> None:
+        with self._lock:
+            self._entries[key] = (verdict, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class GuardrailStats:
+    cached: int = 0
+    local: int = 0
+    escalated: int = 0
+    local_errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.cached + self.local + self.escalated
+        return {**asdict(self), "escalation_rate": round(self.escalated / total, 4) if total else 0.0}
@@ -0,0 +1,245 @@
+"""
+Index Advisor
+=============
+
+Suggests supporting indexes for the query catalog (app/knowledge/common_queries.sql)
+and measures them.
+
+Suggestions come from the query ASTs (sqlglot scopes), not from guessing:
+- correlated MIN/MAX subqueries, e.g. `MAX(sh2.effective_date) ... WHERE
+  sh2.employee_id = e.employee_id`  ->  salary_history (employee_id, effective_date)
+- GROUP BY + MIN/MAX over one table  ->  (group columns..., aggregated column)
+- join keys, composite when one ON clause joins several columns of a table
+- equality filter on a literal plus a range filter on the same table
+Suggestions already covered by an existing index (same leading columns) are dropped.
+
+`benchmark_suggestions` times every affected catalog query with
+EXPLAIN (ANALYZE) before and after creating each index on its own.
+"""
+
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import sqlglot
+from agno.utils.log import logger
+from sqlalchemy import Engine, text
+from sqlglot import exp
+from sqlglot.optimizer.scope import Scope, traverse_scope
+
+from app.services.query_catalog import CatalogQuery
+
+_RANGE_OPS = (exp.GT, exp.GTE, exp.LT, exp.LTE, exp.Between)
+
+
+@dataclass
+class IndexSuggestion:
+    table: str
+    columns: Tuple[str, ...]
+    reasons: List[str] = field(default_factory=list)
+    queries: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"ix_{self.table}_{'_'.join(self.columns)}"[:63]
+
+    @property
+    def ddl(self) -> str:
+        return f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+
+@dataclass
+class IndexTiming:
+    index: str
+    query: str
+    before_ms: float
+    after_ms: float
+
+    @property
+    def speedup(self) -> float:
+        return self.before_ms / self.after_ms if self.after_ms else float("inf")
+
+
+# ============================================================================
+# Suggestions
+# ============================================================================
+def _column_table(column: exp.Column, scope: Scope) -> Optional[str]:
+    """Base table a column belongs to within `scope` (None for outer/CTE columns)."""
+    tables = {alias: src for alias, src in scope.sources.items() if isinstance(src, exp.Table)}
+    if column.table:
+        source = tables.get(column.table)
+        return source.name.lower() if source is not None else None
+    if len(tables) == 1 and len(scope.sources) == 1:
+        return next(iter(tables.values())).name.lower()
+    return None
+
+
+def _conjuncts(condition: Optional[exp.Expression]) -> List[exp.Expression]:
+    if condition is None:
+        return []
+    return list(condition.flatten()) if isinstance(condition, exp.And) else [condition]
+
+
+def _scope_suggestions(scope: Scope) -> List[Tuple[str, Tuple[str, ...], str]]:
+    select = scope.expression
+    if not isinstance(select, exp.Select):
+        return []
+    found: List[Tuple[str, Tuple[str, ...], str]] = []
+    where = select.args.get("where")
+    predicates = _conjuncts(where.this if where else None)
+
+    aggregates = [
+        (agg, agg.this)
+        for agg in select.find_all(exp.Max, exp.Min)
+        if isinstance(agg.this, exp.Column) and agg.find_ancestor(exp.Select) is select
+    ]
+
+    # Correlated MIN/MAX lookup: index (correlation columns..., aggregated column)
+    if scope.is_correlated_subquery:
+        for agg, column in aggregates:
+            table = _column_table(column, scope)
+            keys = []
+            for pred in predicates:
+                if isinstance(pred, exp.EQ) and all(isinstance(side, exp.Column) for side in (pred.this, pred.expression)):
+                    local = [c for c in (pred.this, pred.expression) if _column_table(c, scope) == table]
+                    if len(local) == 1:
+                        keys.append(local[0].name)
+            if table and keys:
+                found.append((table, (*keys, column.name), f"correlated {agg.key.upper()} lookup"))
+
+    # GROUP BY + MIN/MAX over a single table
+    group = select.args.get("group")
+    if group is not None and aggregates:
+        group_columns = [g for g in group.expressions if isinstance(g, exp.Column)]
+        for _, column in aggregates:
+            table = _column_table(column, scope)
+            keys = [g.name for g in group_columns if _column_table(g, scope) == table]
+            if table and keys:
+                found.append((table, (*keys, column.name), "GROUP BY with MIN/MAX"))
+
+    # Join keys (composite when one ON clause uses several columns of a table)
+    for join in select.args.get("joins") or []:
+        # Keyed by alias so a self-join (e.manager_id = m.employee_id) stays two indexes
+        per_alias: Dict[Tuple[str, str], List[str]] = {}
+        for pred in _conjuncts(join.args.get("on")):
+            if not (isinstance(pred, exp.EQ) and all(isinstance(s, exp.Column) for s in (pred.this, pred.expression))):
+                continue
+            for side in (pred.this, pred.expression):
+                table = _column_table(side, scope)
+                if table:
+                    per_alias.setdefault((side.table, table), []).append(side.name)
+        for (_, table), columns in per_alias.items():
+            found.append((table, tuple(dict.fromkeys(columns)), "join key"))
+
+    # Equality on a literal + range on the same table
+    equalities: Dict[str, List[str]] = {}
+    ranges: Dict[str, List[str]] = {}
+    for pred in predicates:
+        column = pred.this if isinstance(pred.this, exp.Column) else None
+        if column is None or (table := _column_table(column, scope)) is None:
+            continue
+        if isinstance(pred, exp.EQ) and isinstance(pred.expression, exp.Literal):
+            equalities.setdefault(table, []).append(column.name)
+        elif isinstance(pred, _RANGE_OPS):
+            ranges.setdefault(table, []).append(column.name)
+    for table, eq_columns in equalities.items():
+        for range_column in ranges.get(table, []):
+            found.append((table, (*eq_columns, range_column), "equality + range filter"))
+
+    return found
+
+
+def existing_indexes(engine: Engine, schema: str = "public") -> Dict[str, List[Tuple[str, ...]]]:
+    """Column lists of existing indexes per table."""
+    sql = text("""
+        SELECT t.relname AS table_name,
+               array_agg(a.attname ORDER BY k.ord) AS columns
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+        WHERE n.nspname = :schema
+        GROUP BY t.relname, i.indexrelid
+    """)
+    indexes: Dict[str, List[Tuple[str, ...]]] = {}
+    with engine.connect() as conn:
+        for table, columns in conn.execute(sql, {"schema": schema}):
+            indexes.setdefault(table, []).append(tuple(columns))
+    return indexes
+
+
+def _covered(columns: Tuple[str, ...], candidates: Iterable[Tuple[str, ...]]) -> bool:
+    return any(other[: len(columns)] == columns for other in candidates)
+
+
+def suggest_indexes(
+    queries: Sequence[CatalogQuery], existing: Optional[Dict[str, List[Tuple[str, ...]]]] = None
+) -> List[IndexSuggestion]:
+    """Index suggestions for `queries`, minus those covered by `existing` or by a longer suggestion."""
+    existing = existing or {}
+    merged: Dict[Tuple[str, Tuple[str, ...]], IndexSuggestion] = {}
+    for query in queries:
+        tree = sqlglot.parse_one(query.sql, read="postgres")
+        for scope in traverse_scope(tree):
+            for table, columns, reason in _scope_suggestions(scope):
+                suggestion = merged.setdefault((table, columns), IndexSuggestion(table, columns))
+                if reason not in suggestion.reasons:
+                    suggestion.reasons.append(reason)
+                if query.name not in suggestion.queries:
+                    suggestion.queries.append(query.name)
+
+    suggestions = []
+    for (table, columns), suggestion in merged.items():
+        if _covered(columns, existing.get(table, [])):
+            continue
+        longer = [s for (t, c), s in merged.items() if t == table and len(c) > len(columns) and c[: len(columns)] == columns]
+        if longer:
+            # A longer index with the same prefix serves this one too
+            for other in longer:
+                other.queries.extend(q for q in suggestion.queries if q not in other.queries)
+            continue
+        suggestions.append(suggestion)
+    return sorted(suggestions, key=lambda s: (-len(s.queries), s.table, s.columns))
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+def _execution_ms(engine: Engine, sql: str, runs: int) -> float:
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(runs):
+            plan = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")).scalar()
+            timings.append(float(plan[0]["Execution Time"]))
+    return statistics.median(timings)
+
+
+def benchmark_suggestions(
+    engine: Engine,
+    suggestions: Sequence[IndexSuggestion],
+    catalog: Dict[str, CatalogQuery],
+    runs: int = 3,
+    keep: bool = False,
+) -> List[IndexTiming]:
+    """Time the affected queries before/after each index (created one at a time).
+
+    Indexes are dropped again unless `keep` is set. Needs a role that may create indexes.
+    """
+    timings = []
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+    for suggestion in suggestions:
+        before = {name: _execution_ms(engine, catalog[name].sql, runs) for name in suggestion.queries}
+        with autocommit.connect() as conn:
+            conn.execute(text(suggestion.ddl))
+            conn.execute(text(f"ANALYZE {suggestion.table}"))
+        try:
+            for name in suggestion.queries:
+                after = _execution_ms(engine, catalog[name].sql, runs)
+                timings.append(IndexTiming(suggestion.name, name, round(before[name], 2), round(after, 2)))
+        finally:
+            if not keep:
+                with autocommit.connect() as conn:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {suggestion.name}"))
+        logger.info(f"Measured {suggestion.name} on {len(suggestion.queries)} queries")
+    return timings
@@ -0,0 +1,163 @@
+"""
+Intent Router
+=============
+
+Picks the agent for an incoming message without an LLM call.
+
+Messages are embedded locally: character 3-5-grams of the lowercased,
+word-padded text, hashed into ROUTER_DIMENSIONS buckets, sublinear TF times
+IDF (learned from the exemplars), L2-normalized. Robust to the Indonesian /
+English mix, typos and inflection, and a message embeds in well under a
+millisecond, so routing stays far below the 10 ms budget.
+
+Each agent has an exemplar set (EXEMPLARS). A message is routed by kNN over
+the exemplars: the ROUTER_K most similar vote with their similarity. The
+route falls back to ROUTER_FALLBACK_AGENT when the best similarity is below
+ROUTER_MIN_SIMILARITY or the vote margin is below ROUTER_MIN_MARGIN.
+"""
+
+import math
+import re
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+
+EXEMPLARS: Dict[str, List[str]] = {
+    "sql-agent": [
+        "Berapa jumlah karyawan di departemen Finance?",
+        "Tampilkan daftar karyawan yang direkrut tahun 2024",
+        "Siapa karyawan dengan gaji tertinggi?",
+        "Hitung rata-rata rating performance review per departemen",
+        "Tampilkan data absensi karyawan bulan lalu",
+        "Berapa total biaya training tahun ini?",
+        "Karyawan mana yang sering terlambat?",
+        "Cari karyawan yang belum pernah ikut training",
+        "Tampilkan riwayat kenaikan gaji karyawan",
+        "Berapa banyak karyawan yang statusnya On Leave?",
+        "Urutkan departemen berdasarkan jumlah karyawan",
+        "Show the average salary per job position",
+        "List employees hired in the last 6 months",
+        "How many employees were absent yesterday?",
+    ],
+    "houpe-agentic": [
+        "Kak, hipnoterapi itu apa sih?",
+        "Berapa harga sesi hipnoterapi di Houpe?",
+        "Houpe lokasinya di mana kak?",
+        "Gimana cara booking sesi terapi?",
+        "Apakah hipnoterapi aman untuk anak-anak?",
+        "Bisa bantu atasi kecemasan dan overthinking?",
+        "Jadwal praktik Houpe hari apa aja?",
+        "Ada testimoni klien yang pernah terapi?",
+        "Berapa lama satu sesi hipnoterapi?",
+        "Bisa terapi online nggak kak?",
+        "Saya susah tidur, bisa dibantu dengan hipnoterapi?",
+        "Terapisnya bersertifikat nggak?",
+        "Can hypnotherapy help me quit smoking?",
+    ],
+    "leave-agent": [
+        "Berapa sisa cuti saya?",
+        "Sisa cuti tahunan saya per tanggal 1 Juli berapa hari?",
+        "Saya masih punya jatah cuti berapa untuk bulan depan?",
+        "Cek saldo cuti saya per akhir tahun",
+        "Cuti saya yang sudah terpakai berapa hari?",
+        "Apakah cuti saya cukup untuk libur 5 hari di Desember?",
+        "Kapan jatah cuti saya direset?",
+        "Hak cuti saya tahun ini ada berapa?",
+        "How many leave days do I have left?",
+        "What is my remaining leave balance as of 2025-06-30?",
+        "Check my leave entitlement for next month",
+    ],
+}
+
+
+def _ngrams(text: str, sizes=(3, 4, 5)) -> Counter:
+    text = " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+    grams: Counter = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for n in sizes:
+            for i in range(max(1, len(padded) - n + 1)):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class HashingEmbedder:
+    """Hashed character n-gram TF-IDF vectors (deterministic, no model, no network)."""
+
+    def __init__(self, dimensions: int = settings.ROUTER_DIMENSIONS):
+        self.dimensions = dimensions
+        self.idf = np.ones(dimensions, dtype=np.float32)
+
+    def _bucket(self, gram: str) -> int:
+        return zlib.crc32(gram.encode()) % self.dimensions
+
+    def fit(self, texts: List[str]) -> None:
+        document_frequency = np.zeros(self.dimensions, dtype=np.float32)
+        for text in texts:
+            document_frequency[list({self._bucket(gram) for gram in _ngrams(text)})] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for gram, count in _ngrams(text).items():
+            vector[self._bucket(gram)] += 1 + math.log(count)
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+@dataclass
+class Route:
+    agent_id: str
+    scores: Dict[str, float]
+    fallback: bool
+    seconds: float
+
+    def to_dict(self) -> Dict:
+        return {
+            "agent_id": self.agent_id,
+            "fallback": self.fallback,
+            "scores": {agent: round(score, 4) for agent, score in self.scores.items()},
+            "routing_ms": round(self.seconds * 1000, 3),
+        }
+
+
+@dataclass
+class IntentRouter:
+    exemplars: Dict[str, List[str]] = field(default_factory=lambda: EXEMPLARS)
+    k: int = settings.ROUTER_K
+    min_similarity: float = settings.ROUTER_MIN_SIMILARITY
+    min_margin: float = settings.ROUTER_MIN_MARGIN
+    fallback_agent: Optional[str] = settings.ROUTER_FALLBACK_AGENT
+
+    def __post_init__(self):
+        texts = [text for agent in self.exemplars for text in self.exemplars[agent]]
+        self.labels = [agent for agent in self.exemplars for _ in self.exemplars[agent]]
+        self.embedder = HashingEmbedder()
+        self.embedder.fit(texts)
+        self.matrix = np.stack([self.embedder.embed(text) for text in texts])
+
+    def route(self, message: str) -> Route:
+        start = time.perf_counter()
+        similarities = self.matrix @ self.embedder.embed(message)
+        top = np.argsort(similarities)[::-1][: self.k]
+        scores = {agent: 0.0 for agent in self.exemplars}
+        for i in top:
+            scores[self.labels[i]] += float(similarities[i]) / len(top)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        margin = scores[ranked[0]] - (scores[ranked[1]] if len(ranked) > 1 else 0.0)
+        fallback = float(similarities[top[0]]) < self.min_similarity or margin < self.min_margin
+        agent_id = (self.fallback_agent or ranked[0]) if fallback else ranked[0]
+        return Route(agent_id=agent_id, scores=scores, fallback=fallback, seconds=time.perf_counter() - start)
+
+
+@lru_cache(maxsize=1)
+def get_intent_router() -> IntentRouter:
+    return IntentRouter()
@@ -0,0 +1,333 @@
+"""
+Query Catalog
+=============
+
+Precomputed results for the canonical analytics queries in
+`app/knowledge/common_queries.sql`.
+
+Each `<query name>` block is parsed and materialized as
+`precomputed.<name>` (a materialized view with a `_row` column preserving the
+query's ORDER BY, plus a unique index so it can be refreshed CONCURRENTLY,
+i.e. without blocking readers). A state table records, per query, the SQL hash,
+the source-table version stamps (see app/tools/sql_cache.py) and the last
+refresh. `refresh_catalog` then only refreshes a view when:
+- its SQL changed in the catalog (view is rebuilt)
+- one of its source tables was written since the last refresh
+- it depends on CURRENT_DATE/NOW() and was last refreshed on an earlier day
+- it is older than PRECOMPUTED_MAX_AGE_SECONDS
+
+`run_refresh_loop` runs this on a schedule inside AgentOS; the SQL Agent reads
+the results with the tools in app/tools/precomputed.py. Every AgentOS worker
+runs the loop, so a refresh holds a Postgres advisory lock: one process
+refreshes per interval, the others skip that round.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import sqlglot
+from agno.utils.log import logger
+from sqlalchemy import Engine, create_engine, text
+from sqlglot import exp
+
+from app.config.settings import settings
+from app.tools.sql_cache import fetch_table_versions
+from app.tools.sql_gate import referenced_tables
+
+CATALOG_PATH = Path(__file__).parent.parent / "knowledge" / "common_queries.sql"
+STATE_TABLE = "catalog_state"
+
+_BLOCK_RE = re.compile(
+    r"--\s*<query name>(?P<name>.*?)</query name>\s*"
+    r"(?:--\s*<query description>(?P<description>.*?)--\s*</query description>\s*)?"
+    r"--\s*<query>(?P<sql>.*?)--\s*</query>",
+    re.DOTALL,
+)
+_TIME_FUNCTIONS = (exp.CurrentDate, exp.CurrentTimestamp, exp.CurrentTime, exp.CurrentDatetime)
+
+
+@dataclass
+class CatalogQuery:
+    name: str
+    description: str
+    sql: str
+    tables: List[str] = field(default_factory=list)
+    time_dependent: bool = False
+
+    @property
+    def sql_hash(self) -> str:
+        # Hash of the view definition, so a change to how views are built rebuilds them too
+        return hashlib.md5(_view_sql(self).encode()).hexdigest()
+
+    @property
+    def view(self) -> str:
+        return f"{settings.PRECOMPUTED_SCHEMA}.{self.name}"
+
+
+@dataclass
+class RefreshResult:
+    name: str
+    action: str  # "created" | "refreshed" | "skipped" | "failed"
+    reason: str = ""
+    rows: Optional[int] = None
+    ms: float = 0.0
+
+
+def parse_catalog(path: Path = CATALOG_PATH) -> List[CatalogQuery]:
+    """Parse `<query name>` / `<query description>` / `<query>` blocks."""
+    queries = []
+    for match in _BLOCK_RE.finditer(path.read_text()):
+        name = match.group("name").strip()
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            logger.warning(f"Skipping catalog query with invalid name: {name!r}")
+            continue
+        description = " ".join(
+            line.lstrip("-").strip() for line in (match.group("description") or "").splitlines() if line.strip("- ")
+        )
+        sql = match.group("sql").strip().rstrip(";")
+        tree = sqlglot.parse_one(sql, read="postgres")
+        queries.append(
+            CatalogQuery(
+                name=name,
+                description=description,
+                sql=sql,
+                tables=referenced_tables(tree),
+                time_dependent=any(True for _ in tree.find_all(*_TIME_FUNCTIONS)),
+            )
+        )
+    return queries
+
+
+@lru_cache(maxsize=1)
+def get_catalog() -> Dict[str, CatalogQuery]:
+    return {q.name: q for q in parse_catalog()}
+
+
+@lru_cache(maxsize=1)
+def get_catalog_engine() -> Engine:
+    # Materializing needs CREATE on the database, so this is not the agent's read-only role
+    return create_engine(settings.POSTGRES_URL_DUMMY_DATA)
+
+
+# ============================================================================
+# Materialization
+# ============================================================================
+def _view_sql(query: CatalogQuery) -> str:
+    """The query with a leading `_row` column numbering rows in its ORDER BY.
+
+    `_row` is the unique key REFRESH ... CONCURRENTLY needs, and readers order
+    by it. row_number() OVER () over a subquery does not guarantee the
+    subquery's order, so the ORDER BY moves into the window (output aliases and
+    positions resolved to their expressions) and the query orders by `_row`.
+    """
+    tree = sqlglot.parse_one(query.sql, read="postgres")
+    order = tree.args.get("order")
+    if not isinstance(tree, exp.Select) or tree.args.get("distinct"):
+        # The window would run before DISTINCT / the set operation: number the output instead
+        keys = order.sql(dialect="postgres") if order else ""
+        return f"SELECT row_number() OVER ({keys}) AS _row, q.* FROM (\n{query.sql}\n) AS q"
+
+    keys = []
+    if order:
+        outputs = [e.unalias() for e in tree.expressions]
+        aliases = {e.alias: e.unalias() for e in tree.expressions if isinstance(e, exp.Alias)}
+        for ordered in order.expressions:
+            key = ordered.copy()
+            term = key.this
+            if isinstance(term, exp.Literal) and term.is_int:
+                key.set("this", outputs[int(term.name) - 1].copy())
+            elif isinstance(term, exp.Column) and not term.table and term.name in aliases:
+                key.set("this", aliases[term.name].copy())
+            keys.append(key)
+    row = exp.Window(this=exp.RowNumber(), order=exp.Order(expressions=keys) if keys else None)
+    tree.set("expressions", [exp.alias_(row, "_row"), *tree.expressions])
+    if order:
+        tree.set("order", exp.Order(expressions=[exp.Ordered(this=exp.column("_row"))]))
+    return tree.sql(dialect="postgres")
+
+
+def ensure_schema(engine: Engine) -> None:
+    schema = settings.PRECOMPUTED_SCHEMA
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {schema}.{STATE_TABLE} (
+                name TEXT PRIMARY KEY,
+                description TEXT,
+                sql_hash TEXT NOT NULL,
+                tables TEXT[] NOT NULL,
+                table_versions JSONB NOT NULL DEFAULT '{{}}',
+                row_count BIGINT,
+                refresh_ms DOUBLE PRECISION,
+                refreshed_at TIMESTAMPTZ
+            )
+        """))
+
+
+def load_state(engine: Engine) -> Dict[str, Dict[str, Any]]:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT * FROM {settings.PRECOMPUTED_SCHEMA}.{STATE_TABLE}")).mappings().all()
+    return {row["name"]: dict(row) for row in rows}
+
+
+def existing_views(engine: Engine) -> set:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT matviewname FROM pg_matviews WHERE schemaname = :schema"),
+            {"schema": settings.PRECOMPUTED_SCHEMA},
+        ).all()
+    return {row[0] for row in rows}
+
+
+def _needs_rebuild(query: CatalogQuery, state: Optional[Dict[str, Any]], views: set) -> bool:
+    return state is None or state["sql_hash"] != query.sql_hash or query.name not in views
+
+
+def _stale_reason(
+    query: CatalogQuery, state: Optional[Dict[str, Any]], versions: Dict[str, int], views: set
+) -> Optional[str]:
+    if state is None:
+        return "new"
+    if state["sql_hash"] != query.sql_hash:
+        return "sql changed"
+    if query.name not in views:
+        return "view missing"
+    if state["refreshed_at"] is None:
+        return "never refreshed"
+    changed = [t for t in query.tables if state["table_versions"].get(t) != versions.get(t)]
+    if changed:
+        return f"tables changed: {', '.join(changed)}"
+    refreshed_at: datetime = state["refreshed_at"]
+    now = datetime.now(refreshed_at.tzinfo)
+    if query.time_dependent and refreshed_at.date() < now.date():
+        return "date rolled over"
+    if (now - refreshed_at).total_seconds() > settings.PRECOMPUTED_MAX_AGE_SECONDS:
+        return "max age"
+    return None
+
+
+def refresh_query(engine: Engine, query: CatalogQuery, rebuild: bool, versions: Dict[str, int], reason: str) -> RefreshResult:
+    start = time.perf_counter()
+    index = f"{query.name}__row_uq"
+    with engine.begin() as conn:
+        conn.execute(text(f"SET LOCAL statement_timeout = {int(settings.PRECOMPUTED_STATEMENT_TIMEOUT_MS)}"))
+        if rebuild:
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {query.view}"))
+            conn.execute(text(f"CREATE MATERIALIZED VIEW {query.view} AS {_view_sql(query)}"))
+            conn.execute(text(f"CREATE UNIQUE INDEX {index} ON {query.view} (_row)"))
+        else:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {query.view}"))
+        rows = conn.execute(text(f"SELECT COUNT(*) FROM {query.view}")).scalar()
+        ms = (time.perf_counter() - start) * 1000
+        conn.execute(
+            text(f"""
+                INSERT INTO {settings.PRECOMPUTED_SCHEMA}.{STATE_TABLE}
+                    (name, description, sql_hash, tables, table_versions, row_count, refresh_ms, refreshed_at)
+                VALUES (:name, :description, :sql_hash, :tables, CAST(:versions AS JSONB), :rows, :ms, now())
+                ON CONFLICT (name) DO UPDATE SET
+                    description = EXCLUDED.description, sql_hash = EXCLUDED.sql_hash, tables = EXCLUDED.tables,
+                    table_versions = EXCLUDED.table_versions, row_count = EXCLUDED.row_count,
+                    refresh_ms = EXCLUDED.refresh_ms, refreshed_at = EXCLUDED.refreshed_at
+            """),
+            {
+                "name": query.name,
+                "description": query.description,
+                "sql_hash": query.sql_hash,
+                "tables": query.tables,
+                "versions": json.dumps({t: versions.get(t) for t in query.tables}),
+                "rows": rows,
+                "ms": ms,
+            },
+        )
+    return RefreshResult(query.name, "created" if rebuild else "refreshed", reason, rows, round(ms, 1))
+
+
+@contextmanager
+def refresh_lock(engine: Engine, wait: bool = True) -> Iterator[bool]:
+    """Session-level advisory lock serializing refreshes across processes.
+
+    Yields whether it was acquired; with `wait=False` it is not acquired while
+    another process holds it.
+    """
+    params = {"key": f"{settings.PRECOMPUTED_SCHEMA}.refresh"}
+    with engine.connect() as conn:
+        if wait:
+            conn.execute(text("SELECT pg_advisory_lock(hashtext(:key))"), params)
+            acquired = True
+        else:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:key))"), params).scalar()
+        try:
+            yield acquired
+        finally:
+            # Session-level: must be released before the connection goes back to the pool
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), params)
+
+
+def refresh_catalog(
+    engine: Optional[Engine] = None, names: Optional[List[str]] = None, force: bool = False, wait: bool = True
+) -> List[RefreshResult]:
+    """Create missing views and refresh stale ones; returns one result per query.
+
+    With `wait=False` nothing is done (empty list) while another process is refreshing.
+    """
+    engine = engine or get_catalog_engine()
+    with refresh_lock(engine, wait=wait) as acquired:
+        if not acquired:
+            logger.debug("Precomputed queries: another process is refreshing, skipped")
+            return []
+        return _refresh_catalog(engine, names, force)
+
+
+def _refresh_catalog(engine: Engine, names: Optional[List[str]], force: bool) -> List[RefreshResult]:
+    catalog = parse_catalog()
+    if names:
+        catalog = [q for q in catalog if q.name in names]
+
+    ensure_schema(engine)
+    state = load_state(engine)
+    views = existing_views(engine)
+    # Stamps read before refreshing: a concurrent write makes the view stale again next round
+    versions = fetch_table_versions(engine, {t for q in catalog for t in q.tables})
+
+    results = []
+    for query in catalog:
+        query_state = state.get(query.name)
+        reason = "forced" if force else _stale_reason(query, query_state, versions, views)
+        if reason is None:
+            results.append(RefreshResult(query.name, "skipped"))
+            continue
+        try:
+            rebuild = _needs_rebuild(query, query_state, views)
+            results.append(refresh_query(engine, query, rebuild, versions, reason))
+        except Exception as e:
+            logger.error(f"Precomputing '{query.name}' failed: {e}")
+            results.append(RefreshResult(query.name, "failed", str(e)))
+
+    changed = [r for r in results if r.action != "skipped"]
+    if changed:
+        logger.info(
+            "Precomputed queries: "
+            + ", ".join(f"{r.name} {r.action} ({r.reason}, {r.ms} ms)" for r in changed)
+        )
+    return results
+
+
+async def run_refresh_loop(interval: float = settings.PRECOMPUTED_REFRESH_INTERVAL_SECONDS) -> None:
+    """Refresh stale views every `interval` seconds (started from the AgentOS lifespan)."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_catalog, wait=False)
+        except Exception as e:
+            logger.error(f"Precomputed query refresh failed: {e}")
+        await asyncio.sleep(interval)
+
@@ -0,0 +1,356 @@
+"""
+Saved Query Index
+=================
+
+Structured index of validated question -> SQL pairs for the SQL Agent fast path.
+
+`save_validated_query` stores validated queries as JSON text in the knowledge
+base, which only helps after a full reasoning loop (search, write, execute).
+This index keeps the same pairs in a table keyed by the normalized question,
+with an embedding per question for near matches:
+
+- exact normalized match, or cosine >= SAVED_QUERY_MATCH_THRESHOLD:
+  the stored SQL is executed directly and the agent only presents the rows
+- cosine >= SAVED_QUERY_CONFIRM_THRESHOLD:
+  the stored SQL is offered to the agent as a hint to confirm and run
+- otherwise: normal agent loop
+
+The whole index is held in memory (it is small: one row per validated query)
+and persisted in Postgres so every worker sees new entries after a reload.
+Hit counts are kept in memory and written in batches by `run_hit_flusher`
+(every SAVED_QUERY_HIT_FLUSH_INTERVAL_SECONDS, started from the AgentOS
+lifespan), so a fast-path answer makes no write on the request path.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.agent import Agent
+from agno.knowledge.embedder.openai import OpenAIEmbedder
+from agno.run.agent import RunInput
+from agno.tools.sql import SQLTools
+from agno.utils.log import logger
+from sqlalchemy import JSON, BigInteger, Column, Integer, MetaData, String, Table, Text, bindparam, create_engine, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.schema import CreateSchema
+
+from app.config.settings import settings
+
+SCHEMA = "ai"
+
+_metadata = MetaData(schema=SCHEMA)
+saved_query_table = Table(
+    "saved_query_index",
+    _metadata,
+    Column("name", String, primary_key=True),
+    Column("question", Text, nullable=False),
+    Column("normalized_question", Text, nullable=False, index=True),
+    Column("sql", Text, nullable=False),
+    Column("embedding", JSON),
+    Column("hits", Integer, nullable=False, default=0),
+    Column("created_at", BigInteger),
+)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    question = re.sub(r"[^\w\s]", " ", question.lower())
+    return " ".join(question.split())
+
+
+@dataclass
+class SavedQuery:
+    name: str
+    question: str
+    sql: str
+
+
+@dataclass
+class SavedQueryMatch:
+    query: SavedQuery
+    score: float
+    exact: bool
+
+    @property
+    def direct(self) -> bool:
+        """True if the stored SQL can run without the agent writing SQL."""
+        return self.exact or self.score >= settings.SAVED_QUERY_MATCH_THRESHOLD
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.query.name, "score": self.score, "exact": self.exact}
+
+
+@dataclass
+class FastPathStats:
+    lookups: int = 0
+    direct_hits: int = 0
+    confirm_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.direct_hits + self.confirm_hits) / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "direct_hits": self.direct_hits,
+            "confirm_hits": self.confirm_hits,
+            "misses": self.lookups - self.direct_hits - self.confirm_hits,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class SavedQueryIndex:
+    def __init__(self, db_url: str, embedder: Optional[OpenAIEmbedder] = None):
+        self.engine = create_engine(db_url)
+        self.embedder = embedder or OpenAIEmbedder(id="text-embedding-3-small", dimensions=1536)
+        self.stats = FastPathStats()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._by_question: Dict[str, SavedQuery] = {}
+        self._queries: List[SavedQuery] = []
+        self._matrix: Optional[np.ndarray] = None  # rows are L2-normalized embeddings
+        self._pending_hits: Dict[str, int] = {}
+        self._hits_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with self.engine.begin() as conn:
+                conn.execute(CreateSchema(SCHEMA, if_not_exists=True))
+                _metadata.create_all(conn, checkfirst=True)
+                rows = conn.execute(select(saved_query_table)).mappings().all()
+            self._rebuild([dict(r) for r in rows])
+            self._loaded = True
+
+    def _rebuild(self, rows: List[Dict[str, Any]]) -> None:
+        queries, vectors = [], []
+        by_question = {}
+        for row in rows:
+            query = SavedQuery(name=row["name"], question=row["question"], sql=row["sql"])
+            by_question[row["normalized_question"]] = query
+            if row.get("embedding"):
+                queries.append(query)
+                vectors.append(row["embedding"])
+        self._by_question = by_question
+        self._queries = queries
+        self._matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32)) if vectors else None
+
+    def reload(self) -> None:
+        """Re-read the table (e.g. after another worker saved a query)."""
+        self._loaded = False
+        self._ensure_loaded()
+
+    def add(self, name: str, question: str, sql: str) -> None:
+        """Insert or replace a validated query."""
+        self._ensure_loaded()
+        normalized = normalize_question(question)
+        embedding = self.embedder.get_embedding(normalized)
+        row = {
+            "name": name,
+            "question": question,
+            "normalized_question": normalized,
+            "sql": sql,
+            "embedding": embedding,
+            "created_at": int(time.time()),
+        }
+        stmt = insert(saved_query_table).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={k: stmt.excluded[k] for k in ("question", "normalized_question", "sql", "embedding")},
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+            rows = conn.execute(select(saved_query_table)).mappings().all()
+        with self._lock:
+            self._rebuild([dict(r) for r in rows])
+
+    def get(self, name: str) -> Optional[SavedQuery]:
+        self._ensure_loaded()
+        return next((query for query in self._by_question.values() if query.name == name), None)
+
+    def _record_hit(self, name: str) -> None:
+        # Counted in memory; flush_hits writes them off the request path
+        with self._hits_lock:
+            self._pending_hits[name] = self._pending_hits.get(name, 0) + 1
+
+    def flush_hits(self) -> int:
+        """Add the hits counted since the last flush to the table; returns the queries updated."""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return 0
+        stmt = (
+            saved_query_table.update()
+            .where(saved_query_table.c.name == bindparam("query_name"))
+            .values(hits=saved_query_table.c.hits + bindparam("count"))
+        )
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(stmt, [{"query_name": name, "count": count} for name, count in pending.items()])
+        except Exception as e:
+            logger.warning(f"Could not record saved-query hits, retrying next flush: {e}")
+            with self._hits_lock:
+                for name, count in pending.items():
+                    self._pending_hits[name] = self._pending_hits.get(name, 0) + count
+            return 0
+        return len(pending)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def match(self, question: str) -> Optional[SavedQueryMatch]:
+        """Find the best saved query for `question` above the confirm threshold."""
+        self._ensure_loaded()
+        self.stats.lookups += 1
+        normalized = normalize_question(question)
+
+        result: Optional[SavedQueryMatch] = None
+        exact = self._by_question.get(normalized)
+        if exact is not None:
+            result = SavedQueryMatch(query=exact, score=1.0, exact=True)
+        elif self._matrix is not None:
+            vector = _normalize_rows(np.asarray([self.embedder.get_embedding(normalized)], dtype=np.float32))[0]
+            scores = self._matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= settings.SAVED_QUERY_CONFIRM_THRESHOLD:
+                result = SavedQueryMatch(query=self._queries[best], score=float(scores[best]), exact=False)
+
+        if result is None:
+            return None
+        if result.direct:
+            self.stats.direct_hits += 1
+        else:
+            self.stats.confirm_hits += 1
+        self._record_hit(result.query.name)
+        logger.info(
+            f"Saved-query fast path: '{result.query.name}' score={result.score:.3f} "
+            f"({'direct' if result.direct else 'confirm'}), hit rate {self.stats.hit_rate:.1%}"
+        )
+        return result
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+@lru_cache(maxsize=1)
+def get_saved_query_index() -> SavedQueryIndex:
+    return SavedQueryIndex(db_url=settings.POSTGRES_URL_DUMMY_DATA)
+
+
+async def run_hit_flusher(interval: float = settings.SAVED_QUERY_HIT_FLUSH_INTERVAL_SECONDS) -> None:
+    """Write counted fast-path hits every `interval` seconds (started from the AgentOS lifespan)."""
+
+    def flush() -> None:
+        # Never builds the index just to flush: nothing is counted before its first lookup
+        if get_saved_query_index.cache_info().currsize:
+            get_saved_query_index().flush_hits()
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(flush)
+    finally:
+        # Shutdown: write the hits counted since the last flush
+        await asyncio.to_thread(flush)
+
+
+# ============================================================================
+# Fast Path
+# ============================================================================
+def _get_sql_tools(agent: Agent) -> SQLTools:
+    for tool in agent.tools or []:
+        if isinstance(tool, SQLTools):
+            return tool
+    raise ValueError(f"Agent '{agent.name}' has no SQLTools")
+
+
+def execute_saved_query(agent: Agent, match: SavedQueryMatch, limit: int = 50) -> str:
+    """Run the stored SQL through the agent's own SQL toolkit."""
+    return _get_sql_tools(agent).run_sql_query(match.query.sql, limit=limit)
+
+
+# Run metadata key: the caller already looked the question up (answer_from_saved_query)
+SAVED_QUERY_LOOKUP = "saved_query_lookup"
+
+
+def _prior_lookup(metadata: Dict[str, Any]) -> Optional[SavedQueryMatch]:
+    lookup = metadata[SAVED_QUERY_LOOKUP]
+    if lookup is None:
+        return None
+    query = get_saved_query_index().get(lookup["name"])
+    return SavedQueryMatch(query=query, score=lookup["score"], exact=lookup["exact"]) if query else None
+
+
+def saved_query_fast_path(run_input: RunInput, agent: Agent, metadata: Optional[Dict[str, Any]] = None) -> None:
+    """Pre-hook: answer known questions from validated SQL instead of re-deriving it.
+
+    A direct match executes the stored SQL now and hands the rows to the agent,
+    so the run is a single presentation pass. A near match only suggests the SQL.
+    When the run metadata carries SAVED_QUERY_LOOKUP the question is not
+    looked up (and counted) again.
+    """
+    question = run_input.input_content_string()
+    try:
+        match = _prior_lookup(metadata) if metadata and SAVED_QUERY_LOOKUP in metadata else get_saved_query_index().match(question)
+        if match is None:
+            return
+        result = execute_saved_query(agent, match) if match.direct else None
+    except Exception as e:
+        logger.warning(f"Saved-query fast path failed, using normal flow: {e}")
+        return
+
+    if match.direct:
+        run_input.input_content = f"""{question}
+
+<validated_query name="{match.query.name}">
+{match.query.sql}
+</validated_query>
+<validated_query_result>
+{result}
+</validated_query_result>
+This question matches a validated saved query that has already been executed.
+Answer directly from the result above and show the SQL. Do not search the knowledge base or run new queries."""
+    else:
+        run_input.input_content = f"""{question}
+
+<candidate_query name="{match.query.name}" similarity="{match.score:.2f}">
+-- Saved for: {match.query.question}
+{match.query.sql}
+</candidate_query>
+A validated saved query looks similar. If it answers this question, run it as-is
+instead of writing new SQL; otherwise ignore it and follow the normal workflow."""
+
+
+def answer_from_saved_query(agent: Agent, question: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """Answer a direct match without any model call.
+
+    Returns (answer, run metadata): the answer is None on a miss or a near
+    match, and the metadata passes the lookup on to the agent run so
+    saved_query_fast_path does not repeat it.
+    """
+    match = get_saved_query_index().match(question)
+    metadata = {SAVED_QUERY_LOOKUP: match.to_dict() if match is not None else None}
+    if match is None or not match.direct:
+        return None, metadata
+    answer = {
+        "name": match.query.name,
+        "score": round(match.score, 4),
+        "sql": match.query.sql,
+        "result": execute_saved_query(agent, match),
+    }
+    return answer, metadata
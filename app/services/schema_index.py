@@ -0,0 +1,268 @@
+"""
+Schema Index
+============
+
+Schema linking for the SQL Agent: instead of pasting the whole semantic model
+into every system prompt, each question gets only the tables and columns it needs.
+
+The per-table JSON files in app/knowledge/ (table_description, use_cases,
+data_quality_notes, table_columns) are embedded as one document per table and
+one per column. For a question:
+1. every table is scored by its best document (table or column)
+2. tables within SCHEMA_LINKING_TABLE_MARGIN of the best one are kept
+   (at most SCHEMA_LINKING_MAX_TABLES)
+3. bridge tables are added when two kept tables only join through a third
+   (training_history -> employees -> departments)
+4. per table: key columns plus the best-scoring columns
+   (at most SCHEMA_LINKING_MAX_COLUMNS)
+
+The index rebuilds incrementally: on every lookup the JSON files are stat'ed and
+only files whose mtime changed are re-parsed and re-embedded; deleted files drop out.
+If retrieval fails the hook falls back to the full semantic model.
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from agno.knowledge.embedder.openai import OpenAIEmbedder
+from agno.run.agent import RunInput
+from agno.run.base import RunContext
+from agno.utils.log import logger
+
+from app.config.settings import settings
+from app.services.semantic_model import KNOWLEDGE_DIR, SEMANTIC_MODEL_STR
+
+# Run dependency (and system message placeholder) holding the linked schema
+RELEVANT_SCHEMA = "relevant_schema"
+
+_FOREIGN_KEY_RE = re.compile(r"foreign key to (\w+) table", re.IGNORECASE)
+
+
+@dataclass
+class ColumnInfo:
+    name: str
+    type: str
+    description: str
+
+    @property
+    def is_primary_key(self) -> bool:
+        return self.description.lower().startswith("primary key")
+
+    @property
+    def references(self) -> Optional[str]:
+        match = _FOREIGN_KEY_RE.search(self.description)
+        return match.group(1) if match else None
+
+    @property
+    def is_key(self) -> bool:
+        return self.is_primary_key or self.references is not None
+
+
+@dataclass
+class TableInfo:
+    name: str
+    description: str
+    use_cases: List[str] = field(default_factory=list)
+    data_quality_notes: List[str] = field(default_factory=list)
+    columns: List[ColumnInfo] = field(default_factory=list)
+
+    @property
+    def references(self) -> Set[str]:
+        return {c.references for c in self.columns if c.references and c.references != self.name}
+
+    def documents(self) -> List[Tuple[Optional[str], str]]:
+        """(column name or None for the table itself, text to embed)."""
+        docs: List[Tuple[Optional[str], str]] = [
+            (None, f"{self.name}: {self.description} Use cases: {'; '.join(self.use_cases)}")
+        ]
+        docs += [(c.name, f"{self.name}.{c.name} ({c.type}): {c.description}") for c in self.columns]
+        return docs
+
+
+@dataclass
+class _FileEntry:
+    mtime: float
+    table: TableInfo
+    vectors: np.ndarray  # one L2-normalized row per document, same order as table.documents()
+
+
+@dataclass
+class SchemaLink:
+    tables: List[TableInfo]
+    columns: Dict[str, List[ColumnInfo]]
+    scores: Dict[str, float]
+    bridges: List[str] = field(default_factory=list)
+
+    @property
+    def table_names(self) -> List[str]:
+        return [t.name for t in self.tables]
+
+    def to_text(self) -> str:
+        lines = []
+        for table in self.tables:
+            bridge = " (join path)" if table.name in self.bridges else ""
+            lines.append(f"{table.name}{bridge}: {table.description}")
+            for column in self.columns[table.name]:
+                key = " PK" if column.is_primary_key else f" FK->{column.references}" if column.references else ""
+                lines.append(f"  - {column.name} {column.type}{key}: {column.description}")
+            for note in table.data_quality_notes:
+                lines.append(f"  ! {note}")
+        return "\n".join(lines)
+
+
+def load_table(path: Path) -> TableInfo:
+    with open(path) as fp:
+        data = json.load(fp)
+    return TableInfo(
+        name=data["table_name"],
+        description=data["table_description"],
+        use_cases=data.get("use_cases", []),
+        data_quality_notes=data.get("data_quality_notes", []),
+        columns=[ColumnInfo(c["name"], c.get("type", ""), c.get("description", "")) for c in data.get("table_columns", [])],
+    )
+
+
+class SchemaIndex:
+    def __init__(self, knowledge_dir: Path = KNOWLEDGE_DIR, embedder: Optional[OpenAIEmbedder] = None):
+        self.knowledge_dir = knowledge_dir
+        self.embedder = embedder or OpenAIEmbedder(id="text-embedding-3-small", dimensions=1536)
+        self._lock = threading.Lock()
+        self._files: Dict[Path, _FileEntry] = {}
+        self.rebuilds = 0  # files (re-)embedded since start
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        # One request for all documents of a table (the API accepts a list input)
+        response = self.embedder.response(texts)  # type: ignore[arg-type]
+        return _normalize_rows(np.asarray([d.embedding for d in response.data], dtype=np.float32))
+
+    def refresh(self) -> bool:
+        """Re-embed files whose mtime changed; returns True if anything changed."""
+        current = {path: path.stat().st_mtime for path in self.knowledge_dir.glob("*.json")}
+        if current == {path: entry.mtime for path, entry in self._files.items()}:
+            return False
+        with self._lock:
+            for path in set(self._files) - set(current):
+                logger.info(f"Schema index: dropped {path.name}")
+                del self._files[path]
+            for path, mtime in current.items():
+                entry = self._files.get(path)
+                if entry is not None and entry.mtime == mtime:
+                    continue
+                table = load_table(path)
+                vectors = self._embed([text for _, text in table.documents()])
+                self._files[path] = _FileEntry(mtime=mtime, table=table, vectors=vectors)
+                self.rebuilds += 1
+                logger.info(f"Schema index: embedded {table.name} ({len(table.columns)} columns)")
+        return True
+
+    @property
+    def tables(self) -> Dict[str, TableInfo]:
+        return {entry.table.name: entry.table for entry in self._files.values()}
+
+    # ------------------------------------------------------------------
+    # Retrieval
+    # ------------------------------------------------------------------
+    def link(
+        self,
+        question: str,
+        max_tables: int = settings.SCHEMA_LINKING_MAX_TABLES,
+        table_margin: float = settings.SCHEMA_LINKING_TABLE_MARGIN,
+        max_columns: int = settings.SCHEMA_LINKING_MAX_COLUMNS,
+    ) -> SchemaLink:
+        """Tables and columns relevant to `question`."""
+        self.refresh()
+        entries = {entry.table.name: entry for entry in self._files.values()}
+        query = _normalize_rows(np.asarray([self.embedder.get_embedding(question)], dtype=np.float32))[0]
+
+        table_scores: Dict[str, float] = {}
+        column_scores: Dict[str, Dict[str, float]] = {}
+        for name, entry in entries.items():
+            scores = entry.vectors @ query
+            table_scores[name] = float(scores.max())
+            column_scores[name] = {
+                column: float(score) for (column, _), score in zip(entry.table.documents(), scores) if column
+            }
+
+        ranked = sorted(table_scores, key=table_scores.get, reverse=True)
+        best = table_scores[ranked[0]] if ranked else 0.0
+        selected = [t for t in ranked if table_scores[t] >= best - table_margin][:max_tables]
+        bridges = _bridge_tables(selected, self.tables)
+
+        tables, columns = [], {}
+        for name in selected + bridges:
+            table = entries[name].table
+            by_score = sorted(table.columns, key=lambda c: column_scores[name][c.name], reverse=True)
+            keep = [c for c in table.columns if c.is_key]
+            if name not in bridges:
+                keep += [c for c in by_score if not c.is_key][: max(max_columns - len(keep), 1)]
+            keep_names = {c.name for c in keep}
+            tables.append(table)
+            columns[name] = [c for c in table.columns if c.name in keep_names]  # schema order
+        return SchemaLink(
+            tables=tables, columns=columns, scores={t: round(table_scores[t], 4) for t in ranked}, bridges=bridges
+        )
+
+
+def _bridge_tables(selected: List[str], tables: Dict[str, TableInfo]) -> List[str]:
+    """Tables needed to join two selected tables that have no direct foreign key."""
+    neighbours: Dict[str, Set[str]] = {name: set() for name in tables}
+    for name, table in tables.items():
+        for ref in table.references:
+            if ref in neighbours:
+                neighbours[name].add(ref)
+                neighbours[ref].add(name)
+
+    bridges: List[str] = []
+    for i, a in enumerate(selected):
+        for b in selected[i + 1 :]:
+            if b in neighbours.get(a, set()):
+                continue
+            via = sorted(neighbours.get(a, set()) & neighbours.get(b, set()))
+            if via and not any(v in selected or v in bridges for v in via):
+                bridges.append(via[0])
+    return bridges
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+@lru_cache(maxsize=1)
+def get_schema_index() -> SchemaIndex:
+    return SchemaIndex()
+
+
+# ============================================================================
+# Pre-hook
+# ============================================================================
+def schema_linking_hook(run_input: RunInput, run_context: RunContext) -> None:
+    """Pre-hook: link the schema relevant to this question for this run.
+
+    The schema goes into the run's dependencies, which fill the `{relevant_schema}`
+    placeholder of the SQL Agent's system message. The user input is left as
+    asked: agno stores it in the session, and history would otherwise replay
+    every earlier turn's schema block.
+
+    Runs after `saved_query_fast_path`; a question already answered from a
+    validated query needs no schema.
+    """
+    question = run_input.input_content_string()
+    if "<validated_query_result>" in question:
+        schema = "(not needed: the question is answered by the validated query result)"
+    else:
+        try:
+            schema = get_schema_index().link(question).to_text()
+        except Exception as e:
+            logger.warning(f"Schema linking failed, attaching the full semantic model: {e}")
+            schema = SEMANTIC_MODEL_STR
+    run_context.dependencies = {**(run_context.dependencies or {}), RELEVANT_SCHEMA: schema}
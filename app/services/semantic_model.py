@@ -2,13 +2,15 @@
 Semantic Model
 ==============
 
-Builds schema metadata from knowledge/*.json files for the Text-to-SQL agent.
+Builds schema metadata from app/knowledge/*.json files for the Text-to-SQL agent.
+The SQL Agent attaches per-question subsets instead (app/services/schema_index.py);
+the full model is the fallback when schema linking is off or fails.
 """
 
 import json
 from pathlib import Path
 
-KNOWLEDGE_DIR = Path(__file__).parent / "knowledge"
+KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
 
 
 def build_semantic_model() -> dict:
@@ -0,0 +1,92 @@
+"""
+Precomputed Result Tools
+========================
+
+SQL Agent tools for the materialized catalog queries (app/services/query_catalog.py).
+
+Questions that match a catalog query (average salary per department, headcount,
+rating distribution, ...) are answered from `precomputed.<name>` in a few
+milliseconds instead of re-running the aggregate over the base tables.
+"""
+
+from typing import Optional
+
+from agno.utils.log import logger
+from sqlalchemy import text
+
+from app.config.settings import settings
+from app.services.query_catalog import STATE_TABLE, get_catalog, get_catalog_engine
+from app.tools.sql_result import collect_rows
+
+
+def list_precomputed_results() -> str:
+    """List the precomputed analytics results and when each was last refreshed.
+
+    Check this before writing SQL for a common HR metric: if one of these
+    answers the question, read it with get_precomputed_result.
+
+    Returns:
+        str: One line per result: name, refresh time and description
+    """
+    catalog = get_catalog()
+    try:
+        with get_catalog_engine().connect() as conn:
+            rows = conn.execute(
+                text(f"SELECT name, refreshed_at FROM {settings.PRECOMPUTED_SCHEMA}.{STATE_TABLE}")
+            ).all()
+    except Exception as e:
+        logger.warning(f"Reading precomputed state failed: {e}")
+        return "No precomputed results available; write the SQL instead."
+
+    refreshed = {name: refreshed_at for name, refreshed_at in rows}
+    lines = [
+        f"- {name} (refreshed {refreshed[name]:%Y-%m-%d %H:%M}): {query.description}"
+        for name, query in catalog.items()
+        if refreshed.get(name) is not None
+    ]
+    return "\n".join(lines) if lines else "No precomputed results available; write the SQL instead."
+
+
+def get_precomputed_result(name: str, limit: Optional[int] = 50) -> str:
+    """Read a precomputed analytics result by name.
+
+    Args:
+        name: Result name from list_precomputed_results (e.g. "average_salary")
+        limit: Maximum rows to return (default 50)
+
+    Returns:
+        str: Compact rows (header line, one CSV line per row, row-count footer),
+            the refresh time and the SQL the result was computed with
+    """
+    query = get_catalog().get(name)
+    if query is None:
+        return f"Unknown precomputed result '{name}'. Available: {', '.join(get_catalog())}"
+
+    max_rows = min(limit or settings.SQL_DEFAULT_LIMIT, settings.SQL_MAX_LIMIT)
+    try:
+        with get_catalog_engine().connect() as conn:
+            state = conn.execute(
+                text(
+                    f"SELECT refreshed_at, row_count FROM {settings.PRECOMPUTED_SCHEMA}.{STATE_TABLE} WHERE name = :name"
+                ),
+                {"name": name},
+            ).first()
+            rows = conn.execution_options(stream_results=True, yield_per=settings.SQL_STREAM_BATCH_SIZE).execute(
+                text(f"SELECT * FROM {query.view} ORDER BY _row")
+            )
+            try:
+                columns = [c for c in rows.keys() if c != "_row"]
+                result = collect_rows(
+                    columns, (row[1:] for row in rows), max_rows=max_rows, max_tokens=settings.SQL_RESULT_MAX_TOKENS
+                )
+            finally:
+                rows.close()
+    except Exception as e:
+        logger.warning(f"Reading precomputed '{name}' failed: {e}")
+        return f"Precomputed result '{name}' is not available; run this SQL instead:\n{query.sql}"
+
+    refreshed_at, row_count = state if state else (None, None)
+    if result.total_rows is None:
+        result.total_rows = row_count
+    refreshed = f"{refreshed_at:%Y-%m-%d %H:%M %Z}".strip() if refreshed_at else "unknown"
+    return f"{result.to_text()}\n-- precomputed {refreshed}; source SQL:\n{query.sql}"
@@ -10,6 +10,7 @@ This tool enables the self-learning loop:
 2. User validates the results
 3. Agent saves the query with metadata for future retrieval
 4. Future similar questions benefit from the saved pattern
+5. Repeats of the same question skip SQL generation (app/services/saved_query_index.py)
 """
 
 import json
@@ -18,6 +19,9 @@ from typing import TYPE_CHECKING, Optional
 from agno.knowledge.reader.text_reader import TextReader
 from agno.utils.log import logger
 
+from app.memory.maintenance import ingestion_timestamp
+from app.tools.sql_gate import QueryRejected, prepare_query
+
 if TYPE_CHECKING:
     from agno.knowledge.knowledge import Knowledge
 
@@ -77,11 +81,6 @@ def save_validated_query(
             data_quality_notes="Used TO_DATE for date parsing in race_wins table"
         )
     """
-    # Validate knowledge base is available
-    if _sql_agent_knowledge is None:
-        logger.error("Knowledge base not initialized")
-        return "Error: Knowledge base not available. Cannot save query."
-
     # Validate required fields
     if not name or not name.strip():
         return "Error: Query name is required."
@@ -93,25 +92,11 @@ def save_validated_query(
     if not sql_stripped:
         return "Error: SQL query is required."
 
-    # Security check: only allow SELECT queries
-    sql_lower = sql_stripped.lower().lstrip()
-    if not sql_lower.startswith("select") and not sql_lower.startswith("with"):
-        return "Error: Only SELECT queries (including CTEs) can be saved."
-
-    # Check for dangerous keywords even in SELECT queries
-    dangerous_keywords = [
-        "drop",
-        "delete",
-        "truncate",
-        "insert",
-        "update",
-        "alter",
-        "create",
-    ]
-    for keyword in dangerous_keywords:
-        # Check for keyword as whole word (not part of column name)
-        if f" {keyword} " in f" {sql_lower} ":
-            return f"Error: Query contains potentially dangerous keyword: {keyword}"
+    # Security check: parse the SQL and only allow a single read-only SELECT
+    try:
+        prepare_query(sql_stripped)
+    except QueryRejected as e:
+        return f"Error: {e}"
 
     # Build payload
     payload = {
@@ -130,15 +115,35 @@ def save_validated_query(
 
     logger.info(f"Saving validated query to knowledge base: {name}")
 
+    # The fast-path index and the knowledge base are written independently:
+    # either one failing does not keep the query out of the other
+    errors = []
     try:
-        _sql_agent_knowledge.add_content(
-            name=name.strip(),
-            text_content=json.dumps(payload, ensure_ascii=False, indent=2),
-            reader=TextReader(),
-            skip_if_exists=True,
-        )
+        from app.services.saved_query_index import get_saved_query_index
+
+        get_saved_query_index().add(name=name.strip(), question=question.strip(), sql=sql_stripped)
     except Exception as e:
-        logger.error(f"Failed to save query: {e}")
-        return f"Error: Failed to save query - {e}"
+        logger.warning(f"Saved query '{name}' not added to fast-path index: {e}")
+        errors.append(f"fast-path index: {e}")
 
-    return f"Successfully saved query '{name}' to knowledge base."
\ No newline at end of file
+    if _sql_agent_knowledge is None:
+        logger.error("Knowledge base not initialized")
+        errors.append("knowledge base not available")
+    else:
+        try:
+            _sql_agent_knowledge.add_content(
+                name=name.strip(),
+                text_content=json.dumps(payload, ensure_ascii=False, indent=2),
+                reader=TextReader(),
+                metadata={"source": "saved_query", "ingested_at": ingestion_timestamp()},
+                skip_if_exists=True,
+            )
+        except Exception as e:
+            logger.error(f"Failed to save query: {e}")
+            errors.append(f"knowledge base: {e}")
+
+    if len(errors) == 2:
+        return f"Error: Failed to save query - {'; '.join(errors)}"
+    if errors:
+        return f"Saved query '{name}' with a partial failure ({errors[0]})."
+    return f"Successfully saved query '{name}' to knowledge base."
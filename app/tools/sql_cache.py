@@ -0,0 +1,274 @@
+"""
+SQL Result Cache
+================
+
+Result-set cache in front of SQL Agent query execution.
+
+Dashboards and repeat users ask the same analytics questions, and the agent
+often writes byte-identical (or trivially different) SQL. Entries are keyed by
+a canonical form of the gated SQL plus the row limit:
+- whitespace and keyword/identifier case are normalized by re-rendering the AST
+- literals are kept exactly as written: in Postgres `x / 3` is integer division
+  and `x / 3.0` is numeric, so they must not share an entry
+
+Each entry records a version stamp for every table it reads. A hit is only
+served while all stamps are unchanged, so writes invalidate dependent entries.
+Stamps come from either:
+- "pg_stat": n_tup_ins + n_tup_upd + n_tup_del from pg_stat_user_tables (no setup,
+  but the counters are flushed asynchronously, so very recent writes may lag,
+  and TRUNCATE does not move them: use "triggers" for tables that get truncated)
+- "triggers": an explicit version table bumped by statement-level triggers
+  (exact; install once with `install_version_triggers`)
+
+Entries also expire after a TTL, and the cache is bounded by entry count and bytes.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import sqlglot
+from agno.utils.log import logger
+from sqlalchemy import Engine, text
+
+VERSION_TABLE = "sql_cache_table_versions"
+
+
+def fetch_table_versions(engine: Engine, tables: Iterable[str], source: str = "pg_stat") -> Dict[str, int]:
+    """Current version stamp per table; a stamp changes whenever the table is written."""
+    if source == "triggers":
+        sql = f"SELECT table_name, version FROM {VERSION_TABLE} WHERE table_name = ANY(:tables)"
+    else:
+        sql = (
+            "SELECT relname AS table_name, "
+            "COALESCE(n_tup_ins, 0) + COALESCE(n_tup_upd, 0) + COALESCE(n_tup_del, 0) AS version "
+            "FROM pg_stat_user_tables WHERE relname = ANY(:tables)"
+        )
+    with engine.connect() as conn:
+        rows = conn.execute(text(sql), {"tables": list(tables)}).all()
+    return {name: int(version) for name, version in rows}
+
+
+def canonicalize_sql(sql: str) -> str:
+    """Canonical SQL text: normalized whitespace and keyword/identifier case."""
+    tree = sqlglot.parse_one(sql, read="postgres")
+    return tree.sql(dialect="postgres", normalize=True, pretty=False)
+
+
+def cache_key(sql: str, limit: int) -> str:
+    return hashlib.sha256(f"{limit}|{canonicalize_sql(sql)}".encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    invalidations: int = 0
+    expirations: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
+
+
+@dataclass
+class _Entry:
+    value: Any
+    versions: Dict[str, int]
+    created_at: float
+    size: int
+    tables: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class SQLResultCache:
+    """LRU result cache invalidated by per-table version stamps.
+
+    Args:
+        engine: Engine of the queried database (used to read version stamps).
+        tables: Tables eligible for caching; queries touching any other table bypass the cache.
+        ttl_seconds: Maximum age of an entry.
+        max_entries: Maximum number of cached result sets.
+        max_bytes: Maximum total (JSON-encoded) size of cached rows.
+        version_source: "pg_stat" or "triggers".
+        version_check_interval: Seconds a fetched set of version stamps is reused.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        tables: Iterable[str],
+        ttl_seconds: float = 300,
+        max_entries: int = 512,
+        max_bytes: int = 32 * 1024 * 1024,
+        version_source: str = "pg_stat",
+        version_check_interval: float = 1.0,
+    ):
+        if version_source not in ("pg_stat", "triggers"):
+            raise ValueError("version_source must be 'pg_stat' or 'triggers'")
+        self.engine = engine
+        self.tables = frozenset(tables)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+        self.stats = CacheStats()
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._versions_fetched_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Version stamps
+    # ------------------------------------------------------------------
+    def _fetch_versions(self) -> Dict[str, int]:
+        return fetch_table_versions(self.engine, self.tables, self.version_source)
+
+    def current_versions(self) -> Dict[str, int]:
+        now = time.monotonic()
+        if now - self._versions_fetched_at >= self.version_check_interval:
+            versions = self._fetch_versions()
+            with self._lock:
+                self._versions = versions
+                self._versions_fetched_at = now
+        return self._versions
+
+    # ------------------------------------------------------------------
+    # Cache operations
+    # ------------------------------------------------------------------
+    def cacheable(self, tables: Iterable[str]) -> bool:
+        tables = set(tables)
+        return bool(tables) and tables <= self.tables
+
+    def get(self, key: str, tables: Iterable[str]) -> Optional[Any]:
+        """Return the cached result if present, fresh and still at the same table versions."""
+        if not self.cacheable(tables):
+            self.stats.bypassed += 1
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._drop(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        versions = self.current_versions()
+        if any(versions.get(t) != v for t, v in entry.versions.items()):
+            self._drop(key)
+            self.stats.invalidations += 1
+            self.stats.misses += 1
+            return None
+
+        with self._lock:
+            self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    def put(
+        self,
+        key: str,
+        tables: Iterable[str],
+        value: Any,
+        versions: Dict[str, int],
+        size: Optional[int] = None,
+    ) -> None:
+        """Store a result with the version stamps read *before* the query ran.
+
+        `size` is the entry's weight against max_bytes; defaults to its JSON length.
+        """
+        tables = tuple(sorted(set(tables)))
+        if not self.cacheable(tables):
+            return
+        if size is None:
+            size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        entry = _Entry(
+            value=value,
+            versions={t: versions.get(t, 0) for t in tables},
+            created_at=time.monotonic(),
+            size=size,
+            tables=tables,
+        )
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats.to_dict(), "entries": len(self._entries), "bytes": self._bytes}
+
+
+def install_version_triggers(engine: Engine, tables: Iterable[str]) -> None:
+    """Create the version table and statement-level triggers for `version_source="triggers"`.
+
+    Requires a role allowed to create triggers on the tables (not the agent's read-only role).
+    """
+    tables = list(tables)
+    statements = [
+        f"""CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )""",
+        f"""CREATE OR REPLACE FUNCTION bump_sql_cache_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO {VERSION_TABLE} (table_name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = {VERSION_TABLE}.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql""",
+    ]
+    for table in tables:
+        statements.append(f"DROP TRIGGER IF EXISTS sql_cache_version ON {table}")
+        statements.append(
+            f"CREATE TRIGGER sql_cache_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_sql_cache_version()"
+        )
+        statements.append(
+            f"INSERT INTO {VERSION_TABLE} (table_name) VALUES ('{table}') ON CONFLICT DO NOTHING"
+        )
+
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    logger.info(f"Installed SQL cache version triggers on {len(tables)} tables")
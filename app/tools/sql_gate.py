@@ -0,0 +1,133 @@
+"""
+SQL Query Gate
+==============
+
+Parses agent-generated SQL into an AST before it reaches Postgres.
+
+The SQL Agent prompt asks for "Default LIMIT 50" and "Never SELECT *", but a
+prompt is not an enforcement point. This gate:
+1. Parses the SQL (sqlglot, postgres dialect) and requires exactly one read-only query
+2. Rejects DML/DDL anywhere in the tree, SELECT ... INTO, FOR UPDATE/SHARE and
+   server-side functions with side effects (pg_sleep, set_config, dblink, ...)
+3. Injects a LIMIT when the outermost query has none, and clamps oversized limits
+
+EXPLAIN-based cost gating and statement_timeout are applied at execution time by
+`GovernedSQLTools` (app/tools/sql_tools.py).
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
+
+FORBIDDEN_NODES = (
+    exp.Insert,
+    exp.Update,
+    exp.Delete,
+    exp.Merge,
+    exp.Create,
+    exp.Drop,
+    exp.Alter,
+    exp.TruncateTable,
+    exp.Command,
+    exp.Into,
+    exp.Lock,
+)
+
+FORBIDDEN_FUNCTIONS = {
+    "pg_sleep",
+    "pg_terminate_backend",
+    "pg_cancel_backend",
+    "pg_reload_conf",
+    "set_config",
+    "pg_read_file",
+    "pg_read_binary_file",
+    "pg_ls_dir",
+    "lo_import",
+    "lo_export",
+    "dblink",
+    "dblink_exec",
+    "pg_advisory_lock",
+}
+
+
+class QueryRejected(Exception):
+    """Raised when SQL fails the gate; the message is safe to show to the agent."""
+
+
+@dataclass
+class PreparedQuery:
+    sql: str
+    original_sql: str
+    limit: int
+    limit_injected: bool = False
+    limit_clamped: bool = False
+    tables: List[str] = field(default_factory=list)
+    count_sql: str = ""  # COUNT(*) over the query as written, for the true row count
+
+
+def _limit_value(tree: exp.Expression) -> Optional[int]:
+    limit = tree.args.get("limit")
+    if limit is None:
+        return None
+    value = limit.expression
+    if isinstance(value, exp.Literal) and value.is_int:
+        return int(value.this)
+    raise QueryRejected("LIMIT must be an integer literal.")
+
+
+def referenced_tables(tree: exp.Expression) -> List[str]:
+    """Base tables read by `tree` (CTE names excluded)."""
+    cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+    # Postgres folds unquoted identifiers to lower case
+    table_names = {t.name if t.this.quoted else t.name.lower() for t in tree.find_all(exp.Table) if t.name}
+    return sorted(table_names - cte_names)
+
+
+def prepare_query(sql: str, default_limit: int = 50, max_limit: int = 500) -> PreparedQuery:
+    """Validate `sql` and return the rewritten statement that will actually run.
+
+    Raises:
+        QueryRejected: If the SQL is not a single read-only query.
+    """
+    try:
+        statements = [s for s in sqlglot.parse(sql, read="postgres") if s is not None]
+    except ParseError as e:
+        raise QueryRejected(f"Could not parse SQL: {e}") from e
+
+    if len(statements) != 1:
+        raise QueryRejected(f"Exactly one statement is allowed, got {len(statements)}.")
+    tree = statements[0]
+
+    if not isinstance(tree, exp.Query):
+        raise QueryRejected(f"Only SELECT queries (including CTEs) are allowed, got {tree.key.upper()}.")
+
+    for node in tree.find_all(*FORBIDDEN_NODES):
+        raise QueryRejected(f"Forbidden construct in query: {node.key.upper()}.")
+
+    for func in tree.find_all(exp.Anonymous, exp.Func):
+        name = (func.name if isinstance(func, exp.Anonymous) else func.sql_name()).lower()
+        if name in FORBIDDEN_FUNCTIONS:
+            raise QueryRejected(f"Function not allowed: {name}.")
+
+    prepared = PreparedQuery(sql="", original_sql=sql, limit=default_limit, tables=referenced_tables(tree))
+
+    prepared.count_sql = (
+        exp.select(exp.Count(this=exp.Star())).from_(tree.subquery("_q")).sql(dialect="postgres")
+    )
+
+    current = _limit_value(tree)
+    if current is None:
+        tree = tree.limit(default_limit)
+        prepared.limit_injected = True
+    elif current > max_limit:
+        tree = tree.limit(max_limit)
+        prepared.limit = max_limit
+        prepared.limit_clamped = True
+    else:
+        prepared.limit = current
+
+    prepared.sql = tree.sql(dialect="postgres")
+    return prepared
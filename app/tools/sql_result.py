@@ -0,0 +1,158 @@
+"""
+SQL Result Encoding
+===================
+
+Compact, budgeted tool output for SQL Agent queries.
+
+agno's SQLTools returns `json.dumps` of a list of row dicts, which repeats every
+column name on every row; the SQL Agent then needs `compress_tool_results` (an
+extra LLM pass) to shrink it. Here a result is rendered once as CSV-like text:
+
+    columns: employee_id,full_name,work_hours
+    101,Budi Santoso,8.5
+    102,Siti Rahma,7.75
+    -- 2 of 2 rows
+
+Rows are pulled from a server-side cursor (`stream_results` + `yield_per`) and
+encoding stops as soon as the row or token budget is reached, so at most the
+budgeted rows are ever held in memory. The footer reports the true row count.
+"""
+
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Sequence
+
+from agno.utils.tokens import count_text_tokens
+
+
+def _format_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f") if value == value.to_integral() else str(value)
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return value
+
+
+def encode_row(values: Sequence[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow([_format_value(v) for v in values])
+    return buffer.getvalue()
+
+
+@dataclass
+class QueryResult:
+    columns: List[str]
+    rows: List[tuple] = field(default_factory=list)
+    lines: List[str] = field(default_factory=list)
+    total_rows: Optional[int] = None
+    total_exact: bool = True
+    truncated_by: Optional[str] = None  # "limit" | "rows" | "tokens"
+    tokens: int = 0
+
+    @property
+    def shown(self) -> int:
+        return len(self.rows)
+
+    def footer(self) -> str:
+        if self.total_rows is None:
+            total = f"{self.shown}+"
+        else:
+            total = f"{self.total_rows:,}" if self.total_exact else f"at least {self.total_rows:,}"
+        footer = f"-- {self.shown} of {total} rows"
+        if self.truncated_by == "tokens":
+            footer += "; output token budget reached, add filters or aggregate to see the rest"
+        elif self.truncated_by in ("rows", "limit"):
+            footer += "; row limit reached, add filters or aggregate to see the rest"
+        return footer
+
+    def to_text(self) -> str:
+        header = "columns: " + encode_row(self.columns)
+        return "\n".join([header, *self.lines, self.footer()])
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+
+class RowCollector:
+    """Encodes rows one at a time until the row or token budget is hit."""
+
+    def __init__(
+        self,
+        columns: Optional[Sequence[str]],
+        max_rows: int,
+        max_tokens: Optional[int] = None,
+        model_id: str = "gpt-4o",
+    ):
+        self.result = QueryResult(columns=list(columns or []))
+        self.max_rows = max_rows
+        self.max_tokens = max_tokens
+        self.model_id = model_id
+        # Header + footer are always emitted; reserve their tokens up front
+        self.used = count_text_tokens("columns: " + encode_row(self.result.columns), model_id) + 24
+
+    def offer(self, row: Sequence[Any]) -> bool:
+        """Add `row` if it fits; returns False once the budget is reached."""
+        result = self.result
+        if len(result.rows) >= self.max_rows:
+            result.truncated_by = "rows"
+            return False
+        line = encode_row(row)
+        cost = count_text_tokens(line, self.model_id) + 1
+        if self.max_tokens is not None and self.used + cost > self.max_tokens and result.rows:
+            result.truncated_by = "tokens"
+            return False
+        result.rows.append(tuple(row))
+        result.lines.append(line)
+        self.used += cost
+        return True
+
+    def set_columns(self, columns: Sequence[str]) -> None:
+        """Set columns after construction (asyncpg records carry their own names)."""
+        self.result.columns = list(columns)
+        self.used += count_text_tokens(encode_row(self.result.columns), self.model_id)
+
+    def finish(self, exhausted: bool) -> QueryResult:
+        """`total_rows` is only known when the rows were exhausted; otherwise the
+        caller decides how to count the rest (see `GovernedSQLTools`)."""
+        if exhausted:
+            self.result.total_rows = len(self.result.rows)
+        self.result.tokens = self.used
+        return self.result
+
+
+def collect_rows(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    max_rows: int,
+    max_tokens: Optional[int] = None,
+    model_id: str = "gpt-4o",
+) -> QueryResult:
+    """Encode rows until the row or token budget is hit; stops consuming `rows` there."""
+    collector = RowCollector(columns, max_rows, max_tokens, model_id)
+    for row in rows:
+        if not collector.offer(row):
+            return collector.finish(exhausted=False)
+    return collector.finish(exhausted=True)
+
+
+async def acollect_rows(
+    rows: AsyncIterable[Any],
+    max_rows: int,
+    max_tokens: Optional[int] = None,
+    model_id: str = "gpt-4o",
+) -> QueryResult:
+    """Async variant of `collect_rows` for asyncpg cursors (columns from the records)."""
+    collector = RowCollector(None, max_rows, max_tokens, model_id)
+    async for record in rows:
+        if not collector.result.columns:
+            collector.set_columns(record.keys())
+        if not collector.offer(tuple(record.values())):
+            return collector.finish(exhausted=False)
+    return collector.finish(exhausted=True)
@@ -0,0 +1,317 @@
+"""
+Governed SQL Tools
+==================
+
+SQLTools for the SQL Agent with the query gate in front of execution.
+
+Every query the agent runs is:
+1. Validated and rewritten by `prepare_query` (single SELECT, LIMIT injected)
+2. Executed in a READ ONLY transaction with a per-statement `statement_timeout`
+3. Cost-checked with `EXPLAIN (FORMAT JSON)` first; plans above SQL_MAX_PLAN_COST
+   are refused, or returned to the agent to ask the user for confirmation
+4. Streamed from a server-side cursor into compact text within a row and token
+   budget (app/tools/sql_result.py), with the true row count in the footer
+5. Logged with plan cost, runtime and row count
+
+Under `agent.arun` (AgentOS) the async variants run on the shared read-only
+asyncpg pool (app/database/sql_pool.py), and `run_sql_queries` runs
+independent queries from one reasoning step concurrently.
+
+Results of queries over `cache_tables` are served from `SQLResultCache`
+(app/tools/sql_cache.py) while the underlying tables are unchanged.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Iterable, List, Optional
+
+from agno.tools.sql import SQLTools
+from agno.utils.log import logger
+from sqlalchemy.sql.expression import text
+
+from app.config.settings import settings
+from app.database.sql_pool import get_sql_pool
+from app.tools.sql_cache import SQLResultCache, cache_key
+from app.tools.sql_gate import PreparedQuery, QueryRejected, prepare_query
+from app.tools.sql_result import QueryResult, acollect_rows, collect_rows
+
+
+class QueryNeedsConfirmation(QueryRejected):
+    """Raised when the plan cost is above the limit and the user has not confirmed."""
+
+
+class GovernedSQLTools(SQLTools):
+    def __init__(
+        self,
+        statement_timeout_ms: int = settings.SQL_STATEMENT_TIMEOUT_MS,
+        max_plan_cost: float = settings.SQL_MAX_PLAN_COST,
+        expensive_query_action: str = settings.SQL_EXPENSIVE_QUERY_ACTION,
+        default_limit: int = settings.SQL_DEFAULT_LIMIT,
+        max_limit: int = settings.SQL_MAX_LIMIT,
+        max_result_tokens: int = settings.SQL_RESULT_MAX_TOKENS,
+        stream_batch_size: int = settings.SQL_STREAM_BATCH_SIZE,
+        cache_tables: Optional[Iterable[str]] = None,
+        cache: Optional[SQLResultCache] = None,
+        async_pool: bool = True,
+        max_parallel_queries: int = settings.SQL_MAX_PARALLEL_QUERIES,
+        **kwargs,
+    ):
+        self.statement_timeout_ms = statement_timeout_ms
+        self.max_plan_cost = max_plan_cost
+        self.expensive_query_action = expensive_query_action
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.max_result_tokens = max_result_tokens
+        self.stream_batch_size = stream_batch_size
+        self.max_parallel_queries = max_parallel_queries
+        if async_pool:
+            kwargs.setdefault(
+                "async_tools",
+                [(self.arun_sql_query, "run_sql_query"), (self.arun_sql_queries, "run_sql_queries")],
+            )
+        super().__init__(**kwargs)
+        self.register(self.run_sql_queries)
+
+        self.cache = cache
+        if self.cache is None and cache_tables and settings.SQL_CACHE_ENABLED:
+            self.cache = SQLResultCache(
+                engine=self.db_engine,
+                tables=cache_tables,
+                ttl_seconds=settings.SQL_CACHE_TTL_SECONDS,
+                max_entries=settings.SQL_CACHE_MAX_ENTRIES,
+                max_bytes=settings.SQL_CACHE_MAX_BYTES,
+                version_source=settings.SQL_CACHE_VERSION_SOURCE,
+            )
+
+    def run_sql_query(self, query: str, limit: Optional[int] = 50, confirmed: bool = False) -> str:
+        """Use this function to run a read-only SQL SELECT query and return the result.
+
+        Args:
+            query (str): A single SELECT query (CTEs allowed). A LIMIT is added if missing.
+            limit (int, optional): The number of rows to return. Defaults to 50.
+            confirmed (bool, optional): Set to true only after the user explicitly confirmed
+                running a query that was reported as expensive. Defaults to false.
+        Returns:
+            str: The result as a `columns:` header, one CSV line per row and a footer with
+                the total row count, or the reason the query was not run.
+        """
+        try:
+            return self.execute(sql=query, limit=limit, confirmed=confirmed).to_text()
+        except QueryNeedsConfirmation as e:
+            return (
+                f"Confirmation required: {e} Tell the user this query is expensive, ask them to "
+                "confirm (or narrow it with filters), and only then call run_sql_query again with confirmed=true."
+            )
+        except QueryRejected as e:
+            return f"Query rejected: {e}"
+        except Exception as e:
+            logger.error(f"Error running query: {e}")
+            return f"Error running query: {e}"
+
+    def prepare(self, sql: str) -> PreparedQuery:
+        return prepare_query(sql, default_limit=self.default_limit, max_limit=self.max_limit)
+
+    @staticmethod
+    def _total_cost(plan: Any) -> float:
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return float(plan[0]["Plan"]["Total Cost"])
+
+    def _plan_cost(self, sess, sql: str) -> float:
+        return self._total_cost(sess.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar())
+
+    def _check_cost(self, cost: float, confirmed: bool) -> None:
+        if cost <= self.max_plan_cost:
+            return
+        message = f"Estimated plan cost {cost:,.0f} exceeds the limit of {self.max_plan_cost:,.0f}."
+        if self.expensive_query_action == "confirm" and not confirmed:
+            raise QueryNeedsConfirmation(message)
+        if self.expensive_query_action == "refuse":
+            raise QueryRejected(f"{message} Add filters or aggregate before querying.")
+
+    @staticmethod
+    def _needs_count(prepared: PreparedQuery, result: QueryResult) -> bool:
+        """True when the shown rows are not the whole result of the query as written."""
+        hit_gate_limit = (
+            result.total_rows is not None
+            and result.total_rows >= prepared.limit
+            and (prepared.limit_injected or prepared.limit_clamped)
+        )
+        if hit_gate_limit:
+            result.truncated_by = "limit"
+        return result.total_rows is None or hit_gate_limit
+
+    def _count_rows(self, sess, prepared: PreparedQuery, result: QueryResult) -> None:
+        """Fill in the true row count when the shown rows are not the whole result."""
+        if not self._needs_count(prepared, result):
+            return
+        lower_bound = result.shown + (1 if result.total_rows is None else 0)
+
+        try:
+            with sess.begin_nested():
+                cost = self._plan_cost(sess, prepared.count_sql)
+                if cost > self.max_plan_cost:
+                    raise QueryRejected(f"count plan cost {cost:,.0f} over limit")
+                result.total_rows = int(sess.execute(text(prepared.count_sql)).scalar())
+                result.total_exact = True
+        except Exception as e:
+            logger.debug(f"Row count skipped: {e}")
+            result.total_rows, result.total_exact = lower_bound, False
+
+    def _cache_lookup(self, prepared: PreparedQuery, fetch_limit: int):
+        """Return (key, versions, cached result); key is None when the query is not cacheable."""
+        if self.cache is None:
+            return None, {}, None
+        key = cache_key(prepared.sql, fetch_limit)
+        cached = self.cache.get(key, prepared.tables)  # counts a bypass when not cacheable
+        if not self.cache.cacheable(prepared.tables):
+            return None, {}, None
+        if cached is not None:
+            logger.info(f"SQL cache hit: rows={cached.shown} tables={','.join(prepared.tables)}")
+            return key, {}, cached
+        # Stamps read before execution: a concurrent write invalidates this entry on next lookup
+        return key, dict(self.cache.current_versions()), None
+
+    def _finish(self, prepared: PreparedQuery, result: QueryResult, cost: float, runtime_ms: float, key, versions) -> None:
+        logger.info(
+            f"SQL gate: cost={cost:,.1f} runtime_ms={runtime_ms:.1f} rows={result.shown}/{result.total_rows} "
+            f"tokens={result.tokens} limit={prepared.limit}{' (injected)' if prepared.limit_injected else ''} "
+            f"tables={','.join(prepared.tables)}"
+        )
+        if key is not None:
+            self.cache.put(key, prepared.tables, result, versions, size=len(result.to_text()))
+
+    def execute(self, sql: str, limit: Optional[int] = None, confirmed: bool = False) -> QueryResult:
+        """Run a gated query, streaming at most `limit` rows within the token budget."""
+        prepared = self.prepare(sql)
+        fetch_limit = min(limit or prepared.limit, prepared.limit)
+
+        key, versions, cached = self._cache_lookup(prepared, fetch_limit)
+        if cached is not None:
+            return cached
+
+        with self.Session() as sess, sess.begin():
+            sess.execute(text("SET TRANSACTION READ ONLY"))
+            sess.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+
+            cost = self._plan_cost(sess, prepared.sql)
+            self._check_cost(cost, confirmed)
+
+            start = time.perf_counter()
+            rows = sess.execute(
+                text(prepared.sql),
+                execution_options={"stream_results": True, "yield_per": self.stream_batch_size},
+            )
+            try:
+                result = collect_rows(rows.keys(), rows, max_rows=fetch_limit, max_tokens=self.max_result_tokens)
+            finally:
+                rows.close()
+            runtime_ms = (time.perf_counter() - start) * 1000
+            self._count_rows(sess, prepared, result)
+
+        self._finish(prepared, result, cost, runtime_ms, key, versions)
+        return result
+
+    def run_sql(self, sql: str, limit: Optional[int] = None, confirmed: bool = False) -> List[dict]:
+        """Run a gated query and return at most `limit` rows."""
+        return self.execute(sql, limit=limit, confirmed=confirmed).to_dicts()
+
+    def run_sql_queries(self, queries: List[str], limit: Optional[int] = 50) -> str:
+        """Use this function to run several independent read-only SELECT queries in one call.
+
+        Args:
+            queries (list[str]): Independent SELECT queries (none may depend on another's result).
+            limit (int, optional): The number of rows to return per query. Defaults to 50.
+        Returns:
+            str: One result section per query, in the order given.
+        """
+        return _join_results(queries, [self.run_sql_query(q, limit=limit) for q in queries])
+
+    # ------------------------------------------------------------------
+    # Async path (used by agent.arun / AgentOS)
+    # ------------------------------------------------------------------
+    async def _acount_rows(self, conn, prepared: PreparedQuery, result: QueryResult) -> None:
+        if not self._needs_count(prepared, result):
+            return
+        lower_bound = result.shown + (1 if result.total_rows is None else 0)
+
+        try:
+            async with conn.transaction():  # savepoint inside the query transaction
+                cost = self._total_cost(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {prepared.count_sql}"))
+                if cost > self.max_plan_cost:
+                    raise QueryRejected(f"count plan cost {cost:,.0f} over limit")
+                result.total_rows = int(await conn.fetchval(prepared.count_sql))
+                result.total_exact = True
+        except Exception as e:
+            logger.debug(f"Row count skipped: {e}")
+            result.total_rows, result.total_exact = lower_bound, False
+
+    async def aexecute(self, sql: str, limit: Optional[int] = None, confirmed: bool = False) -> QueryResult:
+        """Async `execute` on the shared read-only asyncpg pool."""
+        prepared = self.prepare(sql)
+        fetch_limit = min(limit or prepared.limit, prepared.limit)
+
+        key, versions, cached = await asyncio.to_thread(self._cache_lookup, prepared, fetch_limit)
+        if cached is not None:
+            return cached
+
+        pool = await get_sql_pool()
+        async with pool.acquire() as conn, conn.transaction(readonly=True):
+            cost = self._total_cost(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {prepared.sql}"))
+            self._check_cost(cost, confirmed)
+
+            start = time.perf_counter()
+            cursor = conn.cursor(prepared.sql, prefetch=self.stream_batch_size)
+            result = await acollect_rows(cursor, max_rows=fetch_limit, max_tokens=self.max_result_tokens)
+            runtime_ms = (time.perf_counter() - start) * 1000
+            await self._acount_rows(conn, prepared, result)
+
+        self._finish(prepared, result, cost, runtime_ms, key, versions)
+        return result
+
+    async def arun_sql_query(self, query: str, limit: Optional[int] = 50, confirmed: bool = False) -> str:
+        """Use this function to run a read-only SQL SELECT query and return the result.
+
+        Args:
+            query (str): A single SELECT query (CTEs allowed). A LIMIT is added if missing.
+            limit (int, optional): The number of rows to return. Defaults to 50.
+            confirmed (bool, optional): Set to true only after the user explicitly confirmed
+                running a query that was reported as expensive. Defaults to false.
+        Returns:
+            str: The result as a `columns:` header, one CSV line per row and a footer with
+                the total row count, or the reason the query was not run.
+        """
+        try:
+            return (await self.aexecute(sql=query, limit=limit, confirmed=confirmed)).to_text()
+        except QueryNeedsConfirmation as e:
+            return (
+                f"Confirmation required: {e} Tell the user this query is expensive, ask them to "
+                "confirm (or narrow it with filters), and only then call run_sql_query again with confirmed=true."
+            )
+        except QueryRejected as e:
+            return f"Query rejected: {e}"
+        except Exception as e:
+            logger.error(f"Error running query: {e}")
+            return f"Error running query: {e}"
+
+    async def arun_sql_queries(self, queries: List[str], limit: Optional[int] = 50) -> str:
+        """Use this function to run several independent read-only SELECT queries in one call.
+
+        Args:
+            queries (list[str]): Independent SELECT queries (none may depend on another's result).
+            limit (int, optional): The number of rows to return per query. Defaults to 50.
+        Returns:
+            str: One result section per query, in the order given.
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel_queries)
+
+        async def _run(query: str) -> str:
+            async with semaphore:
+                return await self.arun_sql_query(query, limit=limit)
+
+        return _join_results(queries, await asyncio.gather(*(_run(q) for q in queries)))
+
+
+def _join_results(queries: List[str], results: List[str]) -> str:
+    return "\n\n".join(f"### Query {i}\n{query}\n{result}" for i, (query, result) in enumerate(zip(queries, results), 1))